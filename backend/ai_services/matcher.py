@@ -1,9 +1,12 @@
-from openai import AsyncOpenAI
 from pydantic import BaseModel
+import hashlib
 import json
 from typing import Dict
 
 from config.config import AI_API_KEY
+from .utils.llm_client import LazyAsyncOpenAI
+from infrastructure.tracing import traced
+from settings.settings import settings
 from .utils.prepare_profile import get_text_profile
 from .utils.prompts import user_matching_prompt, system_hr_matching_prompt, system_user_matching_prompt
 
@@ -16,8 +19,8 @@ class MatchAns(BaseModel):
 
 class LLMAnalizer:
     def __init__(self, api_key: str):
-        self.llm_client = AsyncOpenAI(api_key=api_key, base_url="https://llm.t1v.scibox.tech/v1")
-        self.model_name = "Qwen2.5-72B-Instruct-AWQ"
+        self.llm_client = LazyAsyncOpenAI(service="matcher", api_key=api_key)
+        self.model_name = settings.ai.model
         self.tools = [
             {
                 "type": "function",
@@ -29,8 +32,27 @@ class LLMAnalizer:
             }
         ]
     
+    def report_key(self, text_profile: str, is_user: bool, vacancy: str) -> str:
+        """
+        ключ кэша отчёта (match_report): модель, промпты и тексты пары —
+        смена любого из них даёт новый отчёт
+        """
+        system_prompt = system_user_matching_prompt if is_user else system_hr_matching_prompt
+        h = hashlib.blake2b(digest_size=16)
+        for part in (self.model_name, system_prompt, user_matching_prompt, text_profile, vacancy):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    @traced()
     async def match(self, user_profile: Dict, is_user: bool, vacancy: str) -> MatchAns:
-        text_profile = get_text_profile(user_profile)
+        return await self.match_text(get_text_profile(user_profile), is_user, vacancy)
+
+    async def match_text(self, text_profile: str, is_user: bool, vacancy: str) -> MatchAns:
+        """
+        match по уже подготовленному тексту профиля (get_text_profile) —
+        его же хранит фоновая задача отчётов
+        """
         user_prompt = user_matching_prompt.format(profile=text_profile, vacancy=vacancy)
         if is_user:
             system_prompt = system_user_matching_prompt
@@ -38,7 +60,7 @@ class LLMAnalizer:
             system_prompt = system_hr_matching_prompt
 
         try:
-            response = await self.llm_client.chat.completions.create(
+            response = await self.llm_client.chat_completion(
                     model=self.model_name,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -0,0 +1,70 @@
+from typing import Any, Dict, List
+
+from .matcher import MatchAns
+
+# решения в тех же формулировках и с теми же порогами score, что в промптах LLM
+_HR_DECISIONS = ((80, "Рекомендован к переходу"), (60, "Условно рекомендован"), (0, "Переход не рекомендован"))
+_USER_DECISIONS = ((80, "Вы отлично подходите"), (50, "У вас хороший потенциал"), (0, "Рекомендуем обратить внимание на другие вакансии"))
+
+
+def _decision(score: int, is_user: bool) -> str:
+    return next(decision for bound, decision in (_USER_DECISIONS if is_user else _HR_DECISIONS) if score >= bound)
+
+
+def _months(value: int) -> str:
+    years, months = divmod(max(0, int(value)), 12)
+    parts = []
+    if years:
+        parts.append(f"{years} г.")
+    if months or not years:
+        parts.append(f"{months} мес.")
+    return " ".join(parts)
+
+
+def _skills_lines(title: str, matches: Dict[str, Dict[str, Any]]) -> List[str]:
+    matched, related, missing = [], [], []
+    for skill, m in sorted(matches.items()):
+        if m.get("match") is not None:
+            matched.append(skill)
+        elif m.get("related"):
+            related.append(f"{skill} (смежный: {m['related']}, близость {m['affinity']:.2f})")
+        else:
+            missing.append(skill)
+    lines = []
+    if matched:
+        lines.append(f"{title}, совпадают: {', '.join(matched)}.")
+    if related:
+        lines.append(f"{title}, частично закрыты смежными навыками: {'; '.join(related)}.")
+    if missing:
+        lines.append(f"{title}, не хватает: {', '.join(missing)}.")
+    return lines
+
+
+def _experience_line(details: Dict[str, Any]) -> str:
+    have, lo, hi = details.get("user_months"), details.get("vacancy_min"), details.get("vacancy_max")
+    if have is None:
+        return "Опыт: не указан."
+    if lo is not None and have < lo:
+        return f"Опыт: не хватает {_months(lo - have)} (есть {_months(have)}, требуется от {_months(lo)})."
+    if hi is not None and have > hi:
+        return f"Опыт: {_months(have)} — выше верхней границы вакансии ({_months(hi)})."
+    if lo:
+        return f"Опыт: требование от {_months(lo)} выполнено (есть {_months(have)})."
+    return f"Опыт: {_months(have)}"
+
+
+def templated_report(score: float, breakdown: Dict[str, float], details: Dict[str, Any], is_user: bool = False) -> MatchAns:
+    """
+    отчёт без LLM по разбору compute_match (details/breakdown) — для уверенных
+    пар, которые гейт (services.report_gate_service) не отправляет в модель
+    """
+    points = int(round(max(0.0, min(1.0, score)) * 100))
+    lines = [
+        f"Эвристическая оценка соответствия: {points}/100 "
+        f"(опыт {breakdown.get('experience', 0):.2f}, обязательные навыки {breakdown.get('must', 0):.2f}, "
+        f"желательные {breakdown.get('nice', 0):.2f}, близость описания опыта {breakdown.get('text', 0):.2f})."
+    ]
+    lines += _skills_lines("Обязательные навыки", details.get("must_matches") or {})
+    lines += _skills_lines("Желательные навыки", details.get("nice_matches") or {})
+    lines.append(_experience_line(details))
+    return MatchAns(score=points, decision=_decision(points, is_user), reasoning_report="\n".join(lines))
@@ -1,16 +1,19 @@
 import asyncio
 import json
 import os
+import time
 import aiohttp
 from typing import Dict, List, Any, Optional
-from bs4 import BeautifulSoup
-from openai import AsyncOpenAI
 from config.config import AI_API_KEY
+from .llm_client import LazyAsyncOpenAI
+from infrastructure.metrics import FETCH_LATENCY
+from infrastructure.tracing import span, traced
+from settings.settings import settings
 
 
-SCIBOX_API_URL = "https://llm.t1v.scibox.tech/v1"
+SCIBOX_API_URL = settings.ai.base_url
 SCIBOX_API_KEY = AI_API_KEY
-SCIBOX_MODEL = "Qwen2.5-72B-Instruct-AWQ"
+SCIBOX_MODEL = settings.ai.model
 
 
 COURSES_SEARCH_URLS = {
@@ -23,6 +26,15 @@ GITHUB_SEARCH_API = "https://api.github.com/search/repositories?q={query}+in:nam
 KAGGLE_COMPETITIONS_URL = "https://www.kaggle.com/competitions?search={query}"
 
 
+def _soup(html: str):
+    """
+    bs4 импортируется при первом разборе страницы, а не на старте воркера
+    """
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, 'html.parser')
+
+
 class CareerAgent:
     """
     Объединенный карьерный агент с поддержкой async-операций.
@@ -37,7 +49,8 @@ class CareerAgent:
             api_key: API ключ для OpenAI-совместимого сервиса
         """
         self.api_key = api_key or SCIBOX_API_KEY
-        self.llm_client = AsyncOpenAI(
+        self.llm_client = LazyAsyncOpenAI(
+            service="career_agent",
             api_key=self.api_key, 
             base_url=SCIBOX_API_URL
         )
@@ -54,7 +67,7 @@ class CareerAgent:
             Ответ модели в виде строки
         """
         try:
-            response = await self.llm_client.chat.completions.create(
+            response = await self.llm_client.chat_completion(
                 model=self.model_name,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
@@ -75,7 +88,7 @@ class CareerAgent:
         """
         message_history = json.loads(json_history)
 
-        response = await self.llm_client.chat.completions.create(
+        response = await self.llm_client.chat_completion(
             model=self.model_name,
             messages=message_history,
             temperature=0.1,
@@ -132,6 +145,7 @@ class CareerAgent:
         
         return "\n".join(formatted_lines)
     
+    @traced()
     async def analyze_dialog(self, dialog_text: str) -> Dict[str, Any]:
         """
         Анализирует диалог и извлекает профиль пользователя.
@@ -180,20 +194,51 @@ class CareerAgent:
         """
         return await self.analyze_dialog(dialog_text)
     
-    async def fetch_text(self, session: aiohttp.ClientSession, url: str) -> str:
-        """Получает текст страницы по URL."""
-        try:
-            async with session.get(url, headers={"User-Agent": "Mozilla/5.0"}) as response:
-                if response.status != 200:
-                    return ""
-                return await response.text()
-        except Exception:
-            return ""
+    async def fetch_text(self, session: aiohttp.ClientSession, url: str, source: str = "other") -> str:
+        """Получает текст страницы по URL (время загрузки пишется в метрики и спан по source)."""
+        with span("career.fetch_text", source=source, url=url) as current:
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                async with session.get(url, headers={"User-Agent": "Mozilla/5.0"}) as response:
+                    if response.status != 200:
+                        outcome = f"http_{response.status}"
+                        return ""
+                    text = await response.text()
+                    outcome = "ok"
+                    return text
+            except Exception:
+                return ""
+            finally:
+                FETCH_LATENCY.labels(source, outcome).observe(time.perf_counter() - started)
+                current.set_attribute("fetch.outcome", outcome)
     
+    async def fetch_json(
+        self, session: aiohttp.ClientSession, url: str, source: str, headers: Optional[Dict[str, str]] = None
+    ) -> Dict:
+        """Получает JSON по URL; при ошибке — пустой словарь."""
+        with span("career.fetch_json", source=source, url=url) as current:
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                async with session.get(url, headers=headers or {}) as response:
+                    if response.status != 200:
+                        outcome = f"http_{response.status}"
+                        return {}
+                    data = await response.json()
+                    outcome = "ok"
+                    return data
+            except Exception:
+                return {}
+            finally:
+                FETCH_LATENCY.labels(source, outcome).observe(time.perf_counter() - started)
+                current.set_attribute("fetch.outcome", outcome)
+    
+    @traced()
     def parse_courses_from_coursera(self, html: str) -> List[Dict]:
         """Извлекает курсы из HTML Coursera."""
         courses = []
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = _soup(html)
         results = soup.find_all('h2', class_='card-title')
         for res in results[:3]:
             title = res.get_text().strip()
@@ -203,10 +248,11 @@ class CareerAgent:
                 courses.append({"title": title, "url": link})
         return courses
     
+    @traced()
     def parse_courses_from_stepik(self, html: str) -> List[Dict]:
         """Извлекает курсы из HTML Stepik."""
         courses = []
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = _soup(html)
         results = soup.find_all('a', class_='course-card__title')
         for res in results[:3]:
             title = res.get_text().strip()
@@ -214,10 +260,11 @@ class CareerAgent:
             courses.append({"title": title, "url": link})
         return courses
     
+    @traced()
     def parse_articles_from_habr(self, html: str) -> List[Dict]:
         """Извлекает статьи из HTML Хабра."""
         articles = []
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = _soup(html)
         results = soup.find_all('article', class_='post')
         for res in results[:3]:
             title_tag = res.find('h2')
@@ -227,10 +274,11 @@ class CareerAgent:
             articles.append({"title": title, "url": link})
         return articles
     
+    @traced()
     def parse_vacancies_from_habr(self, html: str) -> List[Dict]:
         """Извлекает вакансии из HTML Habr Career."""
         vacancies = []
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = _soup(html)
         cards = soup.find_all('div', class_='vacancy-card__title')
         for card in cards[:3]:
             title_tag = card.find('a')
@@ -239,6 +287,7 @@ class CareerAgent:
             vacancies.append({"title": title, "url": link})
         return vacancies
     
+    @traced()
     def parse_projects_from_github(self, json_data: dict) -> List[Dict]:
         """Извлекает проекты из ответа GitHub API."""
         projects = []
@@ -251,10 +300,11 @@ class CareerAgent:
             })
         return projects
     
+    @traced()
     def parse_competitions_from_kaggle(self, html: str) -> List[Dict]:
         """Извлекает соревнования из HTML Kaggle."""
         comps = []
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = _soup(html)
         cards = soup.find_all('div', class_='competition-card__header')
         for card in cards[:3]:
             title_tag = card.find('div', class_='title')
@@ -264,6 +314,7 @@ class CareerAgent:
             comps.append({"title": title, "url": link})
         return comps
     
+    @traced()
     async def find_resources_for_skill(self, skill: str, session: aiohttp.ClientSession) -> Dict[str, List[Dict]]:
         """
         Ищет ресурсы для указанного навыка.
@@ -279,22 +330,22 @@ class CareerAgent:
         tasks = []
         
         # Задачи для поиска курсов
-        tasks.append(self.fetch_text(session, COURSES_SEARCH_URLS["coursera"].format(query=query)))
-        tasks.append(self.fetch_text(session, COURSES_SEARCH_URLS["stepik"].format(query=query)))
+        tasks.append(self.fetch_text(session, COURSES_SEARCH_URLS["coursera"].format(query=query), "coursera"))
+        tasks.append(self.fetch_text(session, COURSES_SEARCH_URLS["stepik"].format(query=query), "stepik"))
         
         # Задачи для статей и вакансий
-        tasks.append(self.fetch_text(session, HABR_ARTICLES_SEARCH_URL.format(query=query)))
-        tasks.append(self.fetch_text(session, HABR_VACANCY_SEARCH_URL.format(query=query)))
+        tasks.append(self.fetch_text(session, HABR_ARTICLES_SEARCH_URL.format(query=query), "habr_articles"))
+        tasks.append(self.fetch_text(session, HABR_VACANCY_SEARCH_URL.format(query=query), "habr_career"))
         
         # Задача для GitHub API
         github_headers = {}
         gh_token = os.getenv("GITHUB_TOKEN")
         if gh_token:
             github_headers["Authorization"] = f"token {gh_token}"
-        tasks.append(session.get(GITHUB_SEARCH_API.format(query=skill), headers=github_headers))
+        tasks.append(self.fetch_json(session, GITHUB_SEARCH_API.format(query=skill), "github", github_headers))
         
         # Задача для Kaggle
-        tasks.append(self.fetch_text(session, KAGGLE_COMPETITIONS_URL.format(query=query)))
+        tasks.append(self.fetch_text(session, KAGGLE_COMPETITIONS_URL.format(query=query), "kaggle"))
         
         # Выполняем все запросы параллельно
         responses = await asyncio.gather(*tasks, return_exceptions=True)
@@ -304,19 +355,9 @@ class CareerAgent:
         stepik_html = responses[1] if isinstance(responses[1], str) else ""
         habr_articles_html = responses[2] if isinstance(responses[2], str) else ""
         habr_vacancies_html = responses[3] if isinstance(responses[3], str) else ""
-        github_resp = responses[4]
+        github_data = responses[4] if isinstance(responses[4], dict) else {}
         kaggle_html = responses[5] if isinstance(responses[5], str) else ""
         
-        # Обрабатываем ответ GitHub API
-        github_data = {}
-        if isinstance(github_resp, aiohttp.ClientResponse):
-            try:
-                github_data = await github_resp.json()
-            except Exception:
-                github_data = {}
-            finally:
-                github_resp.close()
-        
         # Парсим полученные данные
         resources = {
             "courses": self.parse_courses_from_coursera(coursera_html) + self.parse_courses_from_stepik(stepik_html),
@@ -428,6 +469,7 @@ class CareerAgent:
         prompt_lines.append("\nТеперь составь итоговое сообщение для пользователя:")
         return "\n".join(prompt_lines)
     
+    @traced()
     async def generate_final_message(self, user_profile: dict, all_recommendations: Dict[str, List[Dict]]) -> str:
         """
         Генерирует финальное сообщение с рекомендациями.
@@ -493,6 +535,7 @@ class CareerAgent:
         """
         return await self.run_agent_async(json_path)
     
+    @traced()
     async def analyze_messages(self, messages: List[Dict[str, str]]) -> str:
         """
         Анализирует готовый список сообщений и возвращает рекомендации.
@@ -1,9 +1,11 @@
-from openai import AsyncOpenAI
 from pydantic import BaseModel
 import json
 from typing import Dict, List, Optional
 
 from config.config import AI_API_KEY
+from .llm_client import LazyAsyncOpenAI
+from infrastructure.tracing import traced
+from settings.settings import settings
 from .prompts import system_dialog_analyze_prompt
 
 
@@ -14,8 +16,8 @@ class DialogAnalysis(BaseModel):
 
 class DialogAnalyzer:
     def __init__(self, api_key: str):
-        self.llm_client = AsyncOpenAI(api_key=api_key, base_url="https://llm.t1v.scibox.tech/v1")
-        self.model_name = "Qwen2.5-72B-Instruct-AWQ"
+        self.llm_client = LazyAsyncOpenAI(service="dialog_analyzer", api_key=api_key)
+        self.model_name = settings.ai.model
         self.tools = [
             {
                 "type": "function",
@@ -28,6 +30,7 @@ class DialogAnalyzer:
         ]
         
 
+    @traced()
     async def analyze(self, 
                       dialog_history: List[Dict], 
                       current_skills: List[str], 
@@ -41,7 +44,7 @@ class DialogAnalyzer:
         )
 
         try:
-            response = await self.llm_client.chat.completions.create(
+            response = await self.llm_client.chat_completion(
                 model=self.model_name,
                 messages=[
                     {"role": "system", "content": system_prompt},
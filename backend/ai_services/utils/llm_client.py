@@ -0,0 +1,56 @@
+import time
+from typing import Any, Optional
+
+from infrastructure.metrics import LLM_LATENCY, LLM_TOKENS
+from infrastructure.tracing import span
+from settings.settings import settings
+
+
+class LazyAsyncOpenAI:
+    """
+    AsyncOpenAI, который создаётся (и импортирует openai) при первом обращении,
+    а не при импорте модуля с синглтоном сервиса.
+    атрибуты проксируются в настоящий клиент: client.chat.completions.create(...)
+    base_url, timeout и max_retries по умолчанию берутся из settings.ai
+    """
+
+    def __init__(self, service: str, **client_kwargs: Any) -> None:
+        self.service = service
+        self._client_kwargs = {
+            "base_url": settings.ai.base_url,
+            "timeout": settings.ai.timeout,
+            "max_retries": settings.ai.max_retries,
+            **client_kwargs,
+        }
+        self._client: Optional[Any] = None
+
+    def _get(self) -> Any:
+        if self._client is None:
+            from openai import AsyncOpenAI
+
+            self._client = AsyncOpenAI(**self._client_kwargs)
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get(), name)
+
+    async def chat_completion(self, **kwargs: Any) -> Any:
+        """
+        chat.completions.create с метриками (латентность и токены по сервису)
+        и спаном llm.chat_completion
+        """
+        with span("llm.chat_completion", service=self.service, model=kwargs.get("model")) as current:
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                response = await self._get().chat.completions.create(**kwargs)
+                outcome = "ok"
+            finally:
+                LLM_LATENCY.labels(self.service, outcome).observe(time.perf_counter() - started)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                LLM_TOKENS.labels(self.service, "prompt").inc(usage.prompt_tokens or 0)
+                LLM_TOKENS.labels(self.service, "completion").inc(usage.completion_tokens or 0)
+                current.set_attribute("llm.prompt_tokens", usage.prompt_tokens or 0)
+                current.set_attribute("llm.completion_tokens", usage.completion_tokens or 0)
+            return response
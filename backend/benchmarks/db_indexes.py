@@ -0,0 +1,200 @@
+"""
+Бенчмарк индексов горячих запросов.
+
+Создаёт отдельную схему с копиями таблиц user/vacancy, наполняет её
+синтетикой (по умолчанию 1M пользователей), снимает планы и задержки
+запросов без индексов, применяет DDL миграции hot_path_indexes и
+повторяет замеры.
+
+    python -m benchmarks.db_indexes --users 1000000 --out bench_db.json
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+
+from infrastructure.db.connect import pg_dsn
+from infrastructure.db.migrations import MIGRATIONS
+from utils.patterns.skills import SKILL_LEXICON
+
+SCHEMA = "bench_idx"
+SEED_BATCH = 100_000
+
+QUERIES: Dict[str, str] = {
+    "exists_by_full_name": (
+        'SELECT id FROM "user" WHERE first_name = :first_name AND last_name = :last_name LIMIT 1'
+    ),
+    "users_first_page": (
+        'SELECT * FROM "user" ORDER BY created_at DESC, id DESC LIMIT 200'
+    ),
+    "users_deep_page": (
+        'SELECT * FROM "user" WHERE (created_at, id) < (:created_at, :id) '
+        "ORDER BY created_at DESC, id DESC LIMIT 200"
+    ),
+    "vacancies_first_page": (
+        "SELECT * FROM vacancy ORDER BY created_at DESC, id DESC LIMIT 200"
+    ),
+    "users_skill_overlap": (
+        'SELECT id FROM "user" WHERE hard_skills && CAST(:skills AS text[])'
+    ),
+    "vacancies_must_contains": (
+        "SELECT id FROM vacancy WHERE must_have @> CAST(:skills AS text[])"
+    ),
+}
+
+
+def _prepare_schema(conn: Connection) -> None:
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    for table in ('"user"', "vacancy"):
+        conn.execute(text(
+            f"CREATE TABLE {SCHEMA}.{table} (LIKE public.{table} "
+            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED)"
+        ))
+
+
+def _seed(conn: Connection, users: int, vacancies: int, skills: List[str]) -> None:
+    for start in range(0, users, SEED_BATCH):
+        stop = min(users, start + SEED_BATCH)
+        conn.execute(text(
+            'INSERT INTO "user" (id, first_name, last_name, sex, birth_date, current_position, '
+            "experience_years, experience_months, experience_description, hard_skills, created_at, updated_at) "
+            "SELECT gen_random_uuid(), 'Имя' || (g % 20000), 'Фамилия' || (g % 50021), "
+            "CASE WHEN g % 2 = 0 THEN 'male' ELSE 'female' END::sex_enum, "
+            "DATE '1970-01-01' + (g % 12000), 'Инженер', g % 30, g % 12, "
+            "repeat('Разработка и сопровождение сервисов. ', 20), "
+            "ARRAY[(:skills)[1 + (g * 7) % :k], (:skills)[1 + (g * 13) % :k], (:skills)[1 + (g * 31) % :k]], "
+            "now() - make_interval(secs => g), now() "
+            "FROM generate_series(:start, :stop - 1) AS g"
+        ), {"skills": skills, "k": len(skills), "start": start, "stop": stop})
+        conn.commit()
+
+    conn.execute(text(
+        "INSERT INTO vacancy (id, name, description, min_exp_months, max_exp_months, "
+        "must_have, nice_to_have, created_at, updated_at) "
+        "SELECT gen_random_uuid(), 'Вакансия ' || g, repeat('Описание вакансии. ', 200), "
+        "(g % 5) * 12, (g % 5) * 12 + 36, "
+        "ARRAY[(:skills)[1 + (g * 7) % :k], (:skills)[1 + (g * 11) % :k]], "
+        "ARRAY[(:skills)[1 + (g * 17) % :k]], "
+        "now() - make_interval(secs => g), now() "
+        "FROM generate_series(0, :n - 1) AS g"
+    ), {"skills": skills, "k": len(skills), "n": vacancies})
+    conn.commit()
+
+
+def _query_params(conn: Connection, skills: List[str]) -> Dict[str, Any]:
+    row = conn.execute(text(
+        'SELECT first_name, last_name, created_at, id FROM "user" '
+        "ORDER BY created_at DESC, id DESC OFFSET 500000 LIMIT 1"
+    )).first()
+    if row is None:
+        row = conn.execute(text('SELECT first_name, last_name, created_at, id FROM "user" LIMIT 1')).first()
+    return {
+        "first_name": row.first_name,
+        "last_name": row.last_name,
+        "created_at": row.created_at,
+        "id": row.id,
+        "skills": skills[:2],
+    }
+
+
+def _measure(conn: Connection, params: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    report: Dict[str, Any] = {}
+    for name, sql in QUERIES.items():
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar_one()
+        root = plan[0]["Plan"]
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            conn.execute(text(sql), params).fetchall()
+            timings.append((time.perf_counter() - t0) * 1000)
+        timings.sort()
+        report[name] = {
+            "plan_root": root["Node Type"],
+            "plan_nodes": _node_types(root),
+            "execution_ms": plan[0]["Execution Time"],
+            "p50_ms": statistics.median(timings),
+            "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        }
+    return report
+
+
+def _node_types(node: Dict[str, Any]) -> List[str]:
+    label = node["Node Type"]
+    if "Index Name" in node:
+        label += f" ({node['Index Name']})"
+    out = [label]
+    for child in node.get("Plans", []):
+        out.extend(_node_types(child))
+    return out
+
+
+def _print_report(before: Dict[str, Any], after: Dict[str, Any]) -> None:
+    print(f"{'query':<26}{'before p50':>12}{'after p50':>12}  plan after")
+    for name in QUERIES:
+        b, a = before[name], after[name]
+        print(f"{name:<26}{b['p50_ms']:>10.2f}ms{a['p50_ms']:>10.2f}ms  {' > '.join(a['plan_nodes'])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--vacancies", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", default=None, help="куда сохранить JSON с результатами")
+    parser.add_argument("--keep", action="store_true", help="не удалять схему после прогона")
+    args = parser.parse_args()
+
+    migration = next(m for m in MIGRATIONS if m.name == "hot_path_indexes")
+    skills = [canon.lower() for canon in SKILL_LEXICON]
+
+    engine = create_engine(
+        pg_dsn("psycopg2"),
+        connect_args={"options": f"-c search_path={SCHEMA},public"},
+    )
+    try:
+        with engine.connect() as conn:
+            _prepare_schema(conn)
+            conn.commit()
+            t0 = time.perf_counter()
+            _seed(conn, args.users, args.vacancies, skills)
+            print(f"seeded {args.users} users / {args.vacancies} vacancies in {time.perf_counter() - t0:.1f}s")
+            conn.execute(text('ANALYZE "user"'))
+            conn.execute(text("ANALYZE vacancy"))
+            params = _query_params(conn, skills)
+            before = _measure(conn, params, args.repeat)
+            conn.commit()
+
+        t0 = time.perf_counter()
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for stmt in migration.statements:
+                conn.execute(text(stmt))
+            conn.execute(text('ANALYZE "user"'))
+            conn.execute(text("ANALYZE vacancy"))
+        build_s = time.perf_counter() - t0
+
+        with engine.connect() as conn:
+            after = _measure(conn, params, args.repeat)
+
+        _print_report(before, after)
+        print(f"index build: {build_s:.1f}s")
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"users": args.users, "vacancies": args.vacancies, "index_build_s": build_s,
+                     "before": before, "after": after},
+                    f, ensure_ascii=False, indent=2, default=str,
+                )
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Текстовая близость на эмбеддингах (matcher.embeddings) против попарного TF-IDF.
+
+Замеряет кодирование текстов бэкендом из settings.embeddings, пакетный score_users
+с text.method=tfidf и embedding, сборку снимка кандидатов с векторами (полную
+и повторную с переиспользованием неизменившихся текстов), скрининг по снимку
+против точного скоринга (пропуски недопустимы) и IVF-поиск против полного
+перебора: recall@k и задержку.
+
+    python -m benchmarks.embeddings --users 20000 --vacancies 20 --out bench/embeddings.json
+    APP_EMBEDDINGS__BACKEND=static APP_EMBEDDINGS__PATH=models/ru-en python -m benchmarks.embeddings
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.synthetic import make_users, make_vacancies
+from matcher.batch import score_users
+from matcher.candidate_snapshot import CandidateSnapshot, SnapshotBuilder, screen_rows
+from matcher.config import MatcherConfig, TextSimConfig
+from matcher.embeddings import encode_in_batches, get_backend, text_vector
+from matcher.lexicon import current
+from schemas.schemas import MatchCandidate
+
+
+def _candidates(users) -> List[MatchCandidate]:
+    return [
+        MatchCandidate(u.id, u.experience_total_months, u.hard_skills, u.experience_description)
+        for u in users
+    ]
+
+
+def run(n_users: int, n_vacancies: int, k: int, probes: List[int], seed: int) -> Dict[str, Any]:
+    rows = _candidates(make_users(n_users, seed=seed))
+    vacancies = make_vacancies(n_vacancies, seed=seed + 1)
+    backend = get_backend()
+    report: Dict[str, Any] = {"backend": backend.model_id, "users": n_users, "vacancies": n_vacancies}
+
+    texts = [r.experience_description or "" for r in rows]
+    t0 = time.perf_counter()
+    encode_in_batches(texts)
+    report["encode_us_per_text"] = (time.perf_counter() - t0) * 1e6 / n_users
+
+    sample = rows[:min(n_users, 2000)]
+    for method in ("tfidf", "embedding"):
+        cfg = MatcherConfig(text=TextSimConfig(method=method))
+        t0 = time.perf_counter()
+        for vac in vacancies:
+            score_users(vac, sample, cfg)
+        report[f"score_users_{method}_us_per_pair"] = (time.perf_counter() - t0) * 1e6 / (len(sample) * n_vacancies)
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.snap")
+    lexicon = current()
+    t0 = time.perf_counter()
+    builder = SnapshotBuilder(lexicon, backend)
+    builder.add_rows(rows)
+    builder.write(path)
+    report["snapshot_build_s"] = time.perf_counter() - t0
+    snap = CandidateSnapshot(path)
+
+    # повторная сборка: 1% пользователей поменял описание
+    changed = rows[:]
+    for i in range(0, n_users, 100):
+        r = changed[i]
+        changed[i] = MatchCandidate(r.id, r.experience_total_months, r.hard_skills, (r.experience_description or "") + " Kafka")
+    t0 = time.perf_counter()
+    rebuild = SnapshotBuilder(lexicon, backend, previous=snap)
+    rebuild.add_rows(changed)
+    rebuild.write(path + ".2")
+    report["snapshot_rebuild_s"] = time.perf_counter() - t0
+    report["snapshot_rebuild_reused"] = rebuild.reused
+
+    # скрининг по снимку против точного score_users с эмбеддингами
+    cfg = MatcherConfig(text=TextSimConfig(method="embedding"))
+    missed = extra = 0
+    screen_ms = []
+    for vac in vacancies:
+        t0 = time.perf_counter()
+        passed = set(screen_rows(snap, vac, cfg, 0, snap.rows).tolist())
+        screen_ms.append((time.perf_counter() - t0) * 1000)
+        accepted = {i for i, res in enumerate(score_users(vac, rows, cfg)) if res.score >= cfg.accept_threshold}
+        missed += len(accepted - passed)
+        extra += len(passed - accepted)
+    report["screen_ms_median"] = statistics.median(screen_ms)
+    report["screen_missed"] = missed
+    report["screen_extra"] = extra
+
+    # IVF против полного перебора по тем же float16-векторам снимка
+    queries = [text_vector(v.description) for v in vacancies]
+    t0 = time.perf_counter()
+    exact = [set(np.argsort(-(snap.embeddings.astype(np.float32) @ q))[:k].tolist()) for q in queries]
+    report["bruteforce_ms"] = (time.perf_counter() - t0) * 1000 / len(queries)
+    for nprobe in probes:
+        t0 = time.perf_counter()
+        found = [set(snap.nearest(q, k, nprobe)[0].tolist()) for q in queries]
+        report[f"ivf_probe{nprobe}_ms"] = (time.perf_counter() - t0) * 1000 / len(queries)
+        report[f"ivf_probe{nprobe}_recall@{k}"] = statistics.mean(len(f & e) / k for f, e in zip(found, exact))
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--vacancies", type=int, default=20)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--probes", default="1,4,8,16")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    report = run(args.users, args.vacancies, args.k, [int(p) for p in args.probes.split(",")], args.seed)
+    for name, value in report.items():
+        print(f"{name:<34}{value:.3f}" if isinstance(value, float) else f"{name:<34}{value}")
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Гидратация строк user: UserDTO.model_validate (валидаторы, date.today() на строку)
+против schemas.UserRecord из кортежа колонок, плюс сериализация выгрузки
+(model_dump_json против orjson по записи).
+
+Офлайн строки берутся из benchmarks.synthetic; UserDTO собирается из ORM-объектов
+User (from_attributes, как в get_all_users) и из dict. С --db — те же два пути
+на живой таблице: select(User) + model_validate против select(колонок) + UserRecord.
+
+    python -m benchmarks.hydration --rows 100000 --out bench/hydration.json
+    python -m benchmarks.hydration --db          # вся таблица user
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from dataclasses import fields
+from datetime import timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+import orjson
+
+from benchmarks.synthetic import make_users
+from persistent.db.tables import User
+from schemas.schemas import UserDTO, UserRecord
+
+
+def make_rows(n: int, seed: int) -> List[Tuple[Any, ...]]:
+    """
+    кортежи в порядке полей UserRecord — как строка select(*колонок) из asyncpg
+    """
+    rows = []
+    for u in make_users(n, seed=seed, mean_description_chars=400):
+        values = u.model_dump()
+        values["created_at"] = u.created_at.replace(tzinfo=timezone.utc)
+        values["updated_at"] = u.updated_at.replace(tzinfo=timezone.utc)
+        rows.append(tuple(values[f.name] for f in fields(UserRecord)))
+    return rows
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return {"median_ms": statistics.median(timings) * 1000, "min_ms": min(timings) * 1000}
+
+
+def _peak_mb(fn: Callable[[], Any]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    keep = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+    return peak / 2**20
+
+
+def offline(n: int, repeat: int, seed: int) -> Dict[str, Any]:
+    rows = make_rows(n, seed)
+    names = [f.name for f in fields(UserRecord)]
+    dicts = [dict(zip(names, row)) for row in rows]
+    orm = [User(**d) for d in dicts]
+    records = [UserRecord(*row) for row in rows]
+    dtos = [UserDTO.model_validate(o) for o in orm]
+
+    cases: Dict[str, Callable[[], Any]] = {
+        "dto_from_orm": lambda: [UserDTO.model_validate(o) for o in orm],
+        "dto_from_dict": lambda: [UserDTO.model_validate(d) for d in dicts],
+        "record_from_row": lambda: [UserRecord(*row) for row in rows],
+    }
+    report: Dict[str, Any] = {}
+    for name, fn in cases.items():
+        r = report[name] = _time(fn, repeat)
+        r["us_per_row"] = r["median_ms"] * 1000 / n
+        r["peak_mb"] = _peak_mb(fn)
+
+    report["export_dto"] = _time(lambda: [d.model_dump_json().encode() for d in dtos], repeat)
+    report["export_record"] = _time(lambda: [orjson.dumps(r, option=orjson.OPT_UTC_Z) for r in records], repeat)
+    # выгрузка записей должна совпадать с выгрузкой DTO байт в байт
+    report["export_mismatches"] = sum(
+        d.model_dump_json().encode() != orjson.dumps(r, option=orjson.OPT_UTC_Z) for d, r in zip(dtos, records)
+    )
+    report["plain_dict_mismatches"] = sum(d.to_plain_dict() != r.to_plain_dict() for d, r in zip(dtos, records))
+    return report
+
+
+async def live(repeat: int) -> Dict[str, Any]:
+    from sqlalchemy import select
+
+    from infrastructure.db.connect import dispose_engine, pg_connection
+
+    columns = [getattr(User, f.name) for f in fields(UserRecord)]
+    sessionmaker = pg_connection()
+
+    async def dto_path() -> int:
+        async with sessionmaker() as session:
+            users = (await session.execute(select(User))).scalars().all()
+            return len([UserDTO.model_validate(u) for u in users])
+
+    async def record_path() -> int:
+        async with sessionmaker() as session:
+            return len([UserRecord(*row) for row in await session.execute(select(*columns))])
+
+    report: Dict[str, Any] = {}
+    try:
+        for name, fn in (("db_dto", dto_path), ("db_record", record_path)):
+            timings = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                rows = await fn()
+                timings.append(time.perf_counter() - t0)
+            report[name] = {"rows": rows, "median_ms": statistics.median(timings) * 1000, "min_ms": min(timings) * 1000}
+    finally:
+        await dispose_engine()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", action="store_true", help="замер на таблице user из settings.pg")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    report = asyncio.run(live(args.repeat)) if args.db else offline(args.rows, args.repeat, args.seed)
+    report = {"rows": args.rows, **report}
+    for name, r in report.items():
+        if isinstance(r, dict):
+            extra = f"{r['us_per_row']:>8.2f} us/row {r['peak_mb']:>8.1f} MB" if "us_per_row" in r else ""
+            print(f"{name:<22}{r['median_ms']:>10.1f} ms {extra}")
+        else:
+            print(f"{name:<22}{r}")
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Профиль времени импорта приложения по `python -X importtime`.
+
+Запускает чистый интерпретатор, импортирует модуль (по умолчанию
+presentations.app) и сводит накопленное время по пакетам верхнего уровня.
+Холодный старт воркера и его перезапуск упираются именно в это время.
+
+    python -m benchmarks.import_time --top 15 --out import_time.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+
+def _run(module: str) -> Tuple[float, str]:
+    env = dict(os.environ)
+    env.setdefault("APP_PG__PORT", "5432")
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - t0) * 1000
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr[-2000:])
+    return wall_ms, proc.stderr
+
+
+def _parse(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    строки вида `import time: self [us] | cumulative | imported package`
+    -> (модуль, self_us, cumulative_us)
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cum_us)))
+    return rows
+
+
+def _by_package(rows: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    """
+    сумма self-времени по пакету верхнего уровня
+    """
+    totals: Dict[str, int] = {}
+    for name, self_us, _ in rows:
+        top = name.split(".", 1)[0]
+        totals[top] = totals.get(top, 0) + self_us
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="presentations.app")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    walls, packages = [], {}
+    for _ in range(args.repeat):
+        wall_ms, stderr = _run(args.module)
+        walls.append(wall_ms)
+        packages = _by_package(_parse(stderr))
+
+    ranked = sorted(packages.items(), key=lambda kv: kv[1], reverse=True)
+    print(f"{args.module}: wall min {min(walls):.0f} ms, import total {sum(packages.values()) / 1000:.0f} ms")
+    for name, us in ranked[: args.top]:
+        print(f"  {name:<28}{us / 1000:>10.1f} ms")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(
+                {"module": args.module, "wall_ms": walls, "packages_ms": {k: v / 1000 for k, v in ranked}},
+                f, indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Локальный OpenAI-совместимый стенд вместо удалённой LLM — для нагрузочного
+тестирования чата и матчинга без внешней сети.
+
+POST /v1/chat/completions:
+  - tool_choice на analyze_match / analyze_dialog — tool call с аргументами
+    формы MatchAns / DialogAnalysis, для прочих функций — по JSON-схеме parameters;
+  - без tools — текстовый ответ (JSON-объект профиля, если промпт просит JSON);
+  - stream=true — SSE-чанки chat.completion.chunk, включая стриминг tool_calls.
+Латентность: время до первого токена из распределения (--latency) + задержка
+на токен (--token-delay). Инъекция ошибок: HTTP-ошибки, зависания, битый JSON
+в аргументах tool call. GET /stats — счётчики ответов стенда.
+
+    python -m benchmarks.llm_mock --port 8100 --latency lognormal:0.8,0.5 --error-rate 0.02
+    APP_AI__BASE_URL=http://127.0.0.1:8100/v1 python main.py
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_SKILLS = [
+    "Python", "SQL", "Docker", "Kubernetes", "PostgreSQL", "FastAPI", "Kafka",
+    "Git", "Linux", "Airflow", "Spark", "React", "TypeScript", "Go", "Redis",
+]
+_WORDS = (
+    "по вашему опыту видно сильную базу в разработке сервисов стоит усилить "
+    "навыки проектирования систем и работы с облачной инфраструктурой рекомендую "
+    "начать с небольшого проекта на текущей работе и параллельно пройти курс"
+).split()
+_DECISIONS_HR = [(80, "Рекомендован к переходу"), (60, "Условно рекомендован"), (0, "Переход не рекомендован")]
+_DECISIONS_USER = [
+    (80, "Вы отлично подходите"), (50, "У вас хороший потенциал"),
+    (0, "Рекомендуем обратить внимание на другие вакансии"),
+]
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    fixed:S | uniform:A,B | normal:MU,SD | lognormal:MEDIAN,SIGMA — секунды
+    """
+    kind, _, raw = spec.partition(":")
+    args = [float(x) for x in raw.split(",") if x]
+    if kind == "fixed" and len(args) == 1:
+        return lambda rng: args[0]
+    if kind == "uniform" and len(args) == 2:
+        return lambda rng: rng.uniform(args[0], args[1])
+    if kind == "normal" and len(args) == 2:
+        return lambda rng: max(0.0, rng.gauss(args[0], args[1]))
+    if kind == "lognormal" and len(args) == 2:
+        mu = math.log(args[0])
+        return lambda rng: rng.lognormvariate(mu, args[1])
+    raise ValueError(f"bad latency spec: {spec!r}")
+
+
+@dataclass(slots=True)
+class MockConfig:
+    latency: str = "lognormal:0.8,0.5"
+    # для запросов с tools (матчинг, анализ диалога) — отдельно, они обычно дольше
+    tool_latency: Optional[str] = None
+    token_delay: float = 0.01
+    reply_words: int = 80
+    error_rate: float = 0.0
+    error_statuses: Tuple[int, ...] = (500, 429, 503)
+    hang_rate: float = 0.0
+    hang_seconds: float = 600.0
+    malformed_rate: float = 0.0
+    seed: Optional[int] = None
+    stats: Counter = field(default_factory=Counter)
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _prompt_text(messages: List[Dict[str, Any]]) -> str:
+    return "\n".join(str(m.get("content") or "") for m in messages)
+
+
+def _from_schema(rng: random.Random, schema: Dict[str, Any], defs: Dict[str, Any]) -> Any:
+    """
+    значение, удовлетворяющее простой JSON-схеме pydantic (object/array/string/int/number/bool)
+    """
+    if "$ref" in schema:
+        return _from_schema(rng, defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    if "anyOf" in schema:
+        return _from_schema(rng, next(s for s in schema["anyOf"] if s.get("type") != "null"), defs)
+    kind = schema.get("type")
+    if kind == "object":
+        props = schema.get("properties", {})
+        return {name: _from_schema(rng, sub, defs) for name, sub in props.items()}
+    if kind == "array":
+        return [_from_schema(rng, schema.get("items", {"type": "string"}), defs) for _ in range(rng.randint(1, 4))]
+    if kind == "integer":
+        return rng.randint(0, 100)
+    if kind == "number":
+        return round(rng.random() * 100, 2)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    return " ".join(rng.choices(_WORDS, k=8))
+
+
+def _tool_arguments(rng: random.Random, name: str, parameters: Dict[str, Any], prompt: str) -> Dict[str, Any]:
+    if name == "analyze_match":
+        score = int(min(100, max(0, rng.gauss(62, 18))))
+        bands = _DECISIONS_HR if "Рекомендован к переходу" in prompt else _DECISIONS_USER
+        decision = next(label for bound, label in bands if score >= bound)
+        return {"score": score, "decision": decision, "reasoning_report": " ".join(rng.choices(_WORDS, k=60))}
+    if name == "analyze_dialog":
+        return {
+            "new_hard_skills": rng.sample(_SKILLS, rng.randint(0, 3)),
+            "new_experience": " ".join(rng.choices(_WORDS, k=rng.randint(0, 25))),
+            "career_expectations": " ".join(rng.choices(_WORDS, k=rng.randint(0, 15))),
+        }
+    return _from_schema(rng, parameters, parameters.get("$defs", {}))
+
+
+def _text_reply(rng: random.Random, prompt: str, words: int) -> str:
+    if "JSON" in prompt:
+        return json.dumps({
+            "goals": " ".join(rng.choices(_WORDS, k=10)),
+            "skills": ", ".join(rng.sample(_SKILLS, 4)),
+            "experience": " ".join(rng.choices(_WORDS, k=15)),
+            "challenges": " ".join(rng.choices(_WORDS, k=10)),
+            "missing_skills": rng.sample(_SKILLS, 3),
+        }, ensure_ascii=False)
+    return " ".join(rng.choices(_WORDS, k=max(1, int(rng.gauss(words, words / 4)))))
+
+
+def _error(status: int) -> JSONResponse:
+    kind = "rate_limit_exceeded" if status == 429 else "server_error"
+    headers = {"retry-after": "1"} if status == 429 else None
+    return JSONResponse(
+        {"error": {"message": f"injected {status}", "type": kind, "code": kind}},
+        status_code=status,
+        headers=headers,
+    )
+
+
+def create_app(cfg: MockConfig) -> FastAPI:
+    rng = random.Random(cfg.seed)
+    latency = parse_latency(cfg.latency)
+    tool_latency = parse_latency(cfg.tool_latency) if cfg.tool_latency else latency
+    app = FastAPI(title="llm-mock")
+
+    @app.get("/v1/models")
+    async def models() -> Dict[str, Any]:
+        return {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]}
+
+    @app.get("/stats")
+    async def stats() -> Dict[str, int]:
+        return dict(cfg.stats)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        prompt = _prompt_text(messages)
+        model = body.get("model", "mock")
+        stream = bool(body.get("stream"))
+
+        roll = rng.random()
+        if roll < cfg.error_rate:
+            status = rng.choice(cfg.error_statuses)
+            cfg.stats[f"error_{status}"] += 1
+            await asyncio.sleep(latency(rng) / 4)
+            return _error(status)
+        if roll < cfg.error_rate + cfg.hang_rate:
+            cfg.stats["hang"] += 1
+            await asyncio.sleep(cfg.hang_seconds)
+            return _error(504)
+
+        tool = None
+        choice = body.get("tool_choice")
+        if body.get("tools") and choice != "none":
+            wanted = choice.get("function", {}).get("name") if isinstance(choice, dict) else None
+            tool = next(
+                (t["function"] for t in body["tools"] if wanted in (None, t["function"]["name"])),
+                body["tools"][0]["function"],
+            )
+
+        if tool is not None:
+            args = json.dumps(_tool_arguments(rng, tool["name"], tool.get("parameters", {}), prompt), ensure_ascii=False)
+            if rng.random() < cfg.malformed_rate:
+                cfg.stats["malformed"] += 1
+                args = args[: len(args) // 2]
+            content, tool_calls = None, [{
+                "id": f"call_{uuid.uuid4().hex[:24]}",
+                "type": "function",
+                "function": {"name": tool["name"], "arguments": args},
+            }]
+            completion_text = args
+            ttft = tool_latency(rng)
+        else:
+            content, tool_calls = _text_reply(rng, prompt, cfg.reply_words), None
+            completion_text = content
+            ttft = latency(rng)
+
+        usage = {
+            "prompt_tokens": _tokens(prompt),
+            "completion_tokens": _tokens(completion_text),
+            "total_tokens": _tokens(prompt) + _tokens(completion_text),
+        }
+        finish = "tool_calls" if tool_calls else "stop"
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        cfg.stats["stream" if stream else "ok"] += 1
+
+        if not stream:
+            await asyncio.sleep(ttft + cfg.token_delay * usage["completion_tokens"])
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content, "tool_calls": tool_calls},
+                    "finish_reason": finish,
+                }],
+                "usage": usage,
+            }
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, **extra: Any) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra,
+            }
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        async def events() -> AsyncIterator[str]:
+            await asyncio.sleep(ttft)
+            yield chunk({"role": "assistant", "content": "" if content is not None else None})
+            if tool_calls:
+                call = tool_calls[0]
+                yield chunk({"tool_calls": [{
+                    "index": 0, "id": call["id"], "type": "function",
+                    "function": {"name": call["function"]["name"], "arguments": ""},
+                }]})
+                args = call["function"]["arguments"]
+                for i in range(0, len(args), 16):
+                    await asyncio.sleep(cfg.token_delay * 4)
+                    yield chunk({"tool_calls": [{"index": 0, "function": {"arguments": args[i:i + 16]}}]})
+            else:
+                for i, word in enumerate(content.split(" ")):
+                    await asyncio.sleep(cfg.token_delay)
+                    yield chunk({"content": word if i == 0 else " " + word})
+            yield chunk({}, finish)
+            if include_usage:
+                payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                           "model": model, "choices": [], "usage": usage}
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default="lognormal:0.8,0.5", help="время до первого токена, напр. fixed:0.5")
+    parser.add_argument("--tool-latency", default=None, help="то же для запросов с tools")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="секунд на токен ответа")
+    parser.add_argument("--reply-words", type=int, default=80)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля HTTP-ошибок")
+    parser.add_argument("--error-statuses", default="500,429,503")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="доля запросов, которые зависают")
+    parser.add_argument("--hang-seconds", type=float, default=600.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="доля tool call с битым JSON")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    cfg = MockConfig(
+        latency=args.latency,
+        tool_latency=args.tool_latency,
+        token_delay=args.token_delay,
+        reply_words=args.reply_words,
+        error_rate=args.error_rate,
+        error_statuses=tuple(int(s) for s in args.error_statuses.split(",") if s),
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+    )
+    parse_latency(cfg.latency)
+    if cfg.tool_latency:
+        parse_latency(cfg.tool_latency)
+
+    import uvicorn
+
+    uvicorn.run(create_app(cfg), host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Нагрузочный тест AI-эндпоинтов: /chat, /start_chat и матчинг при заданном RPS.
+
+Открытая модель нагрузки: запросы стартуют по пуассоновскому расписанию
+независимо от ответов, поэтому деградация видна как рост латентности, а не
+как тихое падение RPS. Запросы сверх --max-inflight не отправляются и
+считаются отдельно (skipped). Отчёт — перцентили латентности и коды ответов
+по сценариям; --out сохраняет JSON.
+
+Поднять стенд LLM и API, направив API на стенд:
+
+    python -m benchmarks.llm_mock --port 8100 --latency lognormal:0.8,0.5
+    APP_AI__BASE_URL=http://127.0.0.1:8100/v1 python main.py
+
+и запустить нагрузку (id пользователей и вакансий берутся из API):
+
+    python -m benchmarks.loadtest --rps 20 --duration 60 \\
+        --mix chat=5,start_chat=1,user_match=2,vacancy_match=1,new_vacancy_match=1
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+_MESSAGES = [
+    "Хочу перейти из backend в data engineering, с чего начать?",
+    "Какие навыки мне подтянуть, чтобы стать тимлидом?",
+    "Я три года пишу на Python и немного знаю Kubernetes.",
+    "Посоветуй курсы по системному дизайну.",
+    "Интересно ли мне будет в DevOps, если я люблю автоматизацию?",
+]
+
+
+def _percentiles(values_ms: List[float]) -> Dict[str, float]:
+    ordered = sorted(values_ms)
+    pick = lambda p: ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+    return {
+        "p50_ms": pick(0.50), "p90_ms": pick(0.90), "p99_ms": pick(0.99),
+        "max_ms": ordered[-1], "mean_ms": sum(ordered) / len(ordered),
+    }
+
+
+class Target:
+    """
+    id из API и построение запросов по сценарию: (method, path, json)
+    """
+
+    def __init__(self, user_ids: List[str], vacancy_ids: List[str], seed: int) -> None:
+        self.user_ids = user_ids
+        self.vacancy_ids = vacancy_ids
+        self.rng = random.Random(seed)
+        self._new_vacancies: List[Dict[str, Any]] = []
+
+    def request(self, scenario: str) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+        rng = self.rng
+        if scenario == "chat":
+            return "PUT", f"/chat/{rng.choice(self.user_ids)}", {"text": rng.choice(_MESSAGES)}
+        if scenario == "start_chat":
+            return "PUT", f"/start_chat/{rng.choice(self.user_ids)}", None
+        if scenario == "user_match":
+            return "PUT", f"/{rng.choice(self.user_ids)}/matching", None
+        if scenario == "vacancy_match":
+            return "PUT", f"/vac/{rng.choice(self.vacancy_ids)}/matching", None
+        if scenario == "new_vacancy_match":
+            if not self._new_vacancies:
+                from benchmarks.synthetic import make_vacancies
+
+                self._new_vacancies = [
+                    v.model_dump(mode="json", exclude={"id", "created_at", "updated_at"})
+                    for v in make_vacancies(50, seed=rng.randrange(1 << 30))
+                ]
+            return "PUT", "/matching/vacancy", rng.choice(self._new_vacancies)
+        raise ValueError(scenario)
+
+
+SCENARIOS = ["chat", "start_chat", "user_match", "vacancy_match", "new_vacancy_match"]
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"unknown scenario {name!r}, есть: {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def _fetch_ids(session: aiohttp.ClientSession, base: str, path: str, limit: int) -> List[str]:
+    async with session.get(f"{base}{path}", params={"brief": "true", "limit": str(limit)}) as resp:
+        resp.raise_for_status()
+        return [row["id"] for row in await resp.json()]
+
+
+async def run(
+    base: str, rps: float, duration: float, mix: Dict[str, float], max_inflight: int,
+    timeout: float, seed: int, id_limit: int,
+) -> Dict[str, Any]:
+    connector = aiohttp.TCPConnector(limit=max_inflight)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        user_ids = await _fetch_ids(session, base, "/get_all_users", id_limit)
+        vacancy_ids = await _fetch_ids(session, base, "/vacancy", id_limit)
+        if not user_ids or ("vacancy_match" in mix and not vacancy_ids):
+            raise SystemExit("в API нет пользователей или вакансий для нагрузки")
+        target = Target(user_ids, vacancy_ids, seed)
+
+        names, weights = list(mix), list(mix.values())
+        latencies: Dict[str, List[float]] = {name: [] for name in names}
+        statuses: Dict[str, Counter] = {name: Counter() for name in names}
+        skipped: Counter = Counter()
+        inflight = 0
+        tasks = []
+
+        async def one(scenario: str) -> None:
+            nonlocal inflight
+            method, path, payload = target.request(scenario)
+            started = time.perf_counter()
+            try:
+                async with session.request(method, f"{base}{path}", json=payload) as resp:
+                    await resp.read()
+                    outcome = str(resp.status)
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+            except aiohttp.ClientError as e:
+                outcome = type(e).__name__
+            finally:
+                inflight -= 1
+            latencies[scenario].append((time.perf_counter() - started) * 1000)
+            statuses[scenario][outcome] += 1
+
+        rng = random.Random(seed)
+        started = time.perf_counter()
+        next_at = started
+        while next_at - started < duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            scenario = rng.choices(names, weights)[0]
+            if inflight >= max_inflight:
+                skipped[scenario] += 1
+            else:
+                inflight += 1
+                tasks.append(asyncio.create_task(one(scenario)))
+            next_at += rng.expovariate(rps)
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    report: Dict[str, Any] = {"elapsed_s": elapsed, "target_rps": rps, "scenarios": {}}
+    for name in names:
+        done = latencies[name]
+        report["scenarios"][name] = {
+            "sent": len(done),
+            "skipped": skipped[name],
+            "achieved_rps": len(done) / elapsed,
+            "statuses": dict(statuses[name]),
+            "latency": _percentiles(done) if done else None,
+        }
+    return report
+
+
+def _print(report: Dict[str, Any]) -> None:
+    print(f"{'scenario':<20}{'sent':>7}{'skip':>6}{'rps':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}  statuses")
+    for name, r in report["scenarios"].items():
+        lat = r["latency"] or {}
+        cols = "".join(f"{lat.get(k, 0):>10.0f}" for k in ("p50_ms", "p90_ms", "p99_ms", "max_ms"))
+        print(f"{name:<20}{r['sent']:>7}{r['skipped']:>6}{r['achieved_rps']:>7.1f}{cols}  {r['statuses']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--rps", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=30.0, help="секунд нагрузки")
+    parser.add_argument("--mix", default="chat=5,start_chat=1,user_match=2,vacancy_match=1")
+    parser.add_argument("--max-inflight", type=int, default=512)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--id-limit", type=int, default=500, help="сколько id пользователей/вакансий взять из API")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    report = asyncio.run(run(
+        args.base_url.rstrip("/"), args.rps, args.duration, mix,
+        args.max_inflight, args.timeout, args.seed, args.id_limit,
+    ))
+    _print(report)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Бенчмарк матчера на синтетической популяции (benchmarks.synthetic).
+
+Замеряет canonicalize_skills_with_lexicon, skills_scores, text_similarity,
+compute_match и пакетный score_users на 1k/10k/100k пар: время, пропускную
+способность и пиковую память (tracemalloc, отдельным прогоном). Результаты
+пишутся в JSON с хэшем коммита; --compare показывает изменение к прошлому прогону.
+
+    python -m benchmarks.matcher --sizes 1000,10000,100000 --out bench/matcher.json
+    python -m benchmarks.matcher --sizes 1000 --compare bench/matcher.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from benchmarks.synthetic import make_users, make_vacancies
+from matcher.batch import score_users
+from matcher.config import MatcherConfig
+from matcher.normalization import canonicalize_skills_with_lexicon
+from matcher.scorer import compute_match
+from matcher.skills import skills_scores
+from matcher.textsim import text_similarity
+from schemas.schemas import UserDTO, VacancyDTO
+
+USER_POOL = 2000
+VACANCY_POOL = 50
+
+Pairs = List[Tuple[UserDTO, VacancyDTO]]
+
+
+def make_pairs(n: int, users: Sequence[UserDTO], vacancies: Sequence[VacancyDTO]) -> Pairs:
+    """
+    пары идут блоками по вакансии — как в vacancy_match, чтобы пакетный путь был сравним
+    """
+    u = len(users)
+    return [(users[i % u], vacancies[(i // u) % len(vacancies)]) for i in range(n)]
+
+
+def _op_canonicalize(pairs: Pairs, cfg: MatcherConfig) -> None:
+    for user, _ in pairs:
+        canonicalize_skills_with_lexicon(user.hard_skills)
+
+
+def _op_skills(pairs: Pairs, cfg: MatcherConfig) -> None:
+    s = cfg.skills
+    for user, vac in pairs:
+        skills_scores(
+            user.hard_skills, vac.must_have, vac.nice_to_have,
+            s.threshold_must, s.threshold_nice, s.neutral_must, s.neutral_nice,
+        )
+
+
+def _op_text(pairs: Pairs, cfg: MatcherConfig) -> None:
+    for user, vac in pairs:
+        text_similarity(
+            user.experience_description, vac.description,
+            use_tfidf=cfg.text.use_tfidf, neutral_if_empty=cfg.text.neutral_if_empty,
+        )
+
+
+def _op_compute_match(pairs: Pairs, cfg: MatcherConfig) -> None:
+    for user, vac in pairs:
+        compute_match(user, vac, cfg)
+
+
+def _op_batch(pairs: Pairs, cfg: MatcherConfig) -> None:
+    start = 0
+    while start < len(pairs):
+        vac = pairs[start][1]
+        stop = start
+        while stop < len(pairs) and pairs[stop][1] is vac:
+            stop += 1
+        score_users(vac, [u for u, _ in pairs[start:stop]], cfg)
+        start = stop
+
+
+OPS: Dict[str, Callable[[Pairs, MatcherConfig], None]] = {
+    "canonicalize_skills_with_lexicon": _op_canonicalize,
+    "skills_scores": _op_skills,
+    "text_similarity": _op_text,
+    "compute_match": _op_compute_match,
+    "batch_score_users": _op_batch,
+}
+
+
+def _timed(fn: Callable[[Pairs, MatcherConfig], None], pairs: Pairs, cfg: MatcherConfig) -> float:
+    gc.collect()
+    t0 = time.perf_counter()
+    fn(pairs, cfg)
+    return time.perf_counter() - t0
+
+
+def _peak_kb(fn: Callable[[Pairs, MatcherConfig], None], pairs: Pairs, cfg: MatcherConfig) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn(pairs, cfg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def run(sizes: List[int], ops: List[str], mem_pairs: int, seed: int) -> Dict[str, Any]:
+    cfg = MatcherConfig()
+    t0 = time.perf_counter()
+    users = make_users(min(max(sizes), USER_POOL), seed=seed)
+    vacancies = make_vacancies(VACANCY_POOL, seed=seed + 1)
+    generate_s = time.perf_counter() - t0
+
+    # прогрев: индекс навыков, ленивый импорт sklearn
+    warm = make_pairs(10, users, vacancies)
+    for name in ops:
+        OPS[name](warm, cfg)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in ops:
+        results[name] = {}
+        for n in sizes:
+            pairs = make_pairs(n, users, vacancies)
+            seconds = _timed(OPS[name], pairs, cfg)
+            mem_n = min(n, mem_pairs)
+            results[name][str(n)] = {
+                "seconds": seconds,
+                "per_sec": n / seconds if seconds else None,
+                "us_per_op": seconds / n * 1e6,
+                "peak_kb": _peak_kb(OPS[name], pairs[:mem_n], cfg),
+                "peak_pairs": mem_n,
+            }
+            r = results[name][str(n)]
+            print(f"{name:<34}{n:>8}{r['seconds']:>10.2f}s{r['per_sec']:>12.0f}/s{r['peak_kb']:>12.0f} KB")
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "seed": seed,
+            "user_pool": len(users),
+            "vacancy_pool": len(vacancies),
+            "generate_s": generate_s,
+        },
+        "results": results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline['meta']['commit']} ({baseline_path}): throughput ratio, >1 — быстрее")
+    for name, by_size in report["results"].items():
+        for n, r in by_size.items():
+            b = baseline["results"].get(name, {}).get(n)
+            if b and b.get("per_sec") and r.get("per_sec"):
+                print(f"  {name:<34}{n:>8}{r['per_sec'] / b['per_sec']:>8.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--ops", default=",".join(OPS), help=f"из: {', '.join(OPS)}")
+    parser.add_argument("--mem-pairs", type=int, default=1000, help="пар в прогоне под tracemalloc")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="куда сохранить JSON с результатами")
+    parser.add_argument("--compare", default=None, help="JSON прошлого прогона")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    ops = [o for o in args.ops.split(",") if o]
+    unknown = set(ops) - set(OPS)
+    if unknown:
+        parser.error(f"unknown ops: {', '.join(sorted(unknown))}")
+
+    print(f"{'op':<34}{'pairs':>8}{'time':>11}{'throughput':>14}{'peak mem':>15}")
+    report = run(sizes, ops, args.mem_pairs, args.seed)
+    if args.compare:
+        compare(report, args.compare)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Бенчмарк и проверка качества парсера вакансий (utils.txt_parse) на размеченном корпусе.
+
+Корпус — JSONL: {"id", "text", "labels": {"must", "nice", "years_min", "years_max"}},
+навыки в метках — каноны SKILL_LEXICON. По умолчанию benchmarks/corpus/vacancies.jsonl.
+
+Отчёт: перцентили латентности на документ (parse_vacancy_text целиком и стадии
+split_sections / extract_years / extract_skills_block), precision/recall/F1 по
+must, nice и всем навыкам, точность лет. --check сравнивает качество с прошлым
+прогоном и завершается с кодом 1 при деградации — ускорение парсера принимается,
+только если качество не упало.
+
+    python -m benchmarks.parser --out bench/parser.json
+    python -m benchmarks.parser --check bench/parser.json
+    python -m benchmarks.parser export --out corpus_draft.jsonl   # тексты из БД, черновые метки
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from utils.txt_parse import extract_skills_block, extract_years, normalize, parse_vacancy_text, split_sections
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "corpus", "vacancies.jsonl")
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _percentiles(values_ms: Sequence[float]) -> Dict[str, float]:
+    ordered = sorted(values_ms)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+    return {
+        "p50_ms": pct(0.50),
+        "p90_ms": pct(0.90),
+        "p99_ms": pct(0.99),
+        "max_ms": ordered[-1],
+        "mean_ms": statistics.fmean(ordered),
+    }
+
+
+def _stage_timings(text: str) -> Dict[str, float]:
+    """
+    те же шаги, что в parse_vacancy_text, с замером каждого
+    """
+    t0 = time.perf_counter()
+    norm = normalize(text)
+    sections = split_sections(norm)
+    t1 = time.perf_counter()
+    extract_years(sections["must"] or norm)
+    t2 = time.perf_counter()
+    extract_skills_block(sections["must"])
+    if sections["nice"]:
+        extract_skills_block(sections["nice"])
+    t3 = time.perf_counter()
+    return {
+        "split_sections": (t1 - t0) * 1000,
+        "extract_years": (t2 - t1) * 1000,
+        "extract_skills_block": (t3 - t2) * 1000,
+    }
+
+
+def latency(corpus: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    parse_ms: List[float] = []
+    stages: Dict[str, List[float]] = {}
+    for _ in range(repeat):
+        for doc in corpus:
+            t0 = time.perf_counter()
+            parse_vacancy_text(doc["text"])
+            parse_ms.append((time.perf_counter() - t0) * 1000)
+            for stage, ms in _stage_timings(doc["text"]).items():
+                stages.setdefault(stage, []).append(ms)
+    return {
+        "parse_vacancy_text": _percentiles(parse_ms),
+        "stages": {stage: _percentiles(ms) for stage, ms in stages.items()},
+        "docs_per_sec": len(parse_ms) / (sum(parse_ms) / 1000),
+    }
+
+
+class _PRF:
+    def __init__(self) -> None:
+        self.tp = self.fp = self.fn = 0
+
+    def add(self, predicted: Set[str], expected: Set[str]) -> None:
+        self.tp += len(predicted & expected)
+        self.fp += len(predicted - expected)
+        self.fn += len(expected - predicted)
+
+    def report(self) -> Dict[str, float]:
+        p = self.tp / (self.tp + self.fp) if self.tp + self.fp else 1.0
+        r = self.tp / (self.tp + self.fn) if self.tp + self.fn else 1.0
+        f1 = 2 * p * r / (p + r) if p + r else 0.0
+        return {"precision": p, "recall": r, "f1": f1, "tp": self.tp, "fp": self.fp, "fn": self.fn}
+
+
+def quality(corpus: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    micro-усреднение по корпусу; «all» — навыки без учёта секции must/nice
+    """
+    must, nice, both = _PRF(), _PRF(), _PRF()
+    years_min_ok = years_max_ok = 0
+    per_doc = []
+    for doc in corpus:
+        labels = doc["labels"]
+        res = parse_vacancy_text(doc["text"])
+        pm, pn = set(res.must_have), set(res.nice_to_have)
+        em, en = set(labels["must"]), set(labels["nice"])
+        must.add(pm, em)
+        nice.add(pn, en)
+        both.add(pm | pn, em | en)
+        ymin_ok = res.years_total_min == labels["years_min"]
+        ymax_ok = res.years_total_max == labels["years_max"]
+        years_min_ok += ymin_ok
+        years_max_ok += ymax_ok
+        per_doc.append({
+            "id": doc["id"],
+            "must_missed": sorted(em - pm),
+            "must_extra": sorted(pm - em),
+            "nice_missed": sorted(en - pn),
+            "nice_extra": sorted(pn - en),
+            "years": [res.years_total_min, res.years_total_max],
+            "years_expected": [labels["years_min"], labels["years_max"]],
+        })
+    n = len(corpus)
+    return {
+        "must": must.report(),
+        "nice": nice.report(),
+        "all": both.report(),
+        "years_min_accuracy": years_min_ok / n,
+        "years_max_accuracy": years_max_ok / n,
+        "per_doc": per_doc,
+    }
+
+
+QUALITY_KEYS = [
+    ("must", "f1"), ("nice", "f1"), ("all", "f1"),
+    ("must", "precision"), ("must", "recall"),
+    ("years_min_accuracy", None), ("years_max_accuracy", None),
+]
+
+
+def check(report: Dict[str, Any], baseline_path: str, tolerance: float) -> List[str]:
+    """
+    список деградаций качества относительно прошлого прогона
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        base = json.load(f)["quality"]
+    failures = []
+    for key, sub in QUALITY_KEYS:
+        now = report["quality"][key] if sub is None else report["quality"][key][sub]
+        was = base[key] if sub is None else base[key][sub]
+        if now < was - tolerance:
+            failures.append(f"{key}{'.' + sub if sub else ''}: {was:.3f} -> {now:.3f}")
+    return failures
+
+
+def _print(report: Dict[str, Any]) -> None:
+    lat = report["latency"]
+    p = lat["parse_vacancy_text"]
+    print(f"parse_vacancy_text: p50 {p['p50_ms']:.2f} ms, p90 {p['p90_ms']:.2f}, p99 {p['p99_ms']:.2f}, "
+          f"max {p['max_ms']:.2f}; {lat['docs_per_sec']:.0f} docs/s")
+    for stage, s in lat["stages"].items():
+        print(f"  {stage:<22} p50 {s['p50_ms']:.2f} ms, p99 {s['p99_ms']:.2f}")
+    q = report["quality"]
+    for key in ("must", "nice", "all"):
+        r = q[key]
+        print(f"{key:<5} P {r['precision']:.3f}  R {r['recall']:.3f}  F1 {r['f1']:.3f}  (tp {r['tp']}, fp {r['fp']}, fn {r['fn']})")
+    print(f"years: min {q['years_min_accuracy']:.2%}, max {q['years_max_accuracy']:.2%}")
+
+
+async def _export(out: str, limit: Optional[int]) -> None:
+    """
+    тексты вакансий из БД + текущий вывод парсера как черновые метки для ручной разметки
+    """
+    from services.parsing_service import parsing_service
+
+    written = 0
+    with open(out, "w", encoding="utf-8") as f:
+        async for vac in parsing_service.iter_vacancies():
+            res = parse_vacancy_text(vac.description)
+            f.write(json.dumps({
+                "id": str(vac.id),
+                "text": vac.description,
+                "labels": {
+                    "must": res.must_have,
+                    "nice": res.nice_to_have,
+                    "years_min": res.years_total_min,
+                    "years_max": res.years_total_max,
+                },
+            }, ensure_ascii=False) + "\n")
+            written += 1
+            if limit and written >= limit:
+                break
+    print(f"{written} vacancies -> {out} (метки черновые: проверить вручную)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "export"])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--check", default=None, help="JSON прошлого прогона: выход 1 при падении качества")
+    parser.add_argument("--tolerance", type=float, default=0.0)
+    parser.add_argument("--limit", type=int, default=None, help="export: не больше N вакансий")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        asyncio.run(_export(args.out or "corpus_draft.jsonl", args.limit))
+        return
+
+    corpus = load_corpus(args.corpus)
+    parse_vacancy_text(corpus[0]["text"])  # прогрев индексов rapidfuzz
+    report = {"corpus": args.corpus, "docs": len(corpus), "latency": latency(corpus, args.repeat), "quality": quality(corpus)}
+    _print(report)
+
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.check:
+        failures = check(report, args.check, args.tolerance)
+        if failures:
+            print("quality regression:\n  " + "\n  ".join(failures))
+            sys.exit(1)
+        print("quality: no regression")
+
+
+if __name__ == "__main__":
+    main()
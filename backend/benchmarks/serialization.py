@@ -0,0 +1,124 @@
+"""
+Сравнение сериализации списков DTO: путь FastAPI по умолчанию
+(валидация response_model + json.dumps) против presentations.responses.json_list
+(dump_python + orjson), TypeAdapter.dump_json и ORJSONResponse.
+
+    python -m benchmarks.serialization --items 5000 --desc-kb 4
+"""
+import argparse
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+import orjson
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from presentations.responses import json_list
+from schemas.schemas import VacancyDTO
+from utils.patterns.skills import SKILL_LEXICON
+
+
+def make_vacancies(n: int, desc_kb: int) -> List[VacancyDTO]:
+    skills = list(SKILL_LEXICON)
+    base = "Разработка backend-сервисов на Python, проектирование API, работа с PostgreSQL. "
+    description = (base * (desc_kb * 1024 // len(base) + 1))[: desc_kb * 1024]
+    now = datetime.utcnow()
+    return [
+        VacancyDTO(
+            id=uuid.uuid4(),
+            name=f"Вакансия {i}",
+            description=description,
+            min_exp_months=12 * (i % 5),
+            max_exp_months=12 * (i % 5) + 36,
+            must_have=[skills[(i * 7 + k) % len(skills)] for k in range(5)],
+            nice_to_have=[skills[(i * 11 + k) % len(skills)] for k in range(3)],
+            created_at=now - timedelta(seconds=i),
+            updated_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def _timeit(fn: Callable[[], object], repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings)}
+
+
+def micro(items: List[VacancyDTO], repeat: int) -> dict:
+    adapter = TypeAdapter(List[VacancyDTO])
+
+    def default_path() -> bytes:
+        # то, что делает FastAPI: повторная валидация, приведение к JSON-типам, json.dumps
+        validated = adapter.validate_python(items, from_attributes=True)
+        payload = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def orjson_path() -> bytes:
+        return orjson.dumps(adapter.dump_python(items))
+
+    def dump_json_path() -> bytes:
+        return adapter.dump_json(items)
+
+    return {
+        "fastapi_default": _timeit(default_path, repeat),
+        "orjson_dump_python": _timeit(orjson_path, repeat),
+        "typeadapter_dump_json": _timeit(dump_json_path, repeat),
+    }
+
+
+def end_to_end(items: List[VacancyDTO], repeat: int) -> dict:
+    app = FastAPI()
+
+    @app.get("/default")
+    async def default() -> List[VacancyDTO]:
+        return items
+
+    @app.get("/orjson", response_class=ORJSONResponse)
+    async def orjson_route() -> List[VacancyDTO]:
+        return items
+
+    @app.get("/fast", response_model=List[VacancyDTO])
+    async def fast():
+        return json_list(items, VacancyDTO)
+
+    client = TestClient(app)
+    return {name: _timeit(lambda: client.get(f"/{name}"), repeat) for name in ("default", "orjson", "fast")}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--desc-kb", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    items = make_vacancies(args.items, args.desc_kb)
+    report = {
+        "items": args.items,
+        "desc_kb": args.desc_kb,
+        "micro": micro(items, args.repeat),
+        "http": end_to_end(items, args.repeat),
+    }
+    for section in ("micro", "http"):
+        print(section)
+        for name, r in report[section].items():
+            print(f"  {name:<24}{r['median_ms']:>10.1f} ms (min {r['min_ms']:.1f})")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
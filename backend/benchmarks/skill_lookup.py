@@ -0,0 +1,130 @@
+"""
+Fuzzy-поиск навыка по словарю: полный перебор process.extractOne(token_set_ratio)
+против триграммного индекса matcher.fuzzy_index.TrigramIndex.
+
+Словарь масштабируется синтетическими вариантами (суффиксы, префиксы, составные
+названия, выдуманные продукты) до --scales × текущего размера. Запросы — навыки
+синтетических пользователей с опечатками (без точных попаданий — их снимает
+словарь до fuzzy). Для каждого масштаба: время на запрос, число сравнений
+rapidfuzz и расхождения с перебором при --threshold (должно быть 0).
+
+    python -m benchmarks.skill_lookup --scales 1,10 --out bench/skill_lookup.json
+"""
+import argparse
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+from rapidfuzz import fuzz, process
+
+from benchmarks.synthetic import make_users
+from matcher.fuzzy_index import TrigramIndex
+from matcher.lexicon import get_skill_index
+
+_PREFIXES = ["apache", "google", "aws", "azure", "yandex", "open", "micro", "hyper", "cloud", "enterprise"]
+_SUFFIXES = ["sdk", "cloud", "studio", "core", "pro", "lite", "db", "ml", "ops", "streams", "framework", "api"]
+_SYLLABLES = ["ka", "ro", "vi", "zen", "lo", "tra", "nex", "qu", "mi", "dor", "flux", "sta", "ly", "pi", "gon"]
+
+
+def scale_variants(base: List[str], factor: int, seed: int) -> List[str]:
+    """
+    base + синтетические уникальные варианты до len(base) * factor
+    """
+    rng = random.Random(seed)
+    out = list(base)
+    seen = set(out)
+    while len(out) < len(base) * factor:
+        v = rng.choice(base)
+        roll = rng.random()
+        if roll < 0.3:
+            new = f"{v} {rng.choice(_SUFFIXES)}"
+        elif roll < 0.5:
+            new = f"{rng.choice(_PREFIXES)} {v}"
+        elif roll < 0.7:
+            new = f"{v} {rng.choice(base).split()[0]}"
+        else:
+            new = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+            if rng.random() < 0.4:
+                new += f" {rng.choice(_SUFFIXES)}"
+        if new not in seen:
+            seen.add(new)
+            out.append(new)
+    return out
+
+
+def make_queries(n: int, variants: List[str], seed: int) -> List[str]:
+    exact = set(variants)
+    queries: List[str] = []
+    for user in make_users(max(1, n // 5), seed=seed, noise=0.4, off_lexicon=0.1):
+        for s in user.hard_skills:
+            sn = " ".join(s.strip().lower().split())
+            if sn and sn not in exact:
+                queries.append(sn)
+    return queries[:n]
+
+
+def run(scales: List[int], n_queries: int, threshold: float, seed: int) -> Dict[str, Any]:
+    _, _, base = get_skill_index()
+    results: Dict[str, Any] = {}
+    for factor in scales:
+        variants = scale_variants(base, factor, seed)
+        queries = make_queries(n_queries, variants, seed)
+
+        t0 = time.perf_counter()
+        index = TrigramIndex(variants)
+        build_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        brute = [process.extractOne(q, variants, scorer=fuzz.token_set_ratio) for q in queries]
+        brute_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        fast = [index.extract_one(q, threshold) for q in queries]
+        index_s = time.perf_counter() - t0
+
+        comparisons = 0
+        for q in queries:
+            idxs = index.candidates(q, threshold)
+            comparisons += len(variants) if idxs is None else len(idxs)
+
+        def accepted(r):
+            return (r[0], r[1]) if r and r[1] >= threshold else None
+
+        mismatches = sum(accepted(b) != accepted(f) for b, f in zip(brute, fast))
+        results[str(factor)] = r = {
+            "variants": len(variants),
+            "queries": len(queries),
+            "build_ms": build_s * 1000,
+            "brute_us": brute_s / len(queries) * 1e6,
+            "index_us": index_s / len(queries) * 1e6,
+            "speedup": brute_s / index_s,
+            "comparisons_per_query": comparisons / len(queries),
+            "comparison_fraction": comparisons / len(queries) / len(variants),
+            "mismatches": mismatches,
+        }
+        print(f"{factor:>5}x{r['variants']:>10}{r['build_ms']:>10.0f}{r['brute_us']:>12.1f}{r['index_us']:>12.1f}"
+              f"{r['speedup']:>9.1f}x{r['comparisons_per_query']:>10.1f}{r['mismatches']:>10}")
+    return {"threshold": threshold, "seed": seed, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1,10", help="множители размера словаря")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--threshold", type=float, default=90, help="fuzzy_threshold канонизации")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    print(f"{'scale':>6}{'variants':>10}{'build ms':>10}{'brute us':>12}{'index us':>12}{'speedup':>10}{'compares':>10}{'mismatch':>10}")
+    report = run([int(s) for s in args.scales.split(",") if s], args.queries, args.threshold, args.seed)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
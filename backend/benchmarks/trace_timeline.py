@@ -0,0 +1,110 @@
+"""
+Спаны из JSONL-экспортёра (APP_TRACING__EXPORTER=jsonl) -> Chrome trace events
+для chrome://tracing или ui.perfetto.dev: flame-таймлайн каждого запроса.
+
+Каждая трасса — отдельный «процесс», параллельные ветки (gather по навыкам,
+fetch-запросы, пачки скоринга) раскладываются по отдельным дорожкам.
+
+    python -m benchmarks.trace_timeline traces-*.jsonl --out timeline.json
+    python -m benchmarks.trace_timeline traces-*.jsonl --summary
+"""
+import argparse
+import glob
+import json
+from datetime import datetime
+from typing import Any, Dict, List
+
+
+def _ts_us(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1_000_000
+
+
+def load_spans(patterns: List[str]) -> List[Dict[str, Any]]:
+    spans = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        spans.append(json.loads(line))
+    return spans
+
+
+def _assign_lanes(spans: List[Dict[str, Any]]) -> List[int]:
+    """
+    дорожка на спан: вложенные спаны идут в дорожку родителя,
+    пересекающиеся по времени соседи — в новую
+    """
+    lanes: List[List[float]] = []  # стек концов открытых спанов на дорожке
+    out = []
+    for s in spans:
+        start, end = s["_start"], s["_end"]
+        for i, stack in enumerate(lanes):
+            while stack and stack[-1] <= start:
+                stack.pop()
+            if not stack or stack[-1] >= end:
+                stack.append(end)
+                out.append(i)
+                break
+        else:
+            lanes.append([end])
+            out.append(len(lanes) - 1)
+    return out
+
+
+def to_chrome_trace(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    by_trace: Dict[str, List[Dict[str, Any]]] = {}
+    for s in spans:
+        s["_start"] = _ts_us(s["start_time"])
+        s["_end"] = _ts_us(s["end_time"])
+        by_trace.setdefault(s["context"]["trace_id"], []).append(s)
+
+    events = []
+    for pid, (trace_id, items) in enumerate(sorted(by_trace.items(), key=lambda kv: min(s["_start"] for s in kv[1]))):
+        items.sort(key=lambda s: (s["_start"], -s["_end"]))
+        root = next((s for s in items if not s.get("parent_id")), items[0])
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"{root['name']} {trace_id[-8:]}"}})
+        for s, lane in zip(items, _assign_lanes(items)):
+            events.append({
+                "name": s["name"],
+                "ph": "X",
+                "pid": pid,
+                "tid": lane,
+                "ts": s["_start"],
+                "dur": max(0.0, s["_end"] - s["_start"]),
+                "args": {**s.get("attributes", {}), "status": s.get("status", {}).get("status_code")},
+            })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def summary(spans: List[Dict[str, Any]]) -> None:
+    """
+    суммарное и среднее время по имени спана
+    """
+    totals: Dict[str, List[float]] = {}
+    for s in spans:
+        dur_ms = (_ts_us(s["end_time"]) - _ts_us(s["start_time"])) / 1000
+        totals.setdefault(s["name"], []).append(dur_ms)
+    print(f"{'span':<48}{'count':>8}{'total ms':>12}{'mean ms':>10}")
+    for name, durs in sorted(totals.items(), key=lambda kv: sum(kv[1]), reverse=True):
+        print(f"{name[:47]:<48}{len(durs):>8}{sum(durs):>12.1f}{sum(durs) / len(durs):>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", help="JSONL-файлы спанов (glob)")
+    parser.add_argument("--out", default="timeline.json")
+    parser.add_argument("--summary", action="store_true", help="только сводка по именам спанов")
+    args = parser.parse_args()
+
+    spans = load_spans(args.files)
+    if args.summary:
+        summary(spans)
+        return
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(to_chrome_trace(spans), f, ensure_ascii=False)
+    print(f"{len(spans)} spans -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ from dotenv import load_dotenv
 load_dotenv()
 PG_USER = str(os.getenv('APP_PG__USER'))
 PG_HOST = str(os.getenv('APP_PG__HOST'))
-PG_PORT = int((os.getenv('APP_PG__PORT')))
+PG_PORT = int(os.getenv('APP_PG__PORT', '5432'))
 PG_PASSWORD = str(os.getenv('APP_PG__PASSWORD'))
 PG_DATABASE = str(os.getenv('APP_PG__DATABASE'))
 AI_API_KEY = str(os.getenv('APP_AI__API_KEY'))
\ No newline at end of file
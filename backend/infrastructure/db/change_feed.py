@@ -0,0 +1,172 @@
+import asyncio
+import inspect
+import random
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+import asyncpg
+import orjson
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from settings.settings import settings
+
+# канал событий репозиториев: {"entity": "user", "ids": [...]} ; ids = null — сброс всей сущности
+CHANNEL = "entity_change"
+# pg_notify ограничивает payload 8000 байт — большие пачки уходят как сброс сущности
+MAX_IDS_PER_EVENT = 150
+
+Ids = Optional[List[str]]
+Handler = Callable[[Ids], Union[None, Awaitable[None]]]
+
+
+async def notify_change(session: AsyncSession, entity: str, ids: Optional[Iterable[Any]] = None) -> None:
+    """
+    событие изменения в транзакции session: Postgres доставит его слушателям
+    только после COMMIT и отбросит при ROLLBACK
+    """
+    id_list = None if ids is None else [str(i) for i in ids]
+    if id_list is not None and len(id_list) > MAX_IDS_PER_EVENT:
+        id_list = None
+    payload = orjson.dumps({"entity": entity, "ids": id_list}).decode()
+    await session.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+
+class ChangeFeed:
+    """
+    LISTEN на отдельном соединении asyncpg (не из пула SQLAlchemy) и раздача
+    событий обработчикам инвалидации этого процесса.
+    пока соединения нет, события теряются, поэтому после каждого (пере)подключения
+    все обработчики получают полный сброс (ids=None)
+    """
+
+    def __init__(self) -> None:
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._channels: Dict[str, List[Handler]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._pending: set = set()
+        self._live = False
+
+    @property
+    def live(self) -> bool:
+        """
+        слушатель подключён: кэш, который не может позволить устаревание, без него не читается
+        """
+        return self._live
+
+    def on_change(self, entity: str) -> Callable[[Handler], Handler]:
+        """
+        регистрация обработчика изменений сущности (user, vacancy, ...):
+        handler(ids) — ids изменённых строк или None, если сбросить надо всё
+        """
+        def decorator(handler: Handler) -> Handler:
+            self._handlers.setdefault(entity, []).append(handler)
+            return handler
+        return decorator
+
+    def on_channel(self, channel: str) -> Callable[[Handler], Handler]:
+        """
+        обработчик стороннего канала NOTIFY (например, skill_lexicon из триггера):
+        handler(None) на любое событие канала и на полный сброс
+        """
+        def decorator(handler: Handler) -> Handler:
+            self._channels.setdefault(channel, []).append(handler)
+            return handler
+        return decorator
+
+    async def start(self) -> None:
+        if settings.changes.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._live = False
+
+    async def _connect(self) -> asyncpg.Connection:
+        pg = settings.pg
+        return await asyncpg.connect(
+            host=pg.host, port=pg.port, user=pg.username, password=pg.password, database=pg.database,
+        )
+
+    async def _run(self) -> None:
+        delay = settings.changes.reconnect_min_s
+        while True:
+            conn: Optional[asyncpg.Connection] = None
+            lost = asyncio.Event()
+            try:
+                conn = await self._connect()
+                conn.add_termination_listener(lambda _conn: lost.set())
+                await conn.add_listener(CHANNEL, self._on_notify)
+                for channel in self._channels:
+                    await conn.add_listener(channel, self._on_notify)
+                self._live = True
+                delay = settings.changes.reconnect_min_s
+                self.flush_all()
+                await self._watch(conn, lost)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Change feed connection lost: {e}")
+            finally:
+                self._live = False
+                if conn is not None and not conn.is_closed():
+                    conn.terminate()
+            # джиттер, чтобы воркеры не переподключались к БД одновременно
+            await asyncio.sleep(delay * (0.5 + random.random()))
+            delay = min(delay * 2, settings.changes.reconnect_max_s)
+
+    async def _watch(self, conn: asyncpg.Connection, lost: asyncio.Event) -> None:
+        # разрыв TCP без FIN termination listener не увидит — его ловит пинг
+        while True:
+            try:
+                await asyncio.wait_for(lost.wait(), timeout=settings.changes.ping_interval_s)
+                raise ConnectionError("listener connection terminated")
+            except asyncio.TimeoutError:
+                pass
+            await conn.fetchval("SELECT 1", timeout=settings.changes.ping_timeout_s)
+
+    def _on_notify(self, conn: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        if channel != CHANNEL:
+            for handler in self._channels.get(channel, ()):
+                self._call(handler, None)
+            return
+        try:
+            event = orjson.loads(payload)
+            entity, ids = event["entity"], event.get("ids")
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            print(f"Change feed: bad payload {payload!r}")
+            return
+        for handler in self._handlers.get(entity, ()):
+            self._call(handler, ids)
+
+    def flush_all(self) -> None:
+        """
+        полный сброс всех зарегистрированных кэшей процесса
+        """
+        for handlers in (*self._handlers.values(), *self._channels.values()):
+            for handler in handlers:
+                self._call(handler, None)
+
+    def _call(self, handler: Handler, ids: Ids) -> None:
+        try:
+            result = handler(ids)
+        except Exception as e:
+            print(f"Change feed handler {getattr(handler, '__qualname__', handler)} failed: {e}")
+            return
+        if inspect.isawaitable(result):
+            task = asyncio.ensure_future(result)
+            self._pending.add(task)
+            task.add_done_callback(self._done)
+
+    def _done(self, task: "asyncio.Future[Any]") -> None:
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Change feed handler failed: {task.exception()}")
+
+
+change_feed = ChangeFeed()
@@ -1,25 +1,179 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession, AsyncEngine
 from settings.settings import settings
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import NullPool
+from sqlalchemy.orm import Session
 from persistent.db.base import Base
 from sqlalchemy import DDL
 from persistent.db.tables import SexEnum
+from infrastructure.db.migrations import run_migrations
 
-def pg_connection() -> async_sessionmaker[AsyncSession]:
-    
-    engine = create_async_engine(
-        f"postgresql+asyncpg://{settings.pg.username}:{settings.pg.password}@"
+
+@dataclass(slots=True)
+class PoolMetrics:
+    """
+    счётчики пула соединений процесса
+    wait — время от начала транзакции сессии до выдачи соединения из пула
+    """
+    checkouts: int = 0
+    checkins: int = 0
+    connects: int = 0
+    invalidations: int = 0
+    wait_count: int = 0
+    wait_total_s: float = 0.0
+    wait_max_s: float = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        self.wait_count += 1
+        self.wait_total_s += seconds
+        if seconds > self.wait_max_s:
+            self.wait_max_s = seconds
+
+
+pool_metrics = PoolMetrics()
+
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+class _MeteredSession(Session):
+    """
+    sync-сессия под AsyncSession, замеряющая ожидание соединения из пула
+    """
+
+
+@event.listens_for(_MeteredSession, "after_transaction_create")
+def _on_transaction_create(session, transaction) -> None:
+    if transaction.parent is None:
+        session.info["_checkout_started"] = time.perf_counter()
+
+
+@event.listens_for(_MeteredSession, "after_begin")
+def _on_begin(session, transaction, connection) -> None:
+    started = session.info.pop("_checkout_started", None)
+    if started is not None:
+        pool_metrics.observe_wait(time.perf_counter() - started)
+
+
+def pg_dsn(driver: str) -> str:
+    return (
+        f"postgresql+{driver}://{settings.pg.username}:{settings.pg.password}@"
         f"{settings.pg.host}:{settings.pg.port}/{settings.pg.database}"
+    )
+
+
+def _attach_pool_listeners(engine: AsyncEngine) -> None:
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        pool_metrics.connects += 1
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        pool_metrics.checkouts += 1
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        pool_metrics.checkins += 1
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception) -> None:
+        pool_metrics.invalidations += 1
+
+
+def get_engine() -> AsyncEngine:
+    """
+    единственный async engine на процесс, создаётся лениво
+    """
+    global _engine
+    if _engine is None:
+        pg = settings.pg
+        _engine = create_async_engine(
+            f"{pg_dsn('asyncpg')}?prepared_statement_cache_size={pg.statement_cache_size}",
+            pool_size=pg.pool_size,
+            max_overflow=pg.max_overflow,
+            pool_timeout=pg.pool_timeout,
+            pool_recycle=pg.pool_recycle,
+            pool_pre_ping=pg.pool_pre_ping,
+            connect_args={"statement_cache_size": pg.statement_cache_size},
         )
-    return async_sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        _attach_pool_listeners(_engine)
+    return _engine
 
-def sync_create_tables() -> None:
-    try:
-        sync_engine = create_engine(
-            f"postgresql://{settings.pg.username}:{settings.pg.password}@"
-            f"{settings.pg.host}:{settings.pg.port}/{settings.pg.database}"
+
+def pg_connection() -> async_sessionmaker[AsyncSession]:
+    """
+    общий sessionmaker поверх общего engine — репозитории делят один пул
+    """
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = async_sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=get_engine(),
+            sync_session_class=_MeteredSession,
+        )
+    return _sessionmaker
+
+
+async def init_engine() -> None:
+    """
+    прогрев пула на старте воркера: первое соединение открывается сразу,
+    а не на первом запросе
+    """
+    async with get_engine().connect():
+        pass
+
+
+async def dispose_engine() -> None:
+    """
+    закрывает все соединения пула на остановке воркера
+    """
+    if _engine is not None:
+        await _engine.dispose()
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    снимок состояния пула и накопленных метрик
+    """
+    stats: Dict[str, Any] = {
+        "checkouts": pool_metrics.checkouts,
+        "checkins": pool_metrics.checkins,
+        "connects": pool_metrics.connects,
+        "invalidations": pool_metrics.invalidations,
+        "wait_count": pool_metrics.wait_count,
+        "wait_total_s": pool_metrics.wait_total_s,
+        "wait_max_s": pool_metrics.wait_max_s,
+    }
+    if _engine is not None:
+        pool = _engine.sync_engine.pool
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
         )
-        
+    return stats
+
+
+# ключ advisory lock для create_all: воркеры поднимают схему по очереди.
+# отличается от MIGRATIONS_LOCK_KEY — run_migrations берёт свой лок на другом соединении
+SCHEMA_LOCK_KEY = 740_021_000
+
+
+def bootstrap_schema() -> List[int]:
+    """
+    enum, create_all и версионные миграции под advisory lock.
+    возвращает применённые версии миграций, ошибки пробрасывает
+    """
+    sync_engine = create_engine(pg_dsn("psycopg2"), poolclass=NullPool)
+    try:
         create_enum = DDL(
             "DO $$ "
             "BEGIN "
@@ -28,13 +182,29 @@ def sync_create_tables() -> None:
             "   END IF; "
             "END $$;"
         )
-        
-        with sync_engine.connect() as conn:
-            conn.execute(create_enum)
-            conn.commit()
-        
-        Base.metadata.create_all(sync_engine)
+
+        with sync_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+            lock_conn.execute(text("SELECT pg_advisory_lock(:k)"), {"k": SCHEMA_LOCK_KEY})
+            try:
+                lock_conn.execute(create_enum)
+                Base.metadata.create_all(lock_conn)
+            finally:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": SCHEMA_LOCK_KEY})
+
+        return run_migrations(sync_engine)
+    finally:
         sync_engine.dispose()
+
+
+def sync_create_tables() -> None:
+    """
+    bootstrap схемы на старте воркера (settings.pg.bootstrap_on_startup).
+    ошибка не роняет воркер — только логируется, как и раньше
+    """
+    try:
+        applied = bootstrap_schema()
         print("Tables created successfully")
+        if applied:
+            print(f"Migrations applied: {applied}")
     except Exception as e:
-        print(f"Error creating tables: {e}")
\ No newline at end of file
+        print(f"Error creating tables: {e}")
@@ -0,0 +1,23 @@
+"""
+Одноразовый bootstrap схемы: enum, create_all и версионные миграции.
+Запускается шагом деплоя до старта воркеров (при APP_PG__BOOTSTRAP_ON_STARTUP=false).
+
+    python -m infrastructure.db.migrate
+"""
+import sys
+
+from infrastructure.db.connect import bootstrap_schema
+
+
+def main() -> int:
+    try:
+        applied = bootstrap_schema()
+    except Exception as e:
+        print(f"Error creating tables: {e}", file=sys.stderr)
+        return 1
+    print(f"Migrations applied: {applied}" if applied else "Schema is up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Engine, text
+from sqlalchemy.engine import Connection
+
+# ключ advisory lock: миграции выполняет только один процесс одновременно
+MIGRATIONS_LOCK_KEY = 740_021_001
+
+_CONCURRENT_INDEX = re.compile(
+    r"^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.IGNORECASE
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    """
+    шаг схемы поверх create_all.
+    statements — идемпотентный DDL, apply — python-шаг (бэкфилл) после DDL.
+    transactional=False — для CREATE INDEX CONCURRENTLY (нельзя внутри транзакции)
+    и бэкфиллов пачками: apply получает соединение в AUTOCOMMIT
+    """
+    version: int
+    name: str
+    statements: Tuple[str, ...] = ()
+    apply: Optional[Callable[[Connection], None]] = None
+    transactional: bool = True
+
+
+def _backfill_hard_skills_canon(conn: Connection, batch_size: int = 1000) -> None:
+    """
+    keyset-пачками по id, каждая пачка — отдельный UPDATE в AUTOCOMMIT:
+    таблица не читается целиком, и прерванный бэкфилл продолжается с пустых канонов
+    """
+    from matcher.normalization import canonical_skill_keys
+
+    memo: Dict[Tuple[str, ...], List[str]] = {}
+    after = UUID(int=0)
+    while True:
+        rows = conn.execute(
+            text(
+                'SELECT id, hard_skills FROM "user" WHERE id > :after '
+                "AND hard_skills_canon = ARRAY[]::TEXT[] AND hard_skills <> ARRAY[]::TEXT[] "
+                "ORDER BY id LIMIT :n"
+            ),
+            {"after": after, "n": batch_size},
+        ).all()
+        if not rows:
+            break
+        params: Dict[str, object] = {}
+        values = []
+        for i, row in enumerate(rows):
+            key = tuple(row.hard_skills or ())
+            if key not in memo:
+                memo[key] = canonical_skill_keys(key)
+            params[f"id{i}"], params[f"skills{i}"], params[f"canon{i}"] = row.id, list(key), memo[key]
+            values.append(f"(CAST(:id{i} AS UUID), CAST(:skills{i} AS TEXT[]), CAST(:canon{i} AS TEXT[]))")
+        # навыки, изменённые после чтения, уже записаны с каноном — их не трогаем
+        conn.execute(
+            text(
+                'UPDATE "user" AS u SET hard_skills_canon = v.canon '
+                f"FROM (VALUES {', '.join(values)}) AS v(id, skills, canon) "
+                "WHERE u.id = v.id AND u.hard_skills = v.skills AND u.hard_skills_canon = ARRAY[]::TEXT[]"
+            ),
+            params,
+        )
+        if len(rows) < batch_size:
+            break
+        after = rows[-1].id
+
+
+def _seed_skill_lexicon(conn: Connection) -> None:
+    """
+    словарь из utils.patterns.skills — начальное содержимое таблицы.
+    hard_skills_canon уже посчитан по нему, поэтому canon_version = version
+    """
+    from utils.patterns.skills import SKILL_LEXICON
+
+    conn.execute(text(
+        "INSERT INTO skill_lexicon_version (id, version, canon_version) VALUES (1, 0, 0) "
+        "ON CONFLICT DO NOTHING"
+    ))
+    if conn.execute(text("SELECT count(*) FROM skill_lexicon")).scalar_one() == 0:
+        conn.execute(
+            text("INSERT INTO skill_lexicon (canon, variants, position) VALUES (:canon, :variants, :position)"),
+            [
+                {"canon": canon, "variants": list(variants), "position": i}
+                for i, (canon, variants) in enumerate(SKILL_LEXICON.items())
+            ],
+        )
+    conn.execute(text("UPDATE skill_lexicon_version SET canon_version = version WHERE id = 1"))
+
+
+def _backfill_user_skill_canon(conn: Connection) -> None:
+    conn.execute(text(
+        'INSERT INTO user_skill_canon (canon) SELECT DISTINCT c FROM "user", unnest(hard_skills_canon) AS c '
+        "ON CONFLICT DO NOTHING"
+    ))
+
+
+def _stamp_hard_skills_canon_version(conn: Connection) -> None:
+    # до миграции все каноны пересчитывались под canon_version
+    conn.execute(text(
+        'UPDATE "user" SET hard_skills_canon_version = '
+        "(SELECT canon_version FROM skill_lexicon_version WHERE id = 1) "
+        "WHERE EXISTS (SELECT 1 FROM skill_lexicon_version WHERE id = 1)"
+    ))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version=1,
+        name="hot_path_indexes",
+        statements=(
+            # exists_by_full_name (логин)
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_full_name ON "user" (first_name, last_name)',
+            # keyset-пагинация списков по (created_at, id)
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_created_at_id ON "user" (created_at, id)',
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_vacancy_created_at_id ON vacancy (created_at, id)",
+            # фильтры по навыкам (&&, @>)
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_hard_skills_gin ON "user" USING gin (hard_skills)',
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_vacancy_must_have_gin ON vacancy USING gin (must_have)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_vacancy_nice_to_have_gin ON vacancy USING gin (nice_to_have)",
+        ),
+        transactional=False,
+    ),
+    Migration(
+        version=2,
+        name="user_hard_skills_canon",
+        statements=(
+            'ALTER TABLE "user" ADD COLUMN IF NOT EXISTS hard_skills_canon TEXT[] '
+            "NOT NULL DEFAULT ARRAY[]::TEXT[]",
+        ),
+        apply=_backfill_hard_skills_canon,
+        transactional=False,
+    ),
+    Migration(
+        version=3,
+        name="user_hard_skills_canon_gin",
+        statements=(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_hard_skills_canon_gin '
+            'ON "user" USING gin (hard_skills_canon)',
+        ),
+        transactional=False,
+    ),
+    Migration(
+        version=4,
+        name="skill_lexicon",
+        statements=(
+            # версия словаря растёт на каждый изменяющий его оператор, кто бы его ни выполнил
+            "CREATE OR REPLACE FUNCTION skill_lexicon_bump_version() RETURNS trigger AS $$ "
+            "DECLARE v BIGINT; "
+            "BEGIN "
+            "   UPDATE skill_lexicon_version SET version = version + 1 WHERE id = 1 RETURNING version INTO v; "
+            "   PERFORM pg_notify('skill_lexicon', v::text); "
+            "   RETURN NULL; "
+            "END $$ LANGUAGE plpgsql",
+            "DROP TRIGGER IF EXISTS skill_lexicon_changed ON skill_lexicon",
+            "CREATE TRIGGER skill_lexicon_changed AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE "
+            "ON skill_lexicon FOR EACH STATEMENT EXECUTE FUNCTION skill_lexicon_bump_version()",
+        ),
+        apply=_seed_skill_lexicon,
+    ),
+    Migration(
+        version=5,
+        name="user_skill_canon",
+        statements=(
+            # словарь ключей канонов пользователей пополняется в той же транзакции, что и запись
+            # (INSERT ... ON CONFLICT DO UPDATE запускает оба триггера)
+            "CREATE OR REPLACE FUNCTION user_skill_canon_collect() RETURNS trigger AS $$ "
+            "BEGIN "
+            "   INSERT INTO user_skill_canon (canon) "
+            "   SELECT DISTINCT c FROM new_rows, unnest(new_rows.hard_skills_canon) AS c "
+            "   ON CONFLICT DO NOTHING; "
+            "   RETURN NULL; "
+            "END $$ LANGUAGE plpgsql",
+            'DROP TRIGGER IF EXISTS user_skill_canon_inserted ON "user"',
+            'CREATE TRIGGER user_skill_canon_inserted AFTER INSERT ON "user" '
+            "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION user_skill_canon_collect()",
+            'DROP TRIGGER IF EXISTS user_skill_canon_updated ON "user"',
+            'CREATE TRIGGER user_skill_canon_updated AFTER UPDATE ON "user" '
+            "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION user_skill_canon_collect()",
+        ),
+        apply=_backfill_user_skill_canon,
+    ),
+    Migration(
+        version=6,
+        name="user_external_id",
+        statements=('ALTER TABLE "user" ADD COLUMN IF NOT EXISTS external_id TEXT',),
+    ),
+    Migration(
+        version=7,
+        name="user_external_id_unique",
+        statements=(
+            # цель ON CONFLICT (external_id) у POST /users/bulk
+            'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_user_external_id ON "user" (external_id)',
+        ),
+        transactional=False,
+    ),
+    Migration(
+        version=8,
+        name="user_hard_skills_canon_version",
+        statements=(
+            'ALTER TABLE "user" ADD COLUMN IF NOT EXISTS hard_skills_canon_version BIGINT NOT NULL DEFAULT 0',
+        ),
+        apply=_stamp_hard_skills_canon_version,
+    ),
+    Migration(
+        version=9,
+        name="user_hard_skills_canon_version_index",
+        statements=(
+            # строки с каноном старого словаря: префильтр матчинга и пересчёт
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_hard_skills_canon_version '
+            'ON "user" (hard_skills_canon_version)',
+        ),
+        transactional=False,
+    ),
+    Migration(
+        version=10,
+        name="user_updated_at_index",
+        statements=(
+            # правки после сборки снимка кандидатов и его водяной знак max(updated_at)
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_updated_at ON "user" (updated_at)',
+        ),
+        transactional=False,
+    ),
+]
+
+
+def _ensure_version_table(conn: Connection) -> None:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "   version INTEGER PRIMARY KEY,"
+        "   name TEXT NOT NULL,"
+        "   applied_at TIMESTAMPTZ NOT NULL DEFAULT now()"
+        ")"
+    ))
+
+
+def _index_valid(conn: Connection, name: str) -> Optional[bool]:
+    """
+    pg_index.indisvalid индекса; None — индекса нет
+    """
+    return conn.execute(text(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :n AND pg_catalog.pg_table_is_visible(c.oid)"
+    ), {"n": name}).scalar_one_or_none()
+
+
+def _create_index_concurrently(conn: Connection, stmt: str, name: str, attempts: int = 2) -> None:
+    """
+    прерванный или упавший CREATE INDEX CONCURRENTLY оставляет INVALID-индекс,
+    который IF NOT EXISTS при следующем запуске молча пропустит: такой индекс
+    удаляется и строится заново, миграция записывается только с валидным
+    """
+    for _ in range(attempts):
+        if _index_valid(conn, name) is False:
+            conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+        conn.execute(text(stmt))
+        if _index_valid(conn, name):
+            return
+    raise RuntimeError(f"index {name} is still INVALID after {attempts} attempts")
+
+
+def _run_concurrent(conn: Connection, migration: Migration, only_invalid: bool = False) -> None:
+    for stmt in migration.statements:
+        m = _CONCURRENT_INDEX.match(stmt)
+        if m is None:
+            if not only_invalid:
+                conn.execute(text(stmt))
+        elif not only_invalid or _index_valid(conn, m.group(1)) is False:
+            _create_index_concurrently(conn, stmt, m.group(1))
+
+
+def _apply(engine: Engine, migration: Migration) -> None:
+    if migration.transactional:
+        with engine.begin() as conn:
+            for stmt in migration.statements:
+                conn.execute(text(stmt))
+            if migration.apply is not None:
+                migration.apply(conn)
+    else:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            _run_concurrent(conn, migration)
+            if migration.apply is not None:
+                migration.apply(conn)
+
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO schema_migrations (version, name) VALUES (:v, :n) ON CONFLICT DO NOTHING"),
+            {"v": migration.version, "n": migration.name},
+        )
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    применяет ещё не применённые миграции по порядку версий.
+    возвращает список применённых версий
+    """
+    applied_now: List[int] = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(:k)"), {"k": MIGRATIONS_LOCK_KEY})
+        try:
+            _ensure_version_table(lock_conn)
+            done = set(lock_conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+            for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+                if migration.version in done:
+                    if not migration.transactional:
+                        # индексы, записанные применёнными до проверки indisvalid
+                        _run_concurrent(lock_conn, migration, only_invalid=True)
+                    continue
+                _apply(engine, migration)
+                applied_now.append(migration.version)
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": MIGRATIONS_LOCK_KEY})
+    return applied_now
@@ -0,0 +1,112 @@
+import asyncio
+import importlib
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from matcher.affinity import compile_affinity, current_affinity, install_affinity
+from matcher.lexicon import compile_lexicon, current, install_lexicon
+from settings.settings import settings
+
+T = TypeVar("T")
+
+# модули, импортируемые процессом пула при старте, а не на первой задаче
+CPU_PRELOAD = (
+    "matcher.batch",
+    "sklearn.feature_extraction.text",
+    "sklearn.metrics.pairwise",
+    "pdf2docx",
+)
+
+_cpu_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _init_cpu_worker(
+    lexicon: Dict[str, List[str]],
+    lexicon_version: int,
+    affinity: Dict[str, Dict[str, float]],
+    affinity_version: int,
+) -> None:
+    # словарь навыков и матрица близости процесса-родителя: процессы пула не ходят в БД за своими
+    install_lexicon(compile_lexicon(lexicon, lexicon_version), notify=False)
+    install_affinity(compile_affinity(affinity, affinity_version))
+    for name in CPU_PRELOAD:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def _noop() -> None:
+    return None
+
+
+def get_cpu_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    пул процессов для CPU-тяжёлых задач, один на API-воркер, создаётся лениво.
+    spawn, а не fork: воркер уже держит event loop, соединения пула БД и потоки.
+    None — пул выключен (settings.cpu.pool_workers = 0)
+    """
+    global _cpu_pool
+    if _cpu_pool is None and settings.cpu.pool_workers > 0:
+        lexicon = current()
+        affinity = current_affinity()
+        _cpu_pool = ProcessPoolExecutor(
+            max_workers=settings.cpu.pool_workers,
+            mp_context=mp.get_context("spawn"),
+            max_tasks_per_child=settings.cpu.max_tasks_per_child or None,
+            initializer=_init_cpu_worker,
+            initargs=(lexicon.lexicon, lexicon.version, affinity.neighbours, affinity.version),
+        )
+    return _cpu_pool
+
+
+def warm_cpu_pool() -> None:
+    """
+    запускает процессы пула заранее (не дожидаясь их), чтобы первый запрос
+    не платил за spawn и импорт sklearn/pdf2docx
+    """
+    pool = get_cpu_pool()
+    if pool is not None:
+        for _ in range(settings.cpu.pool_workers):
+            pool.submit(_noop)
+
+
+async def run_cpu(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    выполняет fn вне event loop: в пуле процессов или, если пул выключен, в потоке.
+    fn и аргументы должны сериализоваться pickle (функции уровня модуля)
+    """
+    pool = get_cpu_pool()
+    if pool is None:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, partial(fn, *args, **kwargs))
+
+
+def chunked(items: Sequence[T], size: int) -> List[Sequence[T]]:
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def shutdown_cpu_pool() -> None:
+    """
+    останавливает пул на остановке воркера
+    """
+    global _cpu_pool
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(wait=True, cancel_futures=True)
+        _cpu_pool = None
+
+
+def restart_cpu_pool() -> None:
+    """
+    новый пул с текущими словарём навыков и матрицей близости (процессы получают их при старте).
+    старый пул дорабатывает принятые задачи и закрывается в фоне
+    """
+    global _cpu_pool
+    old, _cpu_pool = _cpu_pool, None
+    if old is not None:
+        old.shutdown(wait=False)
+        warm_cpu_pool()
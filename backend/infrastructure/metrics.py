@@ -0,0 +1,189 @@
+import functools
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, TypeVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from infrastructure.tracing import tracer
+
+T = TypeVar("T")
+
+# границы бакетов: быстрые операции (БД, стадии скоринга) и медленные (LLM, PDF, сеть)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса по шаблону маршрута",
+    ["method", "route", "status"],
+    buckets=FAST_BUCKETS + (10.0, 30.0, 60.0),
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Время метода репозитория (сессия, запрос, commit)",
+    ["repository", "method", "outcome"],
+    buckets=FAST_BUCKETS,
+)
+MATCH_STAGE_LATENCY = Histogram(
+    "match_stage_duration_seconds",
+    "Время стадий compute_match на одну пару пользователь/вакансия",
+    ["stage"],
+    buckets=FAST_BUCKETS,
+)
+MATCH_DECISIONS = Counter(
+    "match_decisions_total",
+    "Решения скоринга относительно accept_threshold",
+    ["decision"],
+)
+LLM_GATE_ROUTES = Counter(
+    "llm_gate_total",
+    "Отчёты по принятым парам: llm — неуверенная зона, template — шаблон вместо LLM "
+    "(сэкономленный вызов), audit — уверенная пара, всё же отправленная в LLM",
+    ["route"],
+)
+LLM_GATE_AGREEMENT = Counter(
+    "llm_gate_agreement_total",
+    "Согласие LLM с принятием эвристикой по корзинам score (шаг 0.05) — для подбора llm_below",
+    ["bucket", "agree"],
+)
+PDF_CONVERSION_LATENCY = Histogram(
+    "pdf_conversion_duration_seconds",
+    "Время конвертации PDF -> DOCX",
+    ["outcome"],
+    buckets=SLOW_BUCKETS,
+)
+LLM_LATENCY = Histogram(
+    "llm_request_duration_seconds",
+    "Время вызова LLM по сервису",
+    ["service", "outcome"],
+    buckets=SLOW_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Токены LLM по сервису",
+    ["service", "kind"],
+)
+FETCH_LATENCY = Histogram(
+    "scrape_fetch_duration_seconds",
+    "Время загрузки внешнего источника (курсы, статьи, вакансии)",
+    ["source", "outcome"],
+    buckets=SLOW_BUCKETS,
+)
+
+
+class _DbPoolCollector:
+    """
+    состояние пула БД снимается в момент scrape из pool_stats(), без фоновых задач
+    """
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        from infrastructure.db.connect import pool_stats
+
+        stats = pool_stats()
+        pid = str(os.getpid())
+        conns = GaugeMetricFamily("db_pool_connections", "Соединения пула БД", labels=["pid", "state"])
+        for state in ("size", "checked_out", "checked_in", "overflow"):
+            if state in stats:
+                conns.add_metric([pid, state], stats[state])
+        yield conns
+        events = GaugeMetricFamily("db_pool_events", "Накопленные события пула БД", labels=["pid", "event"])
+        for event in ("checkouts", "checkins", "connects", "invalidations", "wait_count"):
+            events.add_metric([pid, event], stats[event])
+        yield events
+        wait = GaugeMetricFamily("db_pool_wait_seconds", "Ожидание соединения из пула", labels=["pid", "agg"])
+        wait.add_metric([pid, "total"], stats["wait_total_s"])
+        wait.add_metric([pid, "max"], stats["wait_max_s"])
+        yield wait
+
+
+_pool_collector = _DbPoolCollector()
+REGISTRY.register(_pool_collector)
+
+
+def metrics_payload() -> tuple[bytes, str]:
+    """
+    тело ответа /metrics. при PROMETHEUS_MULTIPROC_DIR метрики собираются
+    со всех воркеров uvicorn и процессов CPU-пула
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(_pool_collector)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def observe_db(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """
+    декоратор метода репозитория: время и исход (ok/error) в гистограмму
+    по классу и методу, спан db.<Repository>.<method> в трассировку
+    """
+    repository, _, method = fn.__qualname__.rpartition(".")
+    span_name = f"db.{repository}.{method}"
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with tracer.start_as_current_span(span_name):
+                result = await fn(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            DB_QUERY_LATENCY.labels(repository, method, outcome).observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+def observe_match_timings(timings: Iterable[Dict[str, float]]) -> None:
+    """
+    стадии скоринга считаются в процессе CPU-пула и приезжают в MatchResult.timings;
+    в гистограмму попадают уже в API-воркере
+    """
+    for item in timings:
+        for stage, seconds in item.items():
+            MATCH_STAGE_LATENCY.labels(stage).observe(seconds)
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware: латентность HTTP по шаблону маршрута (/users/{user_id}),
+    а не по сырому пути — иначе кардинальность меток растёт с числом id
+    """
+
+    def __init__(self, app: Callable[..., Awaitable[None]]) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "__unmatched__"
+            HTTP_LATENCY.labels(scope["method"], template, str(status["code"])).observe(
+                time.perf_counter() - started
+            )
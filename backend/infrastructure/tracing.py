@@ -0,0 +1,174 @@
+import functools
+import inspect
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, TypeVar
+
+from opentelemetry import trace
+from opentelemetry.trace import Span, Status, StatusCode
+
+from settings.settings import settings
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# без setup_tracing() провайдер не настроен и спаны — no-op с копеечной стоимостью
+tracer = trace.get_tracer("nizhnovhack.backend")
+
+_provider: Optional[Any] = None
+
+
+class JsonLinesSpanExporter:
+    """
+    экспортёр в файл: один завершённый спан — одна JSON-строка (формат span.to_json).
+    файл на процесс ({pid} в пути), чтобы воркеры uvicorn не перемешивали строки
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path.format(pid=os.getpid())
+        self._lock = threading.Lock()
+        self._file = open(self._path, "a", encoding="utf-8")
+
+    def export(self, spans: Sequence[Any]) -> Any:
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        with self._lock:
+            for span in spans:
+                self._file.write(span.to_json(indent=None))
+                self._file.write("\n")
+            self._file.flush()
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        with self._lock:
+            self._file.flush()
+        return True
+
+
+def setup_tracing() -> None:
+    """
+    настраивает провайдер по settings.tracing.exporter: console | jsonl | none.
+    экспорт пакетами в фоновом потоке — запрос не ждёт записи в файл/stdout
+    """
+    global _provider
+    cfg = settings.tracing
+    if cfg.exporter == "none" or _provider is not None:
+        return
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if cfg.exporter == "console":
+        exporter = ConsoleSpanExporter()
+    elif cfg.exporter == "jsonl":
+        exporter = JsonLinesSpanExporter(cfg.path)
+    else:
+        raise ValueError(f"unknown tracing exporter: {cfg.exporter}")
+
+    provider = TracerProvider(resource=Resource.create({"service.name": cfg.service_name}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _provider = provider
+
+
+def shutdown_tracing() -> None:
+    """
+    дописывает накопленные спаны на остановке воркера
+    """
+    global _provider
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    спан вокруг блока; исключение помечает спан ошибкой и пробрасывается дальше
+    """
+    with tracer.start_as_current_span(name, attributes=_clean(attributes)) as current:
+        yield current
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """
+    декоратор для sync/async функций; имя спана по умолчанию — qualname функции
+    """
+
+    def decorator(fn: F) -> F:
+        span_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with tracer.start_as_current_span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with tracer.start_as_current_span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def _clean(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    # OTel принимает только примитивы и их последовательности; None отбрасываем
+    return {k: v if isinstance(v, (str, bool, int, float)) else str(v) for k, v in attributes.items() if v is not None}
+
+
+class TracingMiddleware:
+    """
+    корневой спан на HTTP-запрос; имя уточняется шаблоном маршрута после роутинга
+    """
+
+    def __init__(self, app: Callable[..., Any]) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with tracer.start_as_current_span(f"HTTP {scope['method']}", kind=trace.SpanKind.SERVER) as current:
+            status = {"code": 500}
+
+            async def send_wrapper(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    status["code"] = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if current.is_recording():
+                    route = getattr(scope.get("route"), "path", None)
+                    if route:
+                        current.update_name(f"HTTP {scope['method']} {route}")
+                        current.set_attribute("http.route", route)
+                    current.set_attribute("http.method", scope["method"])
+                    current.set_attribute("http.status_code", status["code"])
+                    if status["code"] >= 500:
+                        current.set_status(Status(StatusCode.ERROR))
+
+
+def record_stage_timings(current: Span, timings: Sequence[Dict[str, float]]) -> None:
+    """
+    суммарные длительности стадий compute_match пачки — атрибутами спана:
+    сам скоринг идёт в процессе CPU-пула, где трассировка не настроена
+    """
+    if not current.is_recording():
+        return
+    totals: Dict[str, float] = {}
+    for item in timings:
+        for stage, seconds in item.items():
+            totals[stage] = totals.get(stage, 0.0) + seconds
+    for stage, seconds in totals.items():
+        current.set_attribute(f"match.{stage}_s", seconds)
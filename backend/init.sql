@@ -2,6 +2,8 @@ CREATE TYPE sex_enum AS ENUM ('male', 'female');
 
 CREATE TABLE "user"(
     id UUID PRIMARY KEY,
+    -- id сотрудника в HR-системе: ключ upsert массовой синхронизации
+    external_id TEXT,
 
     first_name TEXT NOT NULL CHECK (btrim(first_name) <> '' AND char_length(first_name) <= 50),
     last_name  TEXT NOT NULL CHECK (btrim(last_name)  <> '' AND char_length(last_name)  <= 50),
@@ -22,6 +24,9 @@ CREATE TABLE "user"(
     experience_description TEXT,
 
     hard_skills TEXT[] NOT NULL DEFAULT ARRAY[]::TEXT[],
+    hard_skills_canon TEXT[] NOT NULL DEFAULT ARRAY[]::TEXT[],
+    -- версия словаря навыков, которой посчитан hard_skills_canon
+    hard_skills_canon_version BIGINT NOT NULL DEFAULT 0,
 
     created_at TIMESTAMP NOT NULL,
     updated_at TIMESTAMP NOT NULL
@@ -46,4 +51,17 @@ CREATE TABLE vacancy(
 
     created_at TIMESTAMP NOT NULL,
     updated_at TIMESTAMP NOT NULL
-);
\ No newline at end of file
+);
+
+-- индексы горячих запросов (те же, что в infrastructure/db/migrations.py)
+CREATE INDEX ix_user_full_name ON "user" (first_name, last_name);
+CREATE INDEX ix_user_created_at_id ON "user" (created_at, id);
+CREATE INDEX ix_user_hard_skills_gin ON "user" USING gin (hard_skills);
+CREATE INDEX ix_user_hard_skills_canon_gin ON "user" USING gin (hard_skills_canon);
+CREATE UNIQUE INDEX ux_user_external_id ON "user" (external_id);
+CREATE INDEX ix_user_hard_skills_canon_version ON "user" (hard_skills_canon_version);
+CREATE INDEX ix_user_updated_at ON "user" (updated_at);
+
+CREATE INDEX ix_vacancy_created_at_id ON vacancy (created_at, id);
+CREATE INDEX ix_vacancy_must_have_gin ON vacancy USING gin (must_have);
+CREATE INDEX ix_vacancy_nice_to_have_gin ON vacancy USING gin (nice_to_have);
@@ -1,8 +1,41 @@
-from presentations.app import app
+import os
+import shutil
+
 import uvicorn
 
+from settings.settings import settings
+
+# приложение передаётся строкой импорта: при workers > 1 uvicorn импортирует его
+# в каждом процессе-воркере, а не в мастер-процессе
+APP = "presentations.app:app"
+
+
+def _reset_metrics_dir() -> None:
+    """
+    при нескольких воркерах prometheus_client пишет метрики в файлы каталога
+    PROMETHEUS_MULTIPROC_DIR; файлы прошлого запуска удаляются до старта воркеров
+    """
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
 def main() -> None:
-    uvicorn.run(app)
+    cfg = settings.uvicorn
+    _reset_metrics_dir()
+    uvicorn.run(
+        APP,
+        host=cfg.host,
+        port=cfg.port,
+        workers=cfg.workers,
+        loop=cfg.loop,
+        http=cfg.http,
+        backlog=cfg.backlog,
+        timeout_keep_alive=cfg.timeout_keep_alive,
+        limit_concurrency=cfg.limit_concurrency,
+        access_log=cfg.access_log,
+    )
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+# соседи канона: ключ канона в нижнем регистре -> {ключ соседа: близость 0..1}
+Neighbours = Dict[str, Dict[str, float]]
+
+
+@dataclass(frozen=True, slots=True)
+class SkillAffinity:
+    """
+    матрица близости навыков одной версии (разреженная: top-k соседей канона).
+    неизменяемая, как LexiconSnapshot: читатели берут ссылку через current_affinity().
+    version 0 — матрица ещё не построена, частичного зачёта нет
+    """
+    version: int
+    neighbours: Neighbours = field(default_factory=dict)
+
+    def get(self, a: str, b: str) -> float:
+        return self.neighbours.get(a.lower(), {}).get(b.lower(), 0.0)
+
+    def row(self, a: str) -> Dict[str, float]:
+        return self.neighbours.get(a.lower(), {})
+
+
+def build_affinity(
+    docs: Iterable[Sequence[str]],
+    canons: Sequence[str],
+    min_support: int = 5,
+    min_score: float = 0.2,
+    top_k: int = 10,
+) -> Neighbours:
+    """
+    близость канонов словаря по совместной встречаемости в профилях и вакансиях.
+    docs — наборы ключей канонов (как user.hard_skills_canon).
+    прямое совпадение в одном документе не главное: PostgreSQL и MySQL, FastAPI и Flask
+    редко стоят рядом, зато окружены одним и тем же. поэтому близость второго порядка —
+    косинус строк PPMI-матрицы совместной встречаемости
+    """
+    from scipy import sparse
+
+    keys = list(dict.fromkeys(c.lower() for c in canons))
+    index = {k: i for i, k in enumerate(keys)}
+    indptr: List[int] = [0]
+    cols: List[int] = []
+    for doc in docs:
+        ids = {index[k] for k in doc if k in index}
+        if ids:
+            cols.extend(ids)
+            indptr.append(len(cols))
+    n_docs = len(indptr) - 1
+    if n_docs == 0:
+        return {}
+    x = sparse.csr_matrix(
+        (np.ones(len(cols), dtype=np.float64), np.asarray(cols), np.asarray(indptr)),
+        shape=(n_docs, len(keys)),
+    )
+    co = (x.T @ x).toarray()
+    df = np.diag(co).copy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pmi = np.log(co * n_docs / np.outer(df, df))
+    ppmi = np.where(co > 0, np.maximum(pmi, 0.0), 0.0)
+    np.fill_diagonal(ppmi, 0.0)
+    # редкие навыки — шум: ни строкой, ни контекстом не участвуют
+    rare = df < min_support
+    ppmi[rare, :] = 0.0
+    ppmi[:, rare] = 0.0
+
+    norms = np.linalg.norm(ppmi, axis=1)
+    unit = np.divide(ppmi, norms[:, None], out=np.zeros_like(ppmi), where=norms[:, None] > 0)
+    sim = unit @ unit.T
+    np.fill_diagonal(sim, 0.0)
+
+    neighbours: Neighbours = {}
+    for i, key in enumerate(keys):
+        row = sim[i]
+        top = np.argsort(-row, kind="stable")[:top_k]
+        related = {keys[j]: round(float(row[j]), 4) for j in top if row[j] >= min_score}
+        if related:
+            neighbours[key] = related
+    return neighbours
+
+
+def compile_affinity(neighbours: Mapping[str, Mapping[str, float]], version: int) -> SkillAffinity:
+    return SkillAffinity(
+        version=version,
+        neighbours={a.lower(): {b.lower(): float(s) for b, s in row.items()} for a, row in neighbours.items()},
+    )
+
+
+_current: Optional[SkillAffinity] = None
+
+
+def current_affinity() -> SkillAffinity:
+    """
+    действующая матрица; до первой загрузки из БД — пустая (version 0)
+    """
+    global _current
+    if _current is None:
+        _current = SkillAffinity(version=0)
+    return _current
+
+
+def install_affinity(affinity: SkillAffinity) -> SkillAffinity:
+    """
+    атомарная замена матрицы процесса
+    """
+    global _current
+    _current = affinity
+    return affinity
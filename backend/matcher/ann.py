@@ -0,0 +1,79 @@
+from __future__ import annotations
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# k-means учится на выборке: центроиды на 100k+ строк от полной выборки почти не меняются
+_TRAIN_SAMPLE = 50_000
+_ASSIGN_BATCH = 8192
+
+
+def _nearest_centroid(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    # векторы и центроиды нормированы: ближайший по косинусу — максимум скалярного произведения
+    out = np.empty(len(vectors), dtype=np.int32)
+    for i in range(0, len(vectors), _ASSIGN_BATCH):
+        out[i:i + _ASSIGN_BATCH] = np.argmax(vectors[i:i + _ASSIGN_BATCH].astype(np.float32) @ centroids.T, axis=1)
+    return out
+
+
+def train_ivf(
+    vectors: np.ndarray,
+    nlist: int = 0,
+    include: Optional[np.ndarray] = None,
+    iters: int = 10,
+    seed: int = 0,
+) -> Dict[str, np.ndarray]:
+    """
+    IVF-индекс (inverted file) над нормированными векторами: сферический k-means
+    на nlist центроидов и строки, отсортированные по спискам. include — номера
+    строк, попадающих в индекс (по умолчанию все).
+    возвращает массивы ivf_centroids, ivf_offsets, ivf_rows — их пишет снимок кандидатов
+    """
+    index = np.arange(len(vectors), dtype=np.int32) if include is None else include.astype(np.int32)
+    vectors = vectors[index]
+    n, dim = vectors.shape
+    nlist = max(1, min(nlist or int(math.sqrt(n)), n)) if n else 1
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(n, size=min(n, _TRAIN_SAMPLE), replace=False)] if n else vectors
+    sample = sample.astype(np.float32)
+    centroids = sample[rng.choice(len(sample), size=nlist, replace=False)] if n else np.zeros((1, dim), np.float32)
+    for _ in range(iters if n else 0):
+        assign = _nearest_centroid(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # пустой список оставляет прежний центроид
+        centroids = np.where(norms > 0, sums / np.where(norms > 0, norms, 1.0), centroids)
+
+    assign = _nearest_centroid(vectors, centroids)
+    rows = index[np.argsort(assign, kind="stable")]
+    offsets = np.zeros(nlist + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assign, minlength=nlist), out=offsets[1:])
+    return {"ivf_centroids": centroids.astype(np.float32), "ivf_offsets": offsets, "ivf_rows": rows}
+
+
+def search_ivf(
+    vectors: np.ndarray,
+    centroids: np.ndarray,
+    offsets: np.ndarray,
+    rows: np.ndarray,
+    query: np.ndarray,
+    k: int,
+    nprobe: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    k ближайших к query строк среди списков nprobe ближайших центроидов:
+    (номера строк, косинусы) по убыванию близости. точный перебор —
+    при nprobe >= числа списков
+    """
+    q = query.astype(np.float32)
+    probes = np.argsort(-(centroids @ q))[:max(1, nprobe)]
+    cand = np.concatenate([rows[offsets[p]:offsets[p + 1]] for p in probes]) if len(rows) else rows
+    if cand.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    scores = vectors[cand].astype(np.float32) @ q
+    k = min(k, cand.size)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return cand[top].astype(np.int64), scores[top]
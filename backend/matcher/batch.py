@@ -0,0 +1,70 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from schemas.schemas import MatchCandidate, MatchResult, UserDTO, UserRecord, VacancyDTO, VacancyRecord
+from .config import MatcherConfig
+from .embeddings import encode_in_batches, text_vector
+from .lexicon import LexiconSnapshot, current
+from .normalization import canonicalize_skills_with_lexicon
+from .scorer import compute_match_canon
+from .skills import Canon
+
+
+def _canon_memo(memo: Dict[Tuple[str, ...], Canon], skills: Sequence[str], lexicon: LexiconSnapshot) -> Canon:
+    key = tuple(skills or ())
+    canon = memo.get(key)
+    if canon is None:
+        canon = memo[key] = canonicalize_skills_with_lexicon(key, lexicon=lexicon)
+    return canon
+
+
+def _embedding_texts(vacancy: VacancyDTO | VacancyRecord, users: Sequence[UserDTO | UserRecord | MatchCandidate], cfg: MatcherConfig) -> List[Optional[float]]:
+    # близость текстов всей пачки одним кодированием и одним матрично-векторным произведением
+    if cfg.text.method != "embedding" or not vacancy.description:
+        return [None] * len(users)
+    with_text = [i for i, user in enumerate(users) if user.experience_description]
+    out: List[Optional[float]] = [cfg.text.neutral_if_empty] * len(users)
+    if with_text:
+        vectors = encode_in_batches([users[i].experience_description for i in with_text])
+        sims = np.clip(vectors @ text_vector(vacancy.description), 0.0, 1.0)
+        for i, sim in zip(with_text, sims.tolist()):
+            out[i] = sim
+    return out
+
+
+def score_users(vacancy: VacancyDTO | VacancyRecord, users: Sequence[UserDTO | UserRecord | MatchCandidate], cfg: MatcherConfig) -> List[MatchResult]:
+    """
+    скоринг пачки кандидатов против одной вакансии.
+    каноны must/nice вакансии считаются один раз на пачку, каноны навыков
+    пользователей — один раз на уникальный набор навыков, тексты при
+    text.method=embedding — одним кодированием на пачку.
+    функция уровня модуля — выполняется в пуле процессов (infrastructure.executors).
+    вся пачка канонизируется одним снимком словаря, даже если его заменят посреди пачки
+    """
+    lexicon = current()
+    must_canon = canonicalize_skills_with_lexicon(vacancy.must_have, lexicon=lexicon)
+    nice_canon = canonicalize_skills_with_lexicon(vacancy.nice_to_have, lexicon=lexicon)
+    memo: Dict[Tuple[str, ...], Canon] = {}
+    texts = _embedding_texts(vacancy, users, cfg)
+    return [
+        compute_match_canon(user, vacancy, cfg, _canon_memo(memo, user.hard_skills, lexicon), must_canon, nice_canon, t)
+        for user, t in zip(users, texts)
+    ]
+
+
+def score_vacancies(user: UserDTO | UserRecord, vacancies: Sequence[VacancyDTO | VacancyRecord], cfg: MatcherConfig) -> List[MatchResult]:
+    """
+    скоринг одного пользователя против пачки вакансий: канон навыков
+    пользователя — один раз на пачку
+    """
+    lexicon = current()
+    user_canon = canonicalize_skills_with_lexicon(user.hard_skills, lexicon=lexicon)
+    memo: Dict[Tuple[str, ...], Canon] = {}
+    return [
+        compute_match_canon(
+            user, vac, cfg, user_canon,
+            _canon_memo(memo, vac.must_have, lexicon), _canon_memo(memo, vac.nice_to_have, lexicon),
+        )
+        for vac in vacancies
+    ]
@@ -0,0 +1,496 @@
+from __future__ import annotations
+import bisect
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from schemas.schemas import MatchCandidate, VacancyDTO, VacancyRecord
+from .affinity import SkillAffinity, current_affinity
+from .ann import search_ivf, train_ivf
+from .config import MatcherConfig
+from .embeddings import get_backend, text_hash, text_vector
+from .lexicon import LexiconSnapshot, current
+from .normalization import canonicalize_skills_with_lexicon
+from .textsim import _sklearn
+
+MAGIC = b"NNHSNAP1"
+_PREFIX = struct.Struct("<8sQ")
+_ALIGN = 64
+
+# токенизация TfidfVectorizer(ngram_range=(1, 2)) из matcher.textsim: lowercase,
+# token_pattern по умолчанию, униграммы и биграммы через пробел
+_TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")
+# idf при fit на двух документах (smooth_idf): терм в обоих — 1, в одном — ln(3/2) + 1
+_IDF_ONE = math.log(1.5) + 1.0
+_MAX_FEATURES = 10000
+# запас на расхождение float с поштучным compute_match: кандидат на границе
+# порога лучше пропустить на точный скоринг, чем потерять
+_SCREEN_EPS = 1e-6
+# векторы в снимке — float16: ошибка косинуса единичных векторов не больше ~2^-11,
+# скрининг берёт его с этим запасом сверху
+_F16_EPS = 1e-3
+_ENCODE_BATCH = 512
+
+class SnapshotChanged(RuntimeError):
+    """
+    файл снимка заменён (или сменился словарь) между планированием и скорингом пачки
+    """
+
+
+def text_terms(text: str) -> Counter:
+    tokens = _TOKEN_RE.findall(text.lower())
+    terms = Counter(tokens)
+    terms.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return terms
+
+
+def default_path() -> str:
+    import tempfile
+    return os.path.join(tempfile.gettempdir(), "nizhnovhack-candidates.snap")
+
+
+class SnapshotBuilder:
+    """
+    сборка колоночного снимка пользователей постранично (add_rows) и запись
+    одним файлом (write). каноны навыков считаются словарём lexicon —
+    его версия пишется в заголовок, читатели с другим словарём снимок не используют.
+    с embedder — ещё векторы experience_description и IVF-индекс по ним; векторы
+    неизменившихся текстов (тот же id и отпечаток) берутся из previous без пересчёта
+    """
+
+    def __init__(
+        self,
+        lexicon: LexiconSnapshot,
+        embedder: Any = None,
+        previous: Optional[CandidateSnapshot] = None,
+        ivf_lists: int = 0,
+    ) -> None:
+        self.lexicon = lexicon
+        self.embedder = embedder
+        self.ivf_lists = ivf_lists
+        self.reused = 0
+        self._ids: List[bytes] = []
+        self._months: List[int] = []
+        self._has_text: List[int] = []
+        self._skill_lens: List[int] = []
+        self._skill_ids: List[int] = []
+        self._term_lens: List[int] = []
+        self._term_ids: List[int] = []
+        self._term_counts: List[int] = []
+        self._canon_ids: Dict[str, int] = {}
+        self._vocab: Dict[str, int] = {}
+        self._memo: Dict[Tuple[str, ...], List[int]] = {}
+        self._text_hashes: List[int] = []
+        self._vectors: List[np.ndarray] = []
+        self._previous: Optional[CandidateSnapshot] = None
+        self._previous_rows: Dict[bytes, int] = {}
+        if embedder is not None and previous is not None and previous.embedding_model == embedder.model_id:
+            self._previous = previous
+            self._previous_rows = {previous.ids[i].tobytes(): i for i in range(previous.rows)}
+
+    def add_rows(self, rows: Iterable[MatchCandidate]) -> None:
+        """
+        строки пользователей: MatchCandidate (или любой объект с теми же полями)
+        """
+        rows = list(rows)
+        if self.embedder is not None:
+            self._add_vectors(rows)
+        for row in rows:
+            self._ids.append(row.id.bytes)
+            self._months.append(row.experience_total_months or 0)
+
+            key = tuple(row.hard_skills or ())
+            skill_ids = self._memo.get(key)
+            if skill_ids is None:
+                u_set, _ = canonicalize_skills_with_lexicon(key, lexicon=self.lexicon)
+                skill_ids = self._memo[key] = sorted(
+                    self._canon_ids.setdefault(c, len(self._canon_ids)) for c in u_set
+                )
+            self._skill_lens.append(len(skill_ids))
+            self._skill_ids.extend(skill_ids)
+
+            description = row.experience_description
+            self._has_text.append(1 if description else 0)
+            terms = text_terms(description) if description else {}
+            self._term_lens.append(len(terms))
+            for term, count in terms.items():
+                self._term_ids.append(self._vocab.setdefault(term, len(self._vocab)))
+                self._term_counts.append(count)
+
+    def _add_vectors(self, rows: List[MatchCandidate]) -> None:
+        hashes = [text_hash(row.experience_description) for row in rows]
+        block = np.zeros((len(rows), self.embedder.dim), dtype=np.float16)
+        missing: List[int] = []
+        prev = self._previous
+        for i, (row, h) in enumerate(zip(rows, hashes)):
+            if not h:
+                continue
+            j = self._previous_rows.get(row.id.bytes)
+            if j is not None and int(prev.text_hash[j]) == h:
+                block[i] = prev.embeddings[j]
+                self.reused += 1
+            else:
+                missing.append(i)
+        if missing:
+            texts = [rows[i].experience_description for i in missing]
+            for i in range(0, len(missing), _ENCODE_BATCH):
+                block[missing[i:i + _ENCODE_BATCH]] = self.embedder.encode(texts[i:i + _ENCODE_BATCH])
+        self._text_hashes.extend(hashes)
+        self._vectors.append(block)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def write(self, path: str, watermark: Any = None) -> int:
+        """
+        атомарная публикация: запись во временный файл рядом и os.replace.
+        уже открытые читателями отображения продолжают видеть старый файл.
+        возвращает generation нового снимка
+        """
+        vocab = sorted(self._vocab, key=lambda t: t.encode("utf-8"))
+        remap = np.empty(len(vocab), dtype=np.int32)
+        remap[[self._vocab[t] for t in vocab]] = np.arange(len(vocab), dtype=np.int32)
+        blob = [t.encode("utf-8") for t in vocab]
+
+        term_counts = np.asarray(self._term_counts, dtype=np.int64)
+        term_lens = np.asarray(self._term_lens, dtype=np.int64)
+        term_indptr = np.zeros(len(term_lens) + 1, dtype=np.int64)
+        np.cumsum(term_lens, out=term_indptr[1:])
+        sq = np.zeros(len(term_counts) + 1, dtype=np.int64)
+        np.cumsum(term_counts * term_counts, out=sq[1:])
+
+        skill_indptr = np.zeros(len(self._skill_lens) + 1, dtype=np.int64)
+        np.cumsum(self._skill_lens, out=skill_indptr[1:])
+        vocab_offsets = np.zeros(len(blob) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in blob], out=vocab_offsets[1:])
+
+        arrays = {
+            "ids": np.frombuffer(b"".join(self._ids), dtype=np.uint8).reshape(-1, 16),
+            "months": np.asarray(self._months, dtype=np.int32),
+            "has_text": np.asarray(self._has_text, dtype=np.uint8),
+            "skill_indptr": skill_indptr,
+            "skill_ids": np.asarray(self._skill_ids, dtype=np.int32),
+            "term_indptr": term_indptr,
+            "term_ids": remap[np.asarray(self._term_ids, dtype=np.int64)] if self._term_ids else np.zeros(0, np.int32),
+            "term_counts": term_counts.astype(np.uint16 if term_counts.size == 0 or term_counts.max() < 2**16 else np.int32),
+            "term_sq": sq[term_indptr[1:]] - sq[term_indptr[:-1]],
+            "vocab_offsets": vocab_offsets,
+            "vocab_blob": np.frombuffer(b"".join(blob), dtype=np.uint8),
+        }
+        if self.embedder is not None:
+            vectors = np.vstack(self._vectors) if self._vectors else np.zeros((0, self.embedder.dim), np.float16)
+            arrays["text_hash"] = np.asarray(self._text_hashes, dtype=np.uint64)
+            arrays["embeddings"] = vectors
+            # строки без текста (нулевой вектор) в индекс не входят
+            arrays.update(train_ivf(vectors, self.ivf_lists, include=np.flatnonzero(arrays["has_text"])))
+        generation = time.time_ns()
+        header = {
+            "generation": generation,
+            "built_at": time.time(),
+            "rows": len(self._ids),
+            "lexicon_version": self.lexicon.version,
+            "watermark": watermark,
+            "canons": list(self._canon_ids),
+            "embedding_model": self.embedder.model_id if self.embedder is not None else None,
+            "arrays": {},
+        }
+        # смещения массивов зависят от длины заголовка — место под них с запасом
+        layout_base = _ALIGN * math.ceil((_PREFIX.size + len(json.dumps(header, ensure_ascii=False).encode()) + 64 * len(arrays) + 256) / _ALIGN)
+        offset = layout_base
+        for name, arr in arrays.items():
+            header["arrays"][name] = [offset, arr.dtype.str, list(arr.shape)]
+            offset += _ALIGN * math.ceil(arr.nbytes / _ALIGN)
+        raw = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        assert _PREFIX.size + len(raw) <= layout_base
+
+        tmp = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(_PREFIX.pack(MAGIC, len(raw)))
+            f.write(raw)
+            for name, arr in arrays.items():
+                f.seek(header["arrays"][name][0])
+                f.write(np.ascontiguousarray(arr).tobytes())
+            f.truncate(offset)
+        os.replace(tmp, path)
+        return generation
+
+
+class _Vocab:
+    """
+    отсортированный словарь термов поверх отображения файла — для bisect без копий
+    """
+
+    def __init__(self, offsets: np.ndarray, blob: memoryview) -> None:
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]])
+
+    def find(self, term: str) -> int:
+        key = term.encode("utf-8")
+        i = bisect.bisect_left(self, key)
+        return i if i < len(self) and self[i] == key else -1
+
+
+class CandidateSnapshot:
+    """
+    снимок, открытый только на чтение через mmap: массивы — представления numpy
+    над отображением, страницы файла общие для всех процессов на машине
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_len = _PREFIX.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a candidate snapshot")
+        header = json.loads(self._mm[_PREFIX.size:_PREFIX.size + header_len])
+        self.generation: int = header["generation"]
+        self.built_at: float = header["built_at"]
+        self.rows: int = header["rows"]
+        self.lexicon_version: int = header["lexicon_version"]
+        self.watermark: Any = header["watermark"]
+        self.canons: List[str] = header["canons"]
+
+        arrays: Dict[str, np.ndarray] = {}
+        for name, (offset, dtype, shape) in header["arrays"].items():
+            count = int(np.prod(shape)) if shape else 0
+            arrays[name] = np.frombuffer(self._mm, dtype=np.dtype(dtype), count=count, offset=offset).reshape(shape)
+        self.ids = arrays["ids"]
+        self.months = arrays["months"]
+        self.has_text = arrays["has_text"]
+        self.skill_indptr = arrays["skill_indptr"]
+        self.skill_ids = arrays["skill_ids"]
+        self.term_indptr = arrays["term_indptr"]
+        self.term_ids = arrays["term_ids"]
+        self.term_counts = arrays["term_counts"]
+        self.term_sq = arrays["term_sq"]
+        self.vocab = _Vocab(arrays["vocab_offsets"], memoryview(arrays["vocab_blob"]))
+        # векторы текстов и IVF — только в снимке, собранном с эмбеддингами
+        self.embedding_model: Optional[str] = header.get("embedding_model")
+        self.text_hash = arrays.get("text_hash")
+        self.embeddings = arrays.get("embeddings")
+        self._ivf = (arrays.get("ivf_centroids"), arrays.get("ivf_offsets"), arrays.get("ivf_rows"))
+
+    def age_s(self) -> float:
+        """
+        сколько секунд назад сборщик последний раз подтвердил актуальность (mtime файла)
+        """
+        try:
+            return time.time() - os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return math.inf
+
+    def user_ids(self, rows: np.ndarray) -> List[UUID]:
+        return [UUID(bytes=self.ids[i].tobytes()) for i in rows]
+
+    def nearest(self, query: np.ndarray, k: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k пользователей, чей experience_description ближе всего к query (вектор того же
+        бэкенда): строки снимка и косинусы. приближённо — по nprobe спискам IVF
+        """
+        if self.embeddings is None:
+            raise ValueError(f"{self.path}: snapshot has no embeddings")
+        return search_ivf(self.embeddings, *self._ivf, query, k, nprobe)
+
+
+_open: Dict[str, CandidateSnapshot] = {}
+
+
+def load_snapshot(path: str) -> Optional[CandidateSnapshot]:
+    """
+    снимок по пути, открытый один раз на процесс; после замены файла сборщиком
+    открывается новый. None — файла ещё нет
+    """
+    try:
+        inode = os.stat(path).st_ino
+    except FileNotFoundError:
+        return None
+    snap = _open.get(path)
+    if snap is None or snap.inode != inode:
+        snap = _open[path] = CandidateSnapshot(path)
+    return snap
+
+
+def _row_sums(values: np.ndarray, indptr: np.ndarray) -> np.ndarray:
+    # суммы по строкам CSR через префиксные суммы: без ловушки reduceat на пустых строках
+    acc = np.zeros(len(values) + 1, dtype=values.dtype)
+    np.cumsum(values, out=acc[1:])
+    return acc[indptr[1:]] - acc[indptr[:-1]]
+
+
+def _experience(months: np.ndarray, vacancy: VacancyDTO | VacancyRecord, cfg: MatcherConfig) -> np.ndarray:
+    # векторный matcher.experience.experience_score: выше минимума всегда 1.0
+    u = np.maximum(months.astype(np.float64), 0.0)
+    mmin = vacancy.min_exp_months if vacancy.min_exp_months is not None else 0
+    if mmin <= 0:
+        return np.ones(len(u))
+    return np.where(u < mmin, np.clip((u / mmin) ** cfg.exp.under_min_gamma, 0.0, 1.0), 1.0)
+
+
+def _row_max(values: np.ndarray, indptr: np.ndarray) -> np.ndarray:
+    # максимум по строкам CSR (значения >= 0); пустая строка — 0
+    out = np.zeros(len(indptr) - 1, dtype=values.dtype)
+    nonempty = np.flatnonzero(np.diff(indptr) > 0)
+    if nonempty.size:
+        out[nonempty] = np.maximum.reduceat(values, indptr[nonempty])
+    return out
+
+
+def _skill_share(
+    snap: CandidateSnapshot,
+    targets: set,
+    threshold: int,
+    neutral: float,
+    affinity: SkillAffinity,
+    affinity_weight: float,
+    start: int,
+    stop: int,
+) -> np.ndarray:
+    # доля targets, у которых есть канон пользователя с token_set_ratio >= threshold,
+    # плюс частичный зачёт смежных по affinity — как matcher.skills._match_sets;
+    # fuzzy и близость считаются один раз по таблице канонов снимка
+    if not targets:
+        return np.full(stop - start, neutral)
+    indptr = snap.skill_indptr[start:stop + 1]
+    ids = snap.skill_ids[indptr[0]:indptr[-1]]
+    local = indptr - indptr[0]
+    matched = np.zeros(stop - start, dtype=np.float64)
+    if snap.canons and ids.size:
+        target_list = list(targets)
+        scores = process.cdist(target_list, snap.canons, scorer=fuzz.token_set_ratio, dtype=np.float64)
+        for t, hit in zip(target_list, scores >= threshold):
+            credit = hit.astype(np.float64)
+            row = affinity.row(t) if affinity_weight > 0 else None
+            if row:
+                near = np.fromiter((row.get(c.lower(), 0.0) for c in snap.canons), dtype=np.float64, count=len(snap.canons))
+                credit = np.where(hit, 1.0, affinity_weight * near)
+            matched += _row_max(credit[ids], local)
+    return matched / len(targets)
+
+
+def _text(snap: CandidateSnapshot, vacancy: VacancyDTO | VacancyRecord, cfg: MatcherConfig, start: int, stop: int) -> np.ndarray:
+    """
+    cosine TF-IDF из matcher.textsim без построения векторайзера на каждую пару:
+    у пары из двух документов idf терма — 1 (есть в обоих) или ln(3/2) + 1,
+    поэтому нормы и скалярное произведение собираются из сумм по общим термам.
+    где результат может разойтись с поштучным (max_features, текст без TF-IDF) —
+    верхняя оценка 1.0, кандидат уходит на точный скоринг
+    """
+    neutral = cfg.text.neutral_if_empty
+    has_text = snap.has_text[start:stop].astype(bool)
+    if not vacancy.description:
+        return np.full(stop - start, neutral)
+    if cfg.text.method == "embedding":
+        return _text_embedding(snap, vacancy, neutral, has_text, start, stop)
+    if not cfg.text.use_tfidf or _sklearn() is None:
+        return np.where(has_text, 1.0, neutral)
+
+    vac_terms = text_terms(vacancy.description)
+    known = {}
+    for term, count in vac_terms.items():
+        idx = snap.vocab.find(term)
+        if idx >= 0:
+            known[idx] = count
+    v_ids = np.fromiter(sorted(known), dtype=np.int64, count=len(known))
+    v_counts = np.asarray([known[i] for i in v_ids.tolist()], dtype=np.int64)
+    v_sq = sum(c * c for c in vac_terms.values())
+
+    indptr = snap.term_indptr[start:stop + 1]
+    ids = snap.term_ids[indptr[0]:indptr[-1]]
+    counts = snap.term_counts[indptr[0]:indptr[-1]].astype(np.int64)
+    local = indptr - indptr[0]
+    if v_ids.size and ids.size:
+        pos = np.minimum(np.searchsorted(v_ids, ids), v_ids.size - 1)
+        hit = v_ids[pos] == ids
+        vc = np.where(hit, v_counts[pos], 0)
+        uc = np.where(hit, counts, 0)
+        dot = _row_sums(uc * vc, local)
+        u_common_sq = _row_sums(uc * uc, local)
+        v_common_sq = _row_sums(vc * vc, local)
+        common = _row_sums(hit.astype(np.int64), local)
+    else:
+        dot = u_common_sq = v_common_sq = common = np.zeros(stop - start, dtype=np.int64)
+
+    k2 = _IDF_ONE * _IDF_ONE
+    u_norm = k2 * snap.term_sq[start:stop] - (k2 - 1.0) * u_common_sq
+    v_norm = k2 * v_sq - (k2 - 1.0) * v_common_sq
+    denom = np.sqrt(u_norm * v_norm)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sim = np.where(denom > 0, dot / np.where(denom > 0, denom, 1.0), 0.0)
+    sim = np.clip(sim, 0.0, 1.0)
+    union = np.diff(indptr) + len(vac_terms) - common
+    sim = np.where(union > _MAX_FEATURES, 1.0, sim)
+    return np.where(has_text, sim, neutral)
+
+
+def _text_embedding(snap: CandidateSnapshot, vacancy: VacancyDTO | VacancyRecord, neutral: float, has_text: np.ndarray, start: int, stop: int) -> np.ndarray:
+    # matcher.embeddings.embedding_similarity по готовым векторам снимка, с запасом на float16
+    model_id = get_backend().model_id
+    if snap.embedding_model != model_id:
+        raise SnapshotChanged(f"embeddings {model_id}, snapshot built with {snap.embedding_model}")
+    sim = snap.embeddings[start:stop].astype(np.float32) @ text_vector(vacancy.description)
+    return np.where(has_text, np.clip(sim + _F16_EPS, 0.0, 1.0), neutral)
+
+
+def screen_rows(snap: CandidateSnapshot, vacancy: VacancyDTO | VacancyRecord, cfg: MatcherConfig, start: int, stop: int) -> np.ndarray:
+    """
+    строки [start, stop), чей score по снимку >= cfg.accept_threshold (с запасом
+    на float). итоговое решение всё равно за compute_match по профилю из БД
+    """
+    lexicon = current()
+    if lexicon.version != snap.lexicon_version:
+        raise SnapshotChanged(f"lexicon v{lexicon.version}, snapshot built with v{snap.lexicon_version}")
+    stop = min(stop, snap.rows)
+    if start >= stop:
+        return np.zeros(0, dtype=np.int64)
+    m_set, _ = canonicalize_skills_with_lexicon(vacancy.must_have, lexicon=lexicon)
+    n_set, _ = canonicalize_skills_with_lexicon(vacancy.nice_to_have, lexicon=lexicon)
+    affinity, aw = current_affinity(), cfg.skills.affinity_weight
+    sk = cfg.skills
+    w = cfg.weights
+    total = (
+        w.w_experience * _experience(snap.months[start:stop], vacancy, cfg) +
+        w.w_must       * _skill_share(snap, m_set, sk.threshold_must, sk.neutral_must, affinity, aw, start, stop) +
+        w.w_nice       * _skill_share(snap, n_set, sk.threshold_nice, sk.neutral_nice, affinity, aw, start, stop) +
+        w.w_text       * _text(snap, vacancy, cfg, start, stop)
+    )
+    return np.flatnonzero(total >= cfg.accept_threshold - _SCREEN_EPS) + start
+
+
+def screen_snapshot_range(
+    path: str,
+    generation: int,
+    vacancy: VacancyDTO | VacancyRecord,
+    cfg: MatcherConfig,
+    start: int,
+    stop: int,
+) -> List[UUID]:
+    """
+    id прошедших скрининг в строках [start, stop) снимка generation.
+    функция уровня модуля — выполняется в пуле процессов, каждый процесс
+    отображает тот же файл
+    """
+    snap = _open.get(path)
+    if snap is None or snap.generation != generation:
+        snap = load_snapshot(path)
+    if snap is None or snap.generation != generation:
+        raise SnapshotChanged(f"{path}: generation {generation} is gone")
+    return snap.user_ids(screen_rows(snap, vacancy, cfg, start, stop))
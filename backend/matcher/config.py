@@ -13,6 +13,8 @@ class SkillMatchConfig:
     threshold_nice: int = 80
     neutral_must: float = 0.6
     neutral_nice: float = 0.5
+    # частичный зачёт смежного навыка: вес * близость по matcher.affinity (0 — выключено)
+    affinity_weight: float = 0.5
 
 @dataclass(slots=True)
 class ExperienceConfig:
@@ -24,10 +26,24 @@ class ExperienceConfig:
 class TextSimConfig:
     use_tfidf: bool       = True
     neutral_if_empty: float = 0.5
+    method: str           = "tfidf"   # tfidf|embedding
+
+@dataclass(slots=True)
+class LLMGateConfig:
+    # LLM-отчёт только для неуверенной зоны [accept_threshold, llm_below);
+    # выше — шаблонный отчёт по details (ниже accept_threshold отчётов нет вовсе)
+    enabled: bool         = True
+    llm_below: float      = 0.8
+    # доля уверенных пар, которые всё равно идут в LLM — для оценки согласия шаблона с моделью
+    audit_rate: float     = 0.05
+    # score LLM (0..100), с которого её ответ считается согласием с принятием эвристикой
+    agree_min_score: int  = 60
 
 @dataclass(slots=True)
 class MatcherConfig:
     weights: MatchWeights       = field(default_factory=MatchWeights)
     skills: SkillMatchConfig    = field(default_factory=SkillMatchConfig)
     exp: ExperienceConfig       = field(default_factory=ExperienceConfig)
-    text: TextSimConfig         = field(default_factory=TextSimConfig)
\ No newline at end of file
+    text: TextSimConfig         = field(default_factory=TextSimConfig)
+    gate: LLMGateConfig         = field(default_factory=LLMGateConfig)
+    accept_threshold: float     = 0.5
\ No newline at end of file
@@ -0,0 +1,136 @@
+from __future__ import annotations
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from settings.settings import settings
+
+_WORD_RE = re.compile(r"(?u)\b\w\w+\b")
+# усечение слова до префикса — грубый стемминг: «разработке», «разработчик» -> «разра»
+_STEM = 5
+
+
+def _hashing_terms(text: str) -> List[str]:
+    words = _WORD_RE.findall(text.lower())
+    return words + [w[:_STEM] for w in words if len(w) > _STEM]
+
+
+class HashingBackend:
+    """
+    эмбеддинг без модели: слова и их префиксы в dim корзин со знаковым
+    хэшированием — count sketch, скалярные произведения сохраняются в среднем.
+    ловит словоформы, но не перевод и не синонимы
+    """
+
+    def __init__(self, dim: int) -> None:
+        from sklearn.feature_extraction.text import HashingVectorizer
+        self.dim = dim
+        self.model_id = f"hashing-stem{_STEM}-{dim}"
+        self._vec = HashingVectorizer(analyzer=_hashing_terms, n_features=dim, alternate_sign=True, norm="l2")
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        return _normalize(self._vec.transform(list(texts)).toarray().astype(np.float32))
+
+
+class StaticBackend:
+    """
+    статические эмбеддинги слов с диска (fastText/MUSE, model2vec и т.п.):
+    каталог с vocab.txt (токен на строку, в нижнем регистре) и vectors.npy
+    (len(vocab) x dim). матрица отображается mmap — общие страницы на все процессы.
+    текст — среднее векторов известных слов; выровненные ru/en словари
+    дают близость перефразировок между языками
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(os.path.join(path, "vocab.txt"), encoding="utf-8") as f:
+            self._vocab = {line.rstrip("\n"): i for i, line in enumerate(f)}
+        self._vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        if self._vectors.shape[0] != len(self._vocab):
+            raise ValueError(f"{path}: {len(self._vocab)} tokens, {self._vectors.shape[0]} vectors")
+        self.dim = int(self._vectors.shape[1])
+        with open(os.path.join(path, "vectors.npy"), "rb") as f:
+            digest = hashlib.blake2b(f.read(1 << 20), digest_size=6).hexdigest()
+        self.model_id = f"static-{os.path.basename(os.path.normpath(path))}-{self.dim}-{digest}"
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            ids = [self._vocab[w] for w in _WORD_RE.findall(text.lower()) if w in self._vocab]
+            if ids:
+                out[i] = np.asarray(self._vectors[ids], dtype=np.float32).mean(axis=0)
+        return _normalize(out)
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return np.divide(x, norms, out=np.zeros_like(x), where=norms > 0)
+
+
+@lru_cache(maxsize=1)
+def get_backend():
+    """
+    бэкенд процесса по settings.embeddings; static без файла модели —
+    с предупреждением на hashing, чтобы матчинг не падал
+    """
+    cfg = settings.embeddings
+    if cfg.backend == "static":
+        try:
+            return StaticBackend(cfg.path)
+        except (OSError, ValueError) as e:
+            print(f"Embedding model {cfg.path!r} unavailable, using hashing: {e}")
+    return HashingBackend(cfg.dim)
+
+
+def encode_texts(texts: Sequence[str]) -> np.ndarray:
+    """
+    (len(texts), dim) float32 с единичной нормой; пустой текст — нулевой вектор
+    """
+    return get_backend().encode(texts)
+
+
+def text_hash(text: Optional[str]) -> int:
+    """
+    отпечаток текста: по нему снимок переиспользует векторы неизменившихся профилей
+    """
+    if not text:
+        return 0
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+
+def text_vector(text: str) -> np.ndarray:
+    """
+    вектор одного текста с LRU-кэшем процесса: описание вакансии кодируется
+    один раз на все пары и пачки
+    """
+    vec = _cache.get(text)
+    if vec is None:
+        vec = _cache[text] = encode_texts([text])[0]
+        if len(_cache) > settings.embeddings.cache_size:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(text)
+    return vec
+
+
+def embedding_similarity(desc_a: Optional[str], desc_b: Optional[str], neutral_if_empty: float = 0.5) -> float:
+    """
+    косинус эмбеддингов в [0..1] (отрицательный — 0); пустой текст — нейтральное значение,
+    как у matcher.textsim.text_similarity
+    """
+    if not desc_a or not desc_b:
+        return neutral_if_empty
+    return float(min(1.0, max(0.0, float(np.dot(text_vector(desc_a), text_vector(desc_b))))))
+
+
+def encode_in_batches(texts: List[str], batch_size: int = 512) -> np.ndarray:
+    if not texts:
+        return np.zeros((0, get_backend().dim), dtype=np.float32)
+    return np.vstack([encode_texts(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)])
@@ -0,0 +1,101 @@
+from __future__ import annotations
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from rapidfuzz import process, fuzz
+
+Q = 3
+_PAD = "\x00" * (Q - 1)
+
+
+def _sorted_form(s: str) -> str:
+    # строка, которую token_set_ratio сравнивает при пустом пересечении токенов
+    return " ".join(sorted(set(s.split())))
+
+
+def _grams(s: str) -> Counter:
+    padded = _PAD + s + _PAD
+    return Counter(padded[i:i + Q] for i in range(len(padded) - Q + 1))
+
+
+def _max_distance(la: int, lb: int, threshold: float) -> int:
+    # token_set_ratio >= threshold  =>  indel(a, b) <= (1 - threshold/100) * (la + lb)
+    return math.floor((100 - threshold) * (la + lb) / 100 + 1e-9)
+
+
+class TrigramIndex:
+    """
+    инвертированный индекс по словарю вариантов для extractOne(..., scorer=token_set_ratio).
+
+    у token_set_ratio >= threshold два пути:
+      - у строк есть общий токен — кандидаты из индекса по токенам;
+      - общих токенов нет — тогда сравниваются отсортированные наборы токенов,
+        и indel-расстояние ограничено порогом; по q-граммной лемме у таких строк
+        не меньше (la + Q - 1) - Q * d общих триграмм — фильтр по счётчику.
+    кандидаты скорятся rapidfuzz в исходном порядке списка, поэтому при лучшем
+    score >= threshold результат совпадает с полным перебором (включая выбор
+    первого из равных). ниже порога score — лучший среди кандидатов, не глобальный.
+    """
+
+    def __init__(self, variants: Sequence[str]) -> None:
+        self.variants = list(variants)
+        self._lengths: List[int] = []
+        self._by_token: Dict[str, List[int]] = {}
+        self._by_gram: Dict[str, List[Tuple[int, int]]] = {}
+        for idx, v in enumerate(self.variants):
+            form = _sorted_form(v)
+            self._lengths.append(len(form))
+            for token in set(v.split()):
+                self._by_token.setdefault(token, []).append(idx)
+            for gram, count in _grams(form).items():
+                self._by_gram.setdefault(gram, []).append((idx, count))
+        self._max_length = max(self._lengths, default=0)
+
+    def candidates(self, query: str, threshold: float) -> Optional[List[int]]:
+        """
+        индексы вариантов, которые могут набрать >= threshold, по возрастанию;
+        None — порог слишком низкий для фильтра, нужен полный перебор
+        """
+        tokens = set(query.split())
+        if not tokens:
+            return []
+        form = " ".join(sorted(tokens))
+        la = len(form)
+        # худший случай для фильтра — самый длинный допустимый вариант: |la - lb| <= d
+        # даёт lb <= la * (200 - t) / t; если у него общих триграмм может не быть — перебор
+        if threshold <= 0:
+            return None
+        lb_hi = min(self._max_length, math.floor(la * (200 - threshold) / threshold + 1e-9))
+        if la + Q - 1 - Q * _max_distance(la, lb_hi, threshold) <= 0:
+            return None
+
+        found = set()
+        for token in tokens:
+            found.update(self._by_token.get(token, ()))
+
+        shared: Dict[int, int] = {}
+        for gram, qc in _grams(form).items():
+            for idx, vc in self._by_gram.get(gram, ()):
+                shared[idx] = shared.get(idx, 0) + min(qc, vc)
+        for idx, common in shared.items():
+            lb = self._lengths[idx]
+            d = _max_distance(la, lb, threshold)
+            if abs(la - lb) <= d and common >= la + Q - 1 - Q * d:
+                found.add(idx)
+        return sorted(found)
+
+    def extract_one(self, query: str, threshold: float) -> Optional[Tuple[str, float, int]]:
+        """
+        как process.extractOne(query, variants, scorer=fuzz.token_set_ratio)
+        при результате >= threshold
+        """
+        idxs = self.candidates(query, threshold)
+        if idxs is None:
+            return process.extractOne(query, self.variants, scorer=fuzz.token_set_ratio)
+        if not idxs:
+            return None
+        best = process.extractOne(query, [self.variants[i] for i in idxs], scorer=fuzz.token_set_ratio)
+        if best is None:
+            return None
+        return best[0], best[1], idxs[best[2]]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from utils.patterns.skills import SKILL_LEXICON
+from .fuzzy_index import TrigramIndex
+from .skills_index import build_skill_index
+
+SkillIndex = Tuple[Dict[str, str], Dict[str, str], List[str]]
+
+
+@dataclass(frozen=True, slots=True)
+class LexiconSnapshot:
+    """
+    скомпилированный словарь навыков одной версии. неизменяемый: читатели берут
+    ссылку через current() и работают с ней до конца операции, замена — новым объектом
+    version 0 — встроенный SKILL_LEXICON (БД недоступна или ещё не загружена)
+    """
+    version: int
+    lexicon: Dict[str, List[str]]
+    # get_skill_index(): variant2canon_lower, canon_lower2display, variants_list
+    index: SkillIndex
+    fuzzy: TrigramIndex
+    # для utils.txt_parse.best_skill_match
+    canonical: Tuple[str, ...]
+    variants: Tuple[str, ...]
+    variant_to_canon: Dict[str, str]
+
+
+def compile_lexicon(lexicon: Mapping[str, Sequence[str]], version: int) -> LexiconSnapshot:
+    """
+    все производные структуры словаря; порядок ключей lexicon значим —
+    при совпадении варианта у нескольких канонов выигрывает первый
+    """
+    lex = {canon: list(variants or ()) for canon, variants in lexicon.items()}
+    index = build_skill_index(lex)
+
+    variants: List[str] = []
+    variant_to_canon: Dict[str, str] = {}
+    for canon, syns in lex.items():
+        variants.append(canon)
+        variants.extend(syns)
+        variant_to_canon.setdefault(canon.lower(), canon)
+        for syn in syns:
+            variant_to_canon.setdefault(syn.lower(), canon)
+
+    return LexiconSnapshot(
+        version=version,
+        lexicon=lex,
+        index=index,
+        fuzzy=TrigramIndex(index[2]),
+        canonical=tuple(lex),
+        variants=tuple(dict.fromkeys(variants)),
+        variant_to_canon=variant_to_canon,
+    )
+
+
+_current: Optional[LexiconSnapshot] = None
+_subscribers: List[Callable[[LexiconSnapshot], None]] = []
+
+
+def current() -> LexiconSnapshot:
+    """
+    действующий снимок словаря. чтение без блокировок: присваивание ссылки атомарно,
+    снимок неизменяем. до первой загрузки из БД — встроенный SKILL_LEXICON
+    """
+    snap = _current
+    if snap is None:
+        snap = install_lexicon(compile_lexicon(SKILL_LEXICON, 0), notify=False)
+    return snap
+
+
+def install_lexicon(snapshot: LexiconSnapshot, notify: bool = True) -> LexiconSnapshot:
+    """
+    атомарная замена снимка; подписчики сбрасывают кэши, построенные на старом
+    """
+    global _current
+    _current = snapshot
+    if notify:
+        for callback in list(_subscribers):
+            callback(snapshot)
+    return snapshot
+
+
+def on_lexicon_change(callback: Callable[[LexiconSnapshot], None]) -> Callable[[LexiconSnapshot], None]:
+    """
+    регистрация сброса кэша, зависящего от словаря (канонизации, битсеты навыков)
+    """
+    _subscribers.append(callback)
+    return callback
+
+
+def get_skill_index() -> SkillIndex:
+    return current().index
+
+
+def get_fuzzy_index() -> TrigramIndex:
+    return current().fuzzy
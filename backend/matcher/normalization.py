@@ -1,18 +1,21 @@
 from __future__ import annotations
-from typing import Iterable, Set, Dict, Any, Tuple
-from rapidfuzz import process, fuzz
-from .skills_index import get_skill_index
+from typing import Iterable, Optional, Set, Dict, Any, Tuple
+from .lexicon import LexiconSnapshot, current
 
 def canonicalize_skills_with_lexicon(
     skills: Iterable[str],
     fuzzy_threshold: int = 90,
+    lexicon: Optional[LexiconSnapshot] = None,
 ) -> Tuple[Set[str], Dict[str, Any]]:
     """
     Возвращает:
       - множество КРАСИВЫХ канонов (как в твоём SKILL_LEXICON: 'Python', 'FastAPI', ...)
       - детали сопоставления {original -> (matched_variant, canonical_display, score)}
+    lexicon — снимок словаря, общий для пачки; по умолчанию действующий
     """
-    variant2canon, canon_l2disp, variant_list = get_skill_index()
+    snap = lexicon or current()
+    variant2canon, canon_l2disp, _ = snap.index
+    index = snap.fuzzy
     seen: Set[str] = set()
     details: Dict[str, Any] = {}
 
@@ -29,8 +32,9 @@ def canonicalize_skills_with_lexicon(
             details[orig] = {"match_variant": sn, "canonical": canon_l2disp[canon_l], "score": 100}
             continue
 
-        # 2) fuzzy по списку вариантов
-        best = process.extractOne(sn, variant_list, scorer=fuzz.token_set_ratio)
+        # 2) fuzzy по вариантам: триграммный индекс сужает перебор до кандидатов,
+        # результат при score >= fuzzy_threshold тот же, что у extractOne по всему списку
+        best = index.extract_one(sn, fuzzy_threshold)
         if best and best[1] >= fuzzy_threshold:
             matched_variant = best[0]
             canon_l = variant2canon[matched_variant]
@@ -43,3 +47,16 @@ def canonicalize_skills_with_lexicon(
             details[orig] = {"match_variant": None, "canonical": orig.strip(), "score": best[1] if best else 0}
 
     return seen, details
+
+
+def canonical_skill_keys(
+    skills: Iterable[str],
+    fuzzy_threshold: int = 90,
+    lexicon: Optional[LexiconSnapshot] = None,
+) -> list[str]:
+    """
+    ключи канонов в нижнем регистре — то, что хранится в user.hard_skills_canon
+    и сравнивается оператором && в SQL-префильтре
+    """
+    canon, _ = canonicalize_skills_with_lexicon(skills, fuzzy_threshold=fuzzy_threshold, lexicon=lexicon)
+    return sorted({c.lower() for c in canon if c})
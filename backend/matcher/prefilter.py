@@ -0,0 +1,49 @@
+import math
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from .config import MatcherConfig
+
+
+def expand_must_canon(must_canon: Sequence[str], vocabulary: Iterable[str], threshold: int) -> List[str]:
+    """
+    ключи канонов пользователей (из vocabulary — user_skill_canon), которые скоринг
+    засчитает за какой-либо из must_canon: token_set_ratio >= threshold, как в
+    matcher.skills._match_sets. подмножество токенов даёт 100, поэтому у must-have
+    «React Native» сюда попадает «react», у «React» — «react native»; без расширения
+    SQL-префильтр (hard_skills_canon && must) отбрасывал таких кандидатов.
+    сравнение по ключам в нижнем регистре — не строже, чем по канонам скоринга
+    """
+    keys = set(must_canon)
+    vocab = [v for v in vocabulary if v not in keys]
+    if must_canon and vocab:
+        scores = process.cdist(list(must_canon), vocab, scorer=fuzz.token_set_ratio, score_cutoff=threshold, workers=1)
+        keys.update(vocab[i] for i in np.flatnonzero((scores >= threshold).any(axis=0)))
+    return sorted(keys)
+
+
+def min_months_without_must(min_exp_months: Optional[int], cfg: MatcherConfig) -> Optional[int]:
+    """
+    минимальный стаж (в месяцах), при котором кандидат без единого совпадения
+    по must-have ещё может набрать cfg.accept_threshold (nice, текст и частичный
+    зачёт смежных must-навыков по matcher.affinity — по максимуму).
+      - 0    — проходит любой стаж, префильтр по навыкам ничего не отсекает
+      - None — без совпадений по must-have порог недостижим
+    """
+    w = cfg.weights
+    if w.w_experience <= 0:
+        return None
+    # близость в матрице не больше 1 — зачёт must без совпадений не больше affinity_weight
+    partial_must = w.w_must * min(1.0, max(0.0, cfg.skills.affinity_weight))
+    e_required = (cfg.accept_threshold - w.w_nice - w.w_text - partial_must) / w.w_experience
+    if e_required <= 0:
+        return 0
+    if e_required > 1:
+        return None
+    if not min_exp_months or min_exp_months <= 0:
+        # без нижней границы experience_score = 1 для любого стажа
+        return 0
+    # experience_score = (u/min)^gamma при u < min
+    return math.ceil(min_exp_months * e_required ** (1.0 / cfg.exp.under_min_gamma))
@@ -1,8 +1,12 @@
+import time
 from typing import Dict, Any
-from schemas.schemas import UserDTO, VacancyDTO, MatchResult
+from schemas.schemas import MatchCandidate, UserDTO, UserRecord, VacancyDTO, VacancyRecord, MatchResult
 from .config import MatcherConfig
 from .experience import experience_score
-from .skills import skills_scores
+from .normalization import canonicalize_skills_with_lexicon
+from .skills import Canon, skills_scores_canon
+from .affinity import current_affinity
+from .embeddings import embedding_similarity
 from .textsim import text_similarity
 
 def compute_match(
@@ -11,8 +15,34 @@ def compute_match(
     cfg: MatcherConfig,
     skill_lexicon: Dict[str, list[str]] | None = None
 ) -> MatchResult:
+    return compute_match_canon(
+        user,
+        vacancy,
+        cfg,
+        user_canon=canonicalize_skills_with_lexicon(user.hard_skills),
+        must_canon=canonicalize_skills_with_lexicon(vacancy.must_have),
+        nice_canon=canonicalize_skills_with_lexicon(vacancy.nice_to_have),
+    )
+
+def compute_match_canon(
+    user: UserDTO | UserRecord | MatchCandidate,
+    vacancy: VacancyDTO | VacancyRecord,
+    cfg: MatcherConfig,
+    user_canon: Canon,
+    must_canon: Canon,
+    nice_canon: Canon,
+    text: float | None = None,
+) -> MatchResult:
+    """
+    compute_match с заранее каноникализированными навыками (см. matcher.batch);
+    text — текстовая близость, уже посчитанная для всей пачки
+    """
+    t0 = time.perf_counter()
     # --- 1) опыт ---
-    u_months = user.experience_total_months or (user.experience_years * 12 + user.experience_months)
+    u_months = user.experience_total_months
+    if u_months is None:
+        # DTO, собранный не из БД: у строки таблицы колонка вычисляемая и всегда есть
+        u_months = user.experience_years * 12 + user.experience_months
     e = experience_score(
         user_months=u_months,
         min_months=vacancy.min_exp_months,
@@ -22,25 +52,39 @@ def compute_match(
         over_max_bonus=cfg.exp.over_max_bonus,
     )
 
+    t1 = time.perf_counter()
     # --- 2) скиллы ---
-    s_must, s_nice, skill_det = skills_scores(
-        user_skills=user.hard_skills,
-        must_have=vacancy.must_have,
-        nice_to_have=vacancy.nice_to_have,
+    s_must, s_nice, skill_det = skills_scores_canon(
+        user_canon,
+        must_canon,
+        nice_canon,
         threshold_must=cfg.skills.threshold_must,
         threshold_nice=cfg.skills.threshold_nice,
         neutral_must=cfg.skills.neutral_must,
         neutral_nice=cfg.skills.neutral_nice,
+        affinity=current_affinity(),
+        affinity_weight=cfg.skills.affinity_weight,
     )
 
+    t2 = time.perf_counter()
     # --- 3) текстовая близость ---
-    t = text_similarity(
-        user.experience_description or "",
-        vacancy.description or "",
-        use_tfidf=cfg.text.use_tfidf,
-        neutral_if_empty=cfg.text.neutral_if_empty,
-    )
+    if text is not None:
+        t = text
+    elif cfg.text.method == "embedding":
+        t = embedding_similarity(
+            user.experience_description or "",
+            vacancy.description or "",
+            neutral_if_empty=cfg.text.neutral_if_empty,
+        )
+    else:
+        t = text_similarity(
+            user.experience_description or "",
+            vacancy.description or "",
+            use_tfidf=cfg.text.use_tfidf,
+            neutral_if_empty=cfg.text.neutral_if_empty,
+        )
 
+    t3 = time.perf_counter()
     # --- агрегирование ---
     w = cfg.weights
     total = (
@@ -64,4 +108,10 @@ def compute_match(
         "vacancy_max": vacancy.max_exp_months,
         **skill_det
     }
-    return MatchResult(score=total, breakdown=breakdown, details=details)
+    timings = {
+        "experience": t1 - t0,
+        "skills": t2 - t1,
+        "text": t3 - t2,
+        "total": time.perf_counter() - t0,
+    }
+    return MatchResult(score=total, breakdown=breakdown, details=details, timings=timings)
@@ -1,18 +1,27 @@
 # app/matcher/skills.py
 from __future__ import annotations
-from typing import Iterable, Dict, Any, Tuple
+from typing import Iterable, Dict, Any, Optional, Tuple
 from rapidfuzz import process, fuzz
+from .affinity import SkillAffinity
 from .normalization import canonicalize_skills_with_lexicon
 
-def _match_sets(user: set[str], target: set[str], threshold: int) -> tuple[int, int, dict]:
+def _match_sets(
+    user: set[str],
+    target: set[str],
+    threshold: int,
+    affinity: Optional[SkillAffinity] = None,
+    affinity_weight: float = 0.0,
+) -> tuple[float, int, dict]:
     """
     Для каждого target ищем лучшее соответствие в user (оба уже «красивые» каноны).
+    Без совпадения — частичный зачёт affinity_weight * близость к самому близкому
+    навыку пользователя по матрице affinity (FastAPI за Flask и т.п.).
     """
     details: dict[str, dict[str, Any]] = {}
     if not target:
         return 0, 0, details
 
-    matched = 0
+    matched = 0.0
     u_list = list(user)
     for t in target:
         if not u_list:
@@ -22,10 +31,20 @@ def _match_sets(user: set[str], target: set[str], threshold: int) -> tuple[int,
         if best and best[1] >= threshold:
             matched += 1
             details[t] = {"match": best[0], "score": best[1]}
-        else:
-            details[t] = {"match": None, "score": best[1] if best else 0}
+            continue
+        details[t] = {"match": None, "score": best[1] if best else 0}
+        if affinity is not None and affinity_weight > 0:
+            row = affinity.row(t)
+            if row:
+                near, near_score = max(((u, row.get(u.lower(), 0.0)) for u in u_list), key=lambda p: p[1])
+                if near_score > 0:
+                    matched += affinity_weight * near_score
+                    details[t].update(related=near, affinity=near_score)
     return matched, len(target), details
 
+Canon = Tuple[set, Dict[str, Any]]
+
+
 def skills_scores(
     user_skills: Iterable[str],
     must_have: Iterable[str],
@@ -36,22 +55,48 @@ def skills_scores(
     neutral_nice: float,
 ) -> Tuple[float, float, Dict[str, Any]]:
     # Каноникализация через твой словарь
-    u_set, u_det = canonicalize_skills_with_lexicon(user_skills)
-    m_set, m_det = canonicalize_skills_with_lexicon(must_have)
-    n_set, n_det = canonicalize_skills_with_lexicon(nice_to_have)
+    return skills_scores_canon(
+        canonicalize_skills_with_lexicon(user_skills),
+        canonicalize_skills_with_lexicon(must_have),
+        canonicalize_skills_with_lexicon(nice_to_have),
+        threshold_must=threshold_must,
+        threshold_nice=threshold_nice,
+        neutral_must=neutral_must,
+        neutral_nice=neutral_nice,
+    )
+
+def skills_scores_canon(
+    user_canon: Canon,
+    must_canon: Canon,
+    nice_canon: Canon,
+    threshold_must: int,
+    threshold_nice: int,
+    neutral_must: float,
+    neutral_nice: float,
+    affinity: Optional[SkillAffinity] = None,
+    affinity_weight: float = 0.0,
+) -> Tuple[float, float, Dict[str, Any]]:
+    """
+    то же, что skills_scores, по уже каноникализированным наборам —
+    чтобы в пакетном скоринге каноны вакансии считались один раз.
+    affinity — частичный зачёт смежных навыков (см. _match_sets)
+    """
+    u_set, u_det = user_canon
+    m_set, m_det = must_canon
+    n_set, n_det = nice_canon
 
     if not m_set:
         must_score = neutral_must
         must_matches = {}
     else:
-        m_matched, m_total, must_matches = _match_sets(set(u_set), set(m_set), threshold_must)
+        m_matched, m_total, must_matches = _match_sets(set(u_set), set(m_set), threshold_must, affinity, affinity_weight)
         must_score = m_matched / m_total if m_total else neutral_must
 
     if not n_set:
         nice_score = neutral_nice
         nice_matches = {}
     else:
-        n_matched, n_total, nice_matches = _match_sets(set(u_set), set(n_set), threshold_nice)
+        n_matched, n_total, nice_matches = _match_sets(set(u_set), set(n_set), threshold_nice, affinity, affinity_weight)
         nice_score = n_matched / n_total if n_total else neutral_nice
 
     return must_score, nice_score, {
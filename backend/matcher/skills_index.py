@@ -1,17 +1,14 @@
 from __future__ import annotations
-from functools import lru_cache
-from typing import Dict, Iterable, Tuple
-
-from utils.patterns.skills import SKILL_LEXICON  # твой файл
+from typing import Dict, Mapping, Sequence, Tuple
 
 def _norm(s: str) -> str:
     # мягкая нормализация — без агрессивных замен типа "javascript"->"js"
     # чтобы не конфликтовать с твоим словарём
     return " ".join(s.strip().lower().split())
 
-@lru_cache(maxsize=1)
-def get_skill_index() -> Tuple[Dict[str, str], Dict[str, str], list[str]]:
+def build_skill_index(lexicon: Mapping[str, Sequence[str]]) -> Tuple[Dict[str, str], Dict[str, str], list[str]]:
     """
+    индекс по словарю навыков (канон -> варианты); действующий — matcher.lexicon.get_skill_index()
     Возвращает кортеж:
       - variant2canon_lower: { вариант (lower) -> канон (lower) }
       - canon_lower2display: { канон (lower) -> канон в красивом виде (как в словаре) }
@@ -20,7 +17,7 @@ def get_skill_index() -> Tuple[Dict[str, str], Dict[str, str], list[str]]:
     variant2canon_lower: Dict[str, str] = {}
     canon_lower2display: Dict[str, str] = {}
 
-    for display_canon, variants in SKILL_LEXICON.items():
+    for display_canon, variants in lexicon.items():
         canon_l = _norm(display_canon)
         canon_lower2display[canon_l] = display_canon
         # сам канон тоже является вариантом
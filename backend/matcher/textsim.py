@@ -1,11 +1,19 @@
+from functools import lru_cache
 from typing import Optional
 
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
-    _SK_AVAILABLE = True
-except Exception:
-    _SK_AVAILABLE = False
+
+@lru_cache(maxsize=1)
+def _sklearn():
+    """
+    sklearn (и scipy под ним) импортируется при первом сравнении текстов,
+    а не при старте воркера. None — если sklearn не установлен
+    """
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import cosine_similarity
+    except Exception:
+        return None
+    return TfidfVectorizer, cosine_similarity
 
 
 def text_similarity(
@@ -20,7 +28,9 @@ def text_similarity(
     if not desc_a or not desc_b:
         return neutral_if_empty
 
-    if use_tfidf and _SK_AVAILABLE:
+    sk = _sklearn() if use_tfidf else None
+    if sk is not None:
+        TfidfVectorizer, cosine_similarity = sk
         # По умолчанию TF-IDF уже нормализует регистр и токенизирует Unicode-слова.
         vec = TfidfVectorizer(ngram_range=(1, 2), min_df=1, max_features=10000)
         X = vec.fit_transform([desc_a, desc_b])
@@ -1,7 +1,7 @@
 from sqlalchemy import (
-    Column, Text, Date, Integer, SmallInteger, CheckConstraint, Computed, text
+    Column, Text, Date, DateTime, Integer, SmallInteger, BigInteger, CheckConstraint, Computed, Index, text
 )
-from sqlalchemy.dialects.postgresql import ENUM, ARRAY
+from sqlalchemy.dialects.postgresql import ENUM, ARRAY, JSONB, UUID
 from sqlalchemy.sql import quoted_name
 
 from persistent.db.base import Base, WithId, With_created_at, With_updated_at
@@ -10,6 +10,9 @@ from schemas.schemas import SexEnum
 class User(Base, WithId, With_created_at, With_updated_at):
     __tablename__ = quoted_name("user", True)
 
+    # id сотрудника в HR-системе — ключ upsert массовой синхронизации (NULL — заведён вручную)
+    external_id = Column(Text)
+
     first_name = Column(Text, nullable=False)
     last_name  = Column(Text, nullable=False)
 
@@ -35,6 +38,10 @@ class User(Base, WithId, With_created_at, With_updated_at):
     experience_description = Column(Text)
 
     hard_skills = Column(ARRAY(Text), nullable=False, server_default=text("ARRAY[]::text[]"))
+    # каноны навыков (lower) по SKILL_LEXICON — для SQL-префильтра матчинга
+    hard_skills_canon = Column(ARRAY(Text), nullable=False, server_default=text("ARRAY[]::text[]"))
+    # версия словаря (skill_lexicon_version.version), которой посчитан hard_skills_canon
+    hard_skills_canon_version = Column(BigInteger, nullable=False, server_default=text("0"))
 
     __table_args__ = (
         CheckConstraint("btrim(first_name) <> '' AND char_length(first_name) <= 50",
@@ -49,6 +56,14 @@ class User(Base, WithId, With_created_at, With_updated_at):
                         name="ck_user_experience_years"),
         CheckConstraint("experience_months BETWEEN 0 AND 11",
                         name="ck_user_experience_months"),
+        # индексы горячих запросов, см. infrastructure/db/migrations.py
+        Index("ix_user_full_name", "first_name", "last_name"),
+        Index("ix_user_created_at_id", "created_at", "id"),
+        Index("ix_user_hard_skills_gin", "hard_skills", postgresql_using="gin"),
+        Index("ix_user_hard_skills_canon_gin", "hard_skills_canon", postgresql_using="gin"),
+        Index("ux_user_external_id", "external_id", unique=True),
+        Index("ix_user_hard_skills_canon_version", "hard_skills_canon_version"),
+        Index("ix_user_updated_at", "updated_at"),
         {"extend_existing": True},
     )
     
@@ -64,10 +79,121 @@ class Vacancy(Base, WithId, With_created_at, With_updated_at):
     must_have = Column(ARRAY(Text), nullable=False, server_default=text("'{}'::text[]"))
     nice_to_have = Column(ARRAY(Text), nullable=False, server_default=text("'{}'::text[]"))
 
-    __table_args__ = tuple(
+    __table_args__ = (
         CheckConstraint(
             "(min_exp_months IS NULL) OR (max_exp_months IS NULL) "
             "OR (min_exp_months <= max_exp_months)",
             name="vacancy_min_max_check",
-        )
-    )
\ No newline at end of file
+        ),
+        Index("ix_vacancy_created_at_id", "created_at", "id"),
+        Index("ix_vacancy_must_have_gin", "must_have", postgresql_using="gin"),
+        Index("ix_vacancy_nice_to_have_gin", "nice_to_have", postgresql_using="gin"),
+    )
+
+
+class SkillLexicon(Base):
+    """
+    словарь навыков: канон -> варианты написания. position задаёт порядок —
+    при совпадении варианта у нескольких канонов выигрывает первый.
+    любое изменение увеличивает skill_lexicon_version.version (триггер, миграция 4)
+    """
+    __tablename__ = "skill_lexicon"
+
+    canon = Column(Text, primary_key=True)
+    variants = Column(ARRAY(Text), nullable=False, server_default=text("'{}'::text[]"))
+    position = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("btrim(canon) <> ''", name="ck_skill_lexicon_canon"),
+    )
+
+
+class SkillLexiconVersion(Base):
+    """
+    единственная строка (id = 1): version — текущая версия словаря,
+    canon_version — версия, по которой посчитан user.hard_skills_canon
+    """
+    __tablename__ = "skill_lexicon_version"
+
+    id = Column(SmallInteger, primary_key=True, server_default=text("1"))
+    version = Column(BigInteger, nullable=False, server_default=text("0"))
+    canon_version = Column(BigInteger, nullable=False, server_default=text("0"))
+
+    __table_args__ = (
+        CheckConstraint("id = 1", name="ck_skill_lexicon_version_single_row"),
+    )
+
+
+class UserSkillCanon(Base):
+    """
+    все ключи канонов, встречавшиеся в user.hard_skills_canon (триггеры, миграция 5).
+    SQL-префильтр матчинга расширяет по ним must-have вакансии до всех канонов,
+    которые скоринг засчитает (matcher.prefilter.expand_must_canon). строки не удаляются —
+    лишний ключ только ослабляет фильтр
+    """
+    __tablename__ = "user_skill_canon"
+
+    canon = Column(Text, primary_key=True)
+
+
+class SkillAffinity(Base):
+    """
+    единственная строка (id = 1): матрица близости навыков (matcher.affinity),
+    посчитанная по совместной встречаемости в профилях и вакансиях.
+    neighbours — {канон: {смежный канон: близость}}; version растёт с каждой пересборкой
+    """
+    __tablename__ = "skill_affinity"
+
+    id = Column(SmallInteger, primary_key=True, server_default=text("1"))
+    version = Column(BigInteger, nullable=False, server_default=text("0"))
+    lexicon_version = Column(BigInteger, nullable=False, server_default=text("0"))
+    documents = Column(Integer, nullable=False, server_default=text("0"))
+    built_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
+    neighbours = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+
+    __table_args__ = (
+        CheckConstraint("id = 1", name="ck_skill_affinity_single_row"),
+    )
+
+
+class MatchJob(Base, WithId, With_created_at, With_updated_at):
+    """
+    фоновая задача LLM-отчётов по эвристическому ранжированию (services.match_job_service).
+    items — ранжирование целиком: [{rank, user_id, vacancy_id, vac_name, position,
+    score, report_key, prompt?}]; prompt есть только у top_k, для них считается отчёт.
+    lease_until — аренда исполнителя: просроченную задачу подхватывает любой воркер
+    """
+    __tablename__ = "match_job"
+
+    kind = Column(Text, nullable=False)
+    subject_id = Column(UUID(as_uuid=True))
+    status = Column(Text, nullable=False, server_default=text("'pending'"))
+    top_k = Column(Integer, nullable=False, server_default=text("0"))
+    items = Column(JSONB, nullable=False, server_default=text("'[]'::jsonb"))
+    failed = Column(Integer, nullable=False, server_default=text("0"))
+    lease_until = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        CheckConstraint("status IN ('pending', 'running', 'done', 'failed')", name="ck_match_job_status"),
+        Index("ix_match_job_created_at", "created_at"),
+    )
+
+
+class MatchReport(Base):
+    """
+    LLM-отчёт (MatchAns) по паре профиль + вакансия. key — хэш модели, режима
+    и текстов промпта: повторный просмотр и другие задачи берут готовый отчёт
+    """
+    __tablename__ = "match_report"
+
+    key = Column(Text, primary_key=True)
+    user_id = Column(UUID(as_uuid=True))
+    vacancy_id = Column(UUID(as_uuid=True))
+    score = Column(Integer, nullable=False)
+    decision = Column(Text, nullable=False)
+    reasoning_report = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
+
+    __table_args__ = (
+        Index("ix_match_report_created_at", "created_at"),
+    )
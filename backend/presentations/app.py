@@ -1,26 +1,78 @@
-from fastapi import FastAPI, UploadFile, File, Path, HTTPException, status, Form
+from fastapi import FastAPI, UploadFile, File, Path, HTTPException, status, Form, Query, Response, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Annotated, Dict
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager
+import asyncio
+from typing import List, Annotated, Dict, Optional
 from uuid import UUID
 
-from ai_services.matcher import analyzer
-from schemas.schemas import VacancyDTO, UserDTO, UserLogin, MatchingResponse, Message
+from schemas.schemas import VacancyDTO, UserDTO, UserLogin, MatchingResponse, MatchJobDTO, Message, SimilarUserDTO, VacancyBriefDTO, UserBriefDTO, BulkUpsertReport, LexiconDTO, LexiconVersionDTO, SkillVariants
 from services.parsing_service import parsing_service
 from services.user_service import user_service
 from ai_services.career import ai_service
 from services.matching_service import matching_service
-from infrastructure.db.connect import sync_create_tables 
+from services.lexicon_service import lexicon_service
+from services.affinity_service import affinity_service
+from services.snapshot_service import snapshot_service
+from services.match_job_service import match_job_service
+from services.report_gate_service import report_gate_service
+from repositories.db.loaders import RequestLoaders, get_loaders
+from infrastructure.db.connect import sync_create_tables, init_engine, dispose_engine
+from infrastructure.db.change_feed import change_feed
+from infrastructure.executors import warm_cpu_pool, shutdown_cpu_pool
+from infrastructure.metrics import MetricsMiddleware, metrics_payload
+from infrastructure.tracing import TracingMiddleware, setup_tracing, shutdown_tracing
+from settings.settings import settings
 from utils.user_convert import update_user_from_analysis
+from utils.cursor import next_cursor
+from presentations.responses import stream_json_array, json_list, sse_response
+
+PAGE_LIMIT_DEFAULT = 200
+PAGE_LIMIT_MAX = 1000
+
+
+def _top_k(k: Optional[int]) -> int:
+    return settings.match_jobs.top_k if k is None else k
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    трассировка, bootstrap схемы (если не вынесен в шаг деплоя), прогрев общего
+    пула БД, словарь навыков и матрица их близости из БД, пул CPU-процессов
+    (уже с ними), сборка снимка кандидатов и слушатель ленты изменений на старте воркера,
+    их закрытие на остановке
+    """
+    setup_tracing()
+    if settings.pg.bootstrap_on_startup:
+        await asyncio.to_thread(sync_create_tables)
+    await init_engine()
+    await lexicon_service.start()
+    await affinity_service.start()
+    warm_cpu_pool()
+    await snapshot_service.start()
+    await change_feed.start()
+    try:
+        yield
+    finally:
+        await change_feed.stop()
+        await match_job_service.stop()
+        await snapshot_service.stop()
+        await affinity_service.stop()
+        await lexicon_service.stop()
+        await asyncio.to_thread(shutdown_cpu_pool)
+        await dispose_engine()
+        shutdown_tracing()
 
 app = FastAPI(title="Т1 хак",
               docs_url='/docs',
               redoc_url='/redoc',
               openapi_url='/openapi.json',
-              root_path="/api"
+              root_path="/api",
+              lifespan=lifespan,
+              default_response_class=ORJSONResponse
             )
 
 user_service = user_service
-sync_create_tables()
 
 app.add_middleware(
     CORSMiddleware,
@@ -28,7 +80,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 
 @app.get("/")
 async def test_endpoint() -> str:
@@ -37,6 +92,14 @@ async def test_endpoint() -> str:
     """
     return "ok"
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """
+    метрики в формате Prometheus
+    """
+    payload, content_type = metrics_payload()
+    return Response(content=payload, media_type=content_type)
+
 @app.post("/vacancy")
 async def add_vacancy(name: Annotated[str, Form(...)], vacancy: UploadFile = File(...)) -> VacancyDTO:
     """
@@ -53,13 +116,30 @@ async def add_vacancy(name: Annotated[str, Form(...)], vacancy: UploadFile = Fil
     dto = await parsing_service.add_vacancy(vac_bytes, name)
     return dto
 
-@app.get("/vacancy")
-async def get_vacancy_list() -> List[VacancyDTO]:
+@app.get("/vacancy", response_model=List[VacancyDTO] | List[VacancyBriefDTO])
+async def get_vacancy_list(
+    limit: int = Query(PAGE_LIMIT_DEFAULT, ge=1, le=PAGE_LIMIT_MAX),
+    after: Optional[str] = Query(None),
+    brief: bool = Query(False),
+) -> Response:
     """
-    получение всех вакансий
+    получение вакансий страницами от новых к старым.
+    курсор следующей страницы — в заголовке X-Next-Cursor, brief=true — без description
     """
-    data = await parsing_service.get_vacancy_list()
-    return data
+    if brief:
+        data = await parsing_service.get_vacancy_briefs(limit=limit, after=after)
+    else:
+        data = await parsing_service.get_vacancy_list(limit=limit, after=after)
+    cursor = next_cursor(data, limit)
+    headers = {"X-Next-Cursor": cursor} if cursor else None
+    return json_list(data, VacancyBriefDTO if brief else VacancyDTO, headers=headers)
+
+@app.get("/vacancy/export")
+async def export_vacancies():
+    """
+    выгрузка всех вакансий потоковым JSON-массивом
+    """
+    return stream_json_array(parsing_service.iter_vacancies(), filename="vacancies.json")
 
 @app.delete("/vacancy/{id}")
 async def delete_vacancy(id: str = Path(...)) -> None:
@@ -99,19 +179,56 @@ async def generate_skills(id: str = Path(...)):
     return skills
     
 
-@app.get("/get_all_users")
-async def get_all_users()->List[UserDTO]:
+@app.get("/get_all_users", response_model=List[UserDTO] | List[UserBriefDTO])
+async def get_all_users(
+    limit: int = Query(PAGE_LIMIT_DEFAULT, ge=1, le=PAGE_LIMIT_MAX),
+    after: Optional[str] = Query(None),
+    brief: bool = Query(False),
+) -> Response:
     """
-    Возвращает список всех пользователей
+    Возвращает пользователей страницами от новых к старым.
+    курсор следующей страницы — в заголовке X-Next-Cursor, brief=true — без experience_description
     """
-    answer = await user_service.get_all_users()
-    return answer
+    if brief:
+        answer = await user_service.get_user_briefs(limit=limit, after=after)
+    else:
+        answer = await user_service.get_all_users(limit=limit, after=after)
+    cursor = next_cursor(answer, limit)
+    headers = {"X-Next-Cursor": cursor} if cursor else None
+    return json_list(answer, UserBriefDTO if brief else UserDTO, headers=headers)
+
+@app.get("/users/export")
+async def export_users():
+    """
+    выгрузка всех пользователей потоковым JSON-массивом
+    """
+    return stream_json_array(user_service.iter_users(), filename="users.json")
 
 @app.post("/register")
 async def register(user: UserDTO) -> UUID:
     user_id = await user_service.put_user(user)
     return user_id
 
+@app.post("/users/bulk")
+async def bulk_upsert_users(
+    request: Request,
+    chunk_size: int = Query(1000, ge=1, le=5000),
+) -> BulkUpsertReport:
+    """
+    массовая загрузка/обновление пользователей из HR-системы.
+    тело — NDJSON (application/x-ndjson) или CSV с заголовком (text/csv),
+    строки с id или external_id (id в HR-системе) обновляют существующих пользователей
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        fmt = "ndjson"
+    elif content_type == "text/csv":
+        fmt = "csv"
+    else:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail="Ожидается application/x-ndjson или text/csv")
+    return await user_service.bulk_upsert(request.stream(), fmt, chunk_size=chunk_size)
+
 @app.post("/login")
 async def login(user: UserLogin) -> UUID:
     data = await user_service.check_user(user)
@@ -123,18 +240,24 @@ async def login(user: UserLogin) -> UUID:
 async def update_user_info(user: UserDTO, id: str = Path(...)) -> UserDTO:
     return await user_service.update_user_info(user, id)
 
-@app.put("/{user_id}/matching")
-async def match(user_id: str = Path(...)):
-    results = await matching_service.match(user_id)
+MatchMode = Annotated[str, Query(pattern="^(blocking|tiered)$",
+                                 description="tiered — эвристика сразу, LLM-отчёты в фоне (/match_jobs/{id})")]
+TopK = Annotated[Optional[int], Query(ge=0, le=200, description="сколько первых позиций отдать LLM в режиме tiered")]
+
+def _job_accepted(job: MatchJobDTO) -> Response:
+    return ORJSONResponse(job.model_dump(mode="json"), status_code=status.HTTP_202_ACCEPTED)
+
+@app.put("/{user_id}/matching", response_model=List[MatchingResponse] | MatchJobDTO)
+async def match(user_id: str = Path(...), mode: MatchMode = "blocking", k: TopK = None,
+                loaders: RequestLoaders = Depends(get_loaders)):
+    if mode == "tiered":
+        return _job_accepted(await match_job_service.start_user_job(user_id, _top_k(k), loaders))
+    results = await matching_service.match(user_id, loaders)
     resps = []
     for res in results:
         if res.decision:
-            profile = await matching_service.get_user_dict(user_id)
-            resp = await analyzer.match(
-                user_profile=profile, 
-                is_user=False, 
-                vacancy=res.vacancy.description
-            )
+            profile = await matching_service.get_user_dict(user_id, loaders)
+            resp = await report_gate_service.report(res, profile, res.vacancy.description or "")
             feedback = MatchingResponse(
                 score=resp.score,
                 vac_name=res.vacancy.name,
@@ -144,20 +267,19 @@ async def match(user_id: str = Path(...)):
             )
             resps.append(feedback)
     
-    return resps
+    return json_list(resps, MatchingResponse)
 
-@app.put("/vac/{vac_id}/matching")
-async def match(vac_id: str = Path(...)):
-    results = await matching_service.vacancy_match(vac_id)
+@app.put("/vac/{vac_id}/matching", response_model=List[MatchingResponse] | MatchJobDTO)
+async def match(vac_id: str = Path(...), mode: MatchMode = "blocking", k: TopK = None,
+                loaders: RequestLoaders = Depends(get_loaders)):
+    if mode == "tiered":
+        return _job_accepted(await match_job_service.start_vacancy_job(vac_id, _top_k(k), loaders))
+    results = await matching_service.vacancy_match(vac_id, loaders)
     resps = []
     for res in results:
         if res.decision:
-            profile = await matching_service.get_user_dict(res.user_id)
-            resp = await analyzer.match(
-                user_profile=profile, 
-                is_user=False, 
-                vacancy=res.vacancy.description
-            )
+            profile = await matching_service.get_user_dict(res.user_id, loaders)
+            resp = await report_gate_service.report(res, profile, res.vacancy.description or "")
             feedback = MatchingResponse(
                 score=resp.score,
                 position=profile["current_position"],
@@ -166,20 +288,30 @@ async def match(vac_id: str = Path(...)):
             )
             resps.append(feedback)
     
-    return resps
+    return json_list(resps, MatchingResponse)
+
+@app.get("/vac/{vac_id}/similar_users", response_model=List[SimilarUserDTO])
+async def similar_users(
+    vac_id: str = Path(...),
+    k: int = Query(50, ge=1, le=1000),
+    loaders: RequestLoaders = Depends(get_loaders),
+) -> List[SimilarUserDTO]:
+    """
+    ближайшие по смыслу профили к описанию вакансии (ANN по эмбеддингам снимка кандидатов)
+    """
+    return await matching_service.similar_users(vac_id, k, loaders)
 
-@app.put("/matching/vacancy")
-async def match_new_vac(vac: VacancyDTO):
-    results = await matching_service.new_vacancy_match(vac)
+@app.put("/matching/vacancy", response_model=List[MatchingResponse] | MatchJobDTO)
+async def match_new_vac(vac: VacancyDTO, mode: MatchMode = "blocking", k: TopK = None,
+                        loaders: RequestLoaders = Depends(get_loaders)):
+    if mode == "tiered":
+        return _job_accepted(await match_job_service.start_new_vacancy_job(vac, _top_k(k), loaders))
+    results = await matching_service.new_vacancy_match(vac, loaders)
     resps = []
     for res in results:
         if res.decision:
-            profile = await matching_service.get_user_dict(res.user_id)
-            resp = await analyzer.match(
-                user_profile=profile, 
-                is_user=False, 
-                vacancy=res.vacancy.description
-            )
+            profile = await matching_service.get_user_dict(res.user_id, loaders)
+            resp = await report_gate_service.report(res, profile, res.vacancy.description or "")
             feedback = MatchingResponse(
                 score=resp.score,
                 position=profile["current_position"],
@@ -188,7 +320,43 @@ async def match_new_vac(vac: VacancyDTO):
             )
             resps.append(feedback)
     
-    return resps
+    return json_list(resps, MatchingResponse)
+
+@app.get("/match_jobs/{job_id}", response_model=MatchJobDTO)
+async def get_match_job(job_id: str = Path(...)) -> MatchJobDTO:
+    """
+    ранжирование задачи tiered-матчинга и готовые к этому моменту LLM-отчёты
+    """
+    return await match_job_service.get_job(job_id)
+
+@app.get("/match_jobs/{job_id}/events")
+async def match_job_events(job_id: str = Path(...)):
+    """
+    SSE: event item — позиция с готовым отчётом (по мере готовности), event done — итог задачи
+    """
+    await match_job_service.get_job(job_id)  # 404 до начала потока
+    return sse_response(match_job_service.events(job_id))
+
+@app.get("/lexicon", response_model=LexiconDTO)
+async def get_lexicon() -> LexiconDTO:
+    """
+    словарь навыков и его версия
+    """
+    return LexiconDTO(**await lexicon_service.get_lexicon())
+
+@app.put("/lexicon/{canon:path}", response_model=LexiconVersionDTO)
+async def set_lexicon_skill(body: SkillVariants, canon: str = Path(...)) -> LexiconVersionDTO:
+    """
+    добавить навык или заменить его варианты написания — без передеплоя,
+    воркеры подхватывают новую версию словаря в фоне
+    """
+    if not canon.strip():
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="empty skill name")
+    return LexiconVersionDTO(version=await lexicon_service.set_skill(canon, body.variants))
+
+@app.delete("/lexicon/{canon:path}", response_model=LexiconVersionDTO)
+async def delete_lexicon_skill(canon: str = Path(...)) -> LexiconVersionDTO:
+    return LexiconVersionDTO(version=await lexicon_service.delete_skill(canon))
 
 @app.get("/user/{id}")
 async def get_user(id: str = Path(...)) -> UserDTO:
@@ -197,9 +365,9 @@ async def get_user(id: str = Path(...)) -> UserDTO:
 @app.post("/anal_hist/{id}")
 async def analyze_history(id: str = Path(...)) -> UserDTO:
     user = await user_service.get_user_by_id(id)
-    profile = await matching_service.get_user_dict(id)
+    profile = user.to_plain_dict()
     profile["career_expectations"] = ""
     data = await ai_service.analyze_dialog(id, profile)
-    new_user = update_user_from_analysis(user, data)
-    resp = await user_service.update_user_info(new_user, id)
+    new_user = update_user_from_analysis(user.model_copy(deep=True), data)
+    resp = await user_service.apply_user_changes(user, new_user, id)
     return resp
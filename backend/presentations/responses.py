@@ -0,0 +1,79 @@
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Type
+
+import orjson
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def json_list(
+    items: Sequence[BaseModel],
+    model: Type[BaseModel],
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    быстрый путь для списков DTO: dump_python ядром pydantic + orjson,
+    без повторной валидации response_model в FastAPI.
+    на длинных кириллических текстах orjson заметно быстрее dump_json,
+    см. benchmarks/serialization.py. даты UTC с "Z" — как у pydantic и выгрузок
+    """
+    return Response(
+        content=orjson.dumps(_list_adapter(model).dump_python(list(items)), option=orjson.OPT_UTC_Z),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def _dump_item(item: Any) -> bytes:
+    if isinstance(item, BaseModel):
+        return item.model_dump_json().encode()
+    # UserRecord/VacancyRecord: dataclass в orjson, даты UTC с "Z" — как у pydantic
+    return orjson.dumps(item, option=orjson.OPT_UTC_Z)
+
+
+async def _json_array(items: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    yield b"["
+    first = True
+    async for item in items:
+        if not first:
+            yield b","
+        first = False
+        yield _dump_item(item)
+    yield b"]"
+
+
+def stream_json_array(items: AsyncIterator[Any], filename: str | None = None) -> StreamingResponse:
+    """
+    отдаёт JSON-массив по мере чтения из БД, не собирая его в памяти целиком.
+    элементы — DTO или записи (schemas.UserRecord/VacancyRecord)
+    """
+    headers = {}
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(_json_array(items), media_type="application/json", headers=headers)
+
+
+async def _sse(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[bytes]:
+    async for name, payload in events:
+        if payload is None:
+            # комментарий SSE: держит соединение живым через прокси
+            yield f": {name}\n\n".encode()
+            continue
+        yield f"event: {name}\ndata: ".encode() + _dump_item(payload) + b"\n\n"
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """
+    Server-Sent Events из пар (событие, DTO); DTO None — keep-alive комментарий
+    """
+    return StreamingResponse(
+        _sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from infrastructure.db.connect import get_engine, pg_connection
+from infrastructure.metrics import observe_db
+from persistent.db.tables import SkillAffinity, User, Vacancy
+
+# ключ advisory lock пересборки матрицы близости навыков: делает один воркер
+AFFINITY_LOCK_KEY = 740_021_003
+# канал NOTIFY о новой версии матрицы (infrastructure.db.change_feed.on_channel)
+AFFINITY_CHANNEL = "skill_affinity"
+
+Neighbours = Dict[str, Dict[str, float]]
+
+
+class AffinityRepository:
+    def __init__(self):
+        self._sessionmaker = pg_connection()
+
+    @observe_db
+    async def get_version(self) -> int:
+        """
+        версия матрицы; 0 — ещё не строилась
+        """
+        async with self._sessionmaker() as session:
+            version = (await session.execute(
+                select(SkillAffinity.version).where(SkillAffinity.id == 1)
+            )).scalar_one_or_none()
+        return version or 0
+
+    @observe_db
+    async def load(self) -> Tuple[int, Neighbours]:
+        async with self._sessionmaker() as session:
+            row = (await session.execute(
+                select(SkillAffinity.version, SkillAffinity.neighbours).where(SkillAffinity.id == 1)
+            )).one_or_none()
+        return (row.version, dict(row.neighbours or {})) if row else (0, {})
+
+    async def _skill_documents(
+        self,
+        keys_fn: Callable[[Tuple[str, ...]], List[str]],
+        batch_size: int,
+    ) -> List[Sequence[str]]:
+        # профили: готовые каноны из hard_skills_canon; вакансии: must + nice через keys_fn
+        docs: List[Sequence[str]] = []
+        async with self._sessionmaker() as session:
+            users = await session.stream(
+                select(User.hard_skills_canon)
+                .where(func.cardinality(User.hard_skills_canon) > 0)
+                .execution_options(yield_per=batch_size)
+            )
+            async for part in users.partitions():
+                docs.extend(row.hard_skills_canon for row in part)
+            vacancies = (await session.execute(select(Vacancy.must_have, Vacancy.nice_to_have))).all()
+        keys = [tuple(v.must_have or ()) + tuple(v.nice_to_have or ()) for v in vacancies]
+        # fuzzy-канонизация — CPU, не в event loop
+        docs.extend(await asyncio.to_thread(lambda: [keys_fn(k) for k in keys]))
+        return docs
+
+    @observe_db
+    async def rebuild(
+        self,
+        lexicon_version: int,
+        max_age_s: float,
+        keys_fn: Callable[[Tuple[str, ...]], List[str]],
+        build_fn: Callable[[List[Sequence[str]]], Neighbours],
+        batch_size: int = 5000,
+    ) -> Optional[int]:
+        """
+        пересборка матрицы, если она старше max_age_s или посчитана другим словарём.
+        выполняет один процесс (advisory lock); None — собирает другой процесс
+        или матрица свежая, иначе — новая версия. о ней узнают все воркеры (NOTIFY)
+        """
+        async with get_engine().connect() as lock_conn:
+            locked = (await lock_conn.execute(
+                text("SELECT pg_try_advisory_lock(:k)"), {"k": AFFINITY_LOCK_KEY}
+            )).scalar_one()
+            await lock_conn.commit()
+            if not locked:
+                return None
+            try:
+                async with self._sessionmaker() as session:
+                    row = (await session.execute(
+                        select(SkillAffinity.built_at, SkillAffinity.lexicon_version, SkillAffinity.version)
+                        .where(SkillAffinity.id == 1)
+                    )).one_or_none()
+                # свежесть проверяется под блокировкой: соседний воркер мог только что собрать
+                if (
+                    row is not None and row.version > 0 and row.lexicon_version == lexicon_version
+                    and row.built_at > datetime.now(timezone.utc) - timedelta(seconds=max_age_s)
+                ):
+                    return None
+
+                docs = await self._skill_documents(keys_fn, batch_size)
+                neighbours = await asyncio.to_thread(build_fn, docs)
+                async with self._sessionmaker() as session:
+                    stmt = insert(SkillAffinity).values(
+                        id=1, version=1, lexicon_version=lexicon_version, documents=len(docs),
+                        built_at=func.now(), neighbours=neighbours,
+                    )
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[SkillAffinity.id],
+                        set_={
+                            "version": SkillAffinity.version + 1,
+                            "lexicon_version": stmt.excluded.lexicon_version,
+                            "documents": stmt.excluded.documents,
+                            "built_at": stmt.excluded.built_at,
+                            "neighbours": stmt.excluded.neighbours,
+                        },
+                    ).returning(SkillAffinity.version)
+                    version = (await session.execute(stmt)).scalar_one()
+                    await session.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": AFFINITY_CHANNEL, "payload": str(version)},
+                    )
+                    await session.commit()
+                return version
+            finally:
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": AFFINITY_LOCK_KEY})
+                await lock_conn.commit()
+
+
+affinity_repository = AffinityRepository()
@@ -0,0 +1,161 @@
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+
+from infrastructure.db.connect import get_engine, pg_connection
+from infrastructure.metrics import observe_db
+from persistent.db.tables import SkillLexicon, SkillLexiconVersion, User
+
+# ключ advisory lock пересчёта user.hard_skills_canon: делает один воркер
+RECANON_LOCK_KEY = 740_021_002
+
+
+class LexiconRepository:
+    def __init__(self):
+        self._sessionmaker = pg_connection()
+
+    @observe_db
+    async def get_versions(self) -> Tuple[int, int]:
+        """
+        (version, canon_version) словаря; (0, 0) — таблица ещё не заполнена
+        """
+        async with self._sessionmaker() as session:
+            row = (await session.execute(
+                select(SkillLexiconVersion.version, SkillLexiconVersion.canon_version)
+                .where(SkillLexiconVersion.id == 1)
+            )).one_or_none()
+        return (row.version, row.canon_version) if row else (0, 0)
+
+    @observe_db
+    async def has_stale_canons(self, version: int) -> bool:
+        """
+        есть ли пользователи с hard_skills_canon, посчитанным словарём старше version
+        """
+        async with self._sessionmaker() as session:
+            return bool(await session.scalar(
+                select(select(User.id).where(User.hard_skills_canon_version < version).exists())
+            ))
+
+    @observe_db
+    async def load(self) -> Tuple[int, Dict[str, List[str]]]:
+        """
+        версия и словарь в порядке position.
+        версия читается до строк: при конкурентной правке снимок окажется новее
+        своей версии (и перечитается на следующей проверке), но не наоборот
+        """
+        async with self._sessionmaker() as session:
+            version = (await session.execute(
+                select(SkillLexiconVersion.version).where(SkillLexiconVersion.id == 1)
+            )).scalar_one_or_none() or 0
+            rows = (await session.execute(
+                select(SkillLexicon.canon, SkillLexicon.variants).order_by(SkillLexicon.position, SkillLexicon.canon)
+            )).all()
+        return version, {row.canon: list(row.variants or ()) for row in rows}
+
+    @observe_db
+    async def upsert_skill(self, canon: str, variants: List[str]) -> None:
+        """
+        новый канон встаёт в конец словаря, существующий сохраняет позицию
+        """
+        async with self._sessionmaker() as session:
+            next_position = select(func.coalesce(func.max(SkillLexicon.position) + 1, 0)).scalar_subquery()
+            stmt = insert(SkillLexicon).values(canon=canon, variants=variants, position=next_position)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[SkillLexicon.canon],
+                set_={"variants": stmt.excluded.variants},
+            )
+            await session.execute(stmt)
+            await session.commit()
+
+    @observe_db
+    async def delete_skill(self, canon: str) -> None:
+        async with self._sessionmaker() as session:
+            res = await session.execute(
+                delete(SkillLexicon).where(SkillLexicon.canon == canon).returning(SkillLexicon.canon)
+            )
+            if res.scalar_one_or_none() is None:
+                await session.rollback()
+                raise HTTPException(status_code=404, detail="Skill not found")
+            await session.commit()
+
+    @observe_db
+    async def recanonicalize_users(
+        self,
+        version: int,
+        keys_fn: Callable[[Tuple[str, ...]], List[str]],
+        batch_size: int = 1000,
+    ) -> Optional[int]:
+        """
+        пересчёт user.hard_skills_canon у строк, посчитанных словарём старше version.
+        выполняет один процесс (advisory lock); None — пересчёт уже идёт в другом,
+        иначе — число изменённых строк. canon_version фиксируется в конце.
+        UPDATE условный (те же hard_skills, версия всё ещё старая): запись профиля
+        между чтением и UPDATE не затирается канонами прежних навыков, а строку,
+        которую воркер со старым словарём записал позже, найдёт следующий проход
+        (LexiconService.refresh, has_stale_canons)
+        """
+        async with get_engine().connect() as lock_conn:
+            locked = (await lock_conn.execute(
+                text("SELECT pg_try_advisory_lock(:k)"), {"k": RECANON_LOCK_KEY}
+            )).scalar_one()
+            await lock_conn.commit()
+            if not locked:
+                return None
+            try:
+                memo: Dict[Tuple[str, ...], List[str]] = {}
+                changed = 0
+                after = None
+                while True:
+                    stmt = (
+                        select(User.id, User.hard_skills)
+                        .where(User.hard_skills_canon_version < version)
+                        .order_by(User.id).limit(batch_size)
+                    )
+                    if after is not None:
+                        stmt = stmt.where(User.id > after)
+                    async with self._sessionmaker() as session:
+                        rows = (await session.execute(stmt)).all()
+                        missing = list({tuple(r.hard_skills or ()) for r in rows} - memo.keys())
+                        # fuzzy-канонизация — CPU, не в event loop
+                        memo.update(zip(missing, await asyncio.to_thread(lambda: [keys_fn(k) for k in missing])))
+                        if rows:
+                            # один UPDATE ... FROM (VALUES ...) на пачку: RETURNING считает
+                            # изменённые строки (rowcount executemany под asyncpg всегда -1)
+                            params: Dict[str, object] = {"version": version}
+                            values = []
+                            for i, row in enumerate(rows):
+                                skills = tuple(row.hard_skills or ())
+                                params[f"uid{i}"], params[f"skills{i}"], params[f"canon{i}"] = row.id, list(skills), memo[skills]
+                                values.append(f"(CAST(:uid{i} AS UUID), CAST(:skills{i} AS TEXT[]), CAST(:canon{i} AS TEXT[]))")
+                            result = await session.execute(
+                                text(
+                                    'UPDATE "user" AS u SET hard_skills_canon = v.canon, hard_skills_canon_version = :version '
+                                    f"FROM (VALUES {', '.join(values)}) AS v(uid, skills, canon) "
+                                    "WHERE u.id = v.uid AND u.hard_skills = v.skills "
+                                    "AND u.hard_skills_canon_version < :version RETURNING u.id"
+                                ),
+                                params,
+                            )
+                            changed += len(result.all())
+                            await session.commit()
+                    if len(rows) < batch_size:
+                        break
+                    after = rows[-1].id
+
+                async with self._sessionmaker() as session:
+                    await session.execute(
+                        update(SkillLexiconVersion)
+                        .where(SkillLexiconVersion.id == 1, SkillLexiconVersion.canon_version < version)
+                        .values(canon_version=version)
+                    )
+                    await session.commit()
+                return changed
+            finally:
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": RECANON_LOCK_KEY})
+                await lock_conn.commit()
+
+
+lexicon_repository = LexiconRepository()
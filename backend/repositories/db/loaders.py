@@ -0,0 +1,109 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Generic, Iterable, List, TypeVar, Union
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from repositories.db.user_repository import user_repository
+from repositories.db.vacancy_repository import vacancy_repository
+from schemas.schemas import UserRecord, VacancyRecord
+from utils.uuid import normalize_uuid
+
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[V]):
+    """
+    identity map + батчер в духе DataLoader на время одного запроса.
+    загрузки, запрошенные в одном тике event loop, уходят одним запросом
+    WHERE id = ANY(...), повторные — отдаются из кэша
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[UUID]], Awaitable[Dict[UUID, V]]],
+        not_found: str,
+    ) -> None:
+        self._batch_fn = batch_fn
+        self._not_found = not_found
+        self._cache: Dict[UUID, "asyncio.Future[V]"] = {}
+        self._queue: List[UUID] = []
+        self._pending: set = set()
+
+    def prime(self, key: Union[UUID, str], value: V) -> None:
+        """
+        кладёт уже загруженный объект в кэш без запроса к БД
+        """
+        vid = normalize_uuid(key)
+        fut = self._cache.get(vid)
+        if fut is None or fut.done():
+            fut = asyncio.get_running_loop().create_future()
+            fut.set_result(value)
+            self._cache[vid] = fut
+
+    def prime_many(self, values: Iterable[V]) -> None:
+        for value in values:
+            self.prime(value.id, value)
+
+    def load(self, key: Union[UUID, str]) -> "asyncio.Future[V]":
+        vid = normalize_uuid(key)
+        fut = self._cache.get(vid)
+        if fut is not None:
+            return fut
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._cache[vid] = fut
+        if not self._queue:
+            loop.call_soon(self._dispatch)
+        self._queue.append(vid)
+        return fut
+
+    async def load_many(self, keys: Iterable[Union[UUID, str]]) -> List[V]:
+        return list(await asyncio.gather(*(self.load(k) for k in keys)))
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        # event loop держит на задачу только слабую ссылку
+        task = asyncio.ensure_future(self._run(keys))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _run(self, keys: List[UUID]) -> None:
+        try:
+            found = await self._batch_fn(keys)
+        except Exception as e:
+            for key in keys:
+                fut = self._cache.pop(key)
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for key in keys:
+            fut = self._cache[key]
+            if fut.done():
+                continue
+            if key in found:
+                fut.set_result(found[key])
+            else:
+                self._cache.pop(key)
+                fut.set_exception(HTTPException(status_code=404, detail=self._not_found))
+
+
+@dataclass
+class RequestLoaders:
+    """
+    загрузчики внутренних путей (матчинг): записи без валидации DTO
+    """
+    users: BatchLoader[UserRecord] = field(
+        default_factory=lambda: BatchLoader(user_repository.get_user_records_by_ids, "User not found")
+    )
+    vacancies: BatchLoader[VacancyRecord] = field(
+        default_factory=lambda: BatchLoader(vacancy_repository.get_vacancy_records_by_ids, "Vacancy not found")
+    )
+
+
+def get_loaders() -> RequestLoaders:
+    """
+    зависимость FastAPI: новый набор загрузчиков на каждый запрос
+    """
+    return RequestLoaders()
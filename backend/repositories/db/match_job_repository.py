@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Union
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from infrastructure.db.change_feed import notify_change
+from infrastructure.db.connect import pg_connection
+from infrastructure.metrics import observe_db
+from persistent.db.tables import MatchJob, MatchReport
+from utils.uuid import normalize_uuid
+
+# сущность ленты изменений: ids — id задач, по которым появились отчёты или сменился статус
+JOB_ENTITY = "match_job"
+
+
+class MatchJobRepository:
+    def __init__(self):
+        self._sessionmaker = pg_connection()
+
+    @observe_db
+    async def create_job(
+        self,
+        kind: str,
+        subject_id: Optional[UUID],
+        items: List[Dict[str, Any]],
+        top_k: int,
+        status: str,
+        lease_s: float,
+    ) -> MatchJob:
+        lease_until = datetime.now(timezone.utc) + timedelta(seconds=lease_s) if status == "running" else None
+        async with self._sessionmaker() as session:
+            job = MatchJob(
+                kind=kind, subject_id=subject_id, items=items, top_k=top_k, status=status, lease_until=lease_until,
+            )
+            session.add(job)
+            await session.commit()
+            await session.refresh(job)
+            return job
+
+    @observe_db
+    async def get_job(self, id: Union[str, UUID]) -> Optional[MatchJob]:
+        job_id = normalize_uuid(id)
+        async with self._sessionmaker() as session:
+            return await session.get(MatchJob, job_id)
+
+    @observe_db
+    async def get_reports(self, keys: Iterable[str]) -> Dict[str, MatchReport]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        async with self._sessionmaker() as session:
+            rows = (await session.execute(select(MatchReport).where(MatchReport.key.in_(keys)))).scalars().all()
+        return {row.key: row for row in rows}
+
+    @observe_db
+    async def save_report(
+        self,
+        job_id: UUID,
+        key: str,
+        user_id: Optional[UUID],
+        vacancy_id: Optional[UUID],
+        score: int,
+        decision: str,
+        reasoning_report: str,
+        lease_s: float,
+    ) -> None:
+        """
+        отчёт в кэш пар и продление аренды задачи одной транзакцией;
+        подписчики задачи (SSE в любом воркере) узнают о нём после COMMIT
+        """
+        async with self._sessionmaker() as session:
+            stmt = insert(MatchReport).values(
+                key=key, user_id=user_id, vacancy_id=vacancy_id,
+                score=score, decision=decision, reasoning_report=reasoning_report,
+            ).on_conflict_do_nothing(index_elements=[MatchReport.key])
+            await session.execute(stmt)
+            await session.execute(
+                update(MatchJob).where(MatchJob.id == job_id)
+                .values(lease_until=func.now() + timedelta(seconds=lease_s), updated_at=func.now())
+            )
+            await notify_change(session, JOB_ENTITY, [job_id])
+            await session.commit()
+
+    @observe_db
+    async def renew_lease(self, job_id: UUID, lease_s: float) -> None:
+        async with self._sessionmaker() as session:
+            await session.execute(
+                update(MatchJob).where(MatchJob.id == job_id, MatchJob.status == "running")
+                .values(lease_until=func.now() + timedelta(seconds=lease_s))
+            )
+            await session.commit()
+
+    @observe_db
+    async def finish_job(self, job_id: UUID, status: str, failed: int) -> None:
+        async with self._sessionmaker() as session:
+            await session.execute(
+                update(MatchJob).where(MatchJob.id == job_id)
+                .values(status=status, failed=failed, lease_until=None, updated_at=func.now())
+            )
+            await notify_change(session, JOB_ENTITY, [job_id])
+            await session.commit()
+
+    @observe_db
+    async def claim_job(self, job_id: UUID, lease_s: float) -> bool:
+        """
+        аренда незавершённой задачи, чей исполнитель пропал (аренда истекла);
+        из конкурирующих воркеров задачу получает один. False — не нужна или уже взята
+        """
+        async with self._sessionmaker() as session:
+            claimed = (await session.execute(
+                update(MatchJob)
+                .where(
+                    MatchJob.id == job_id,
+                    MatchJob.status.in_(("pending", "running")),
+                    (MatchJob.lease_until.is_(None)) | (MatchJob.lease_until < func.now()),
+                )
+                .values(status="running", lease_until=func.now() + timedelta(seconds=lease_s), updated_at=func.now())
+                .returning(MatchJob.id)
+            )).scalar_one_or_none()
+            await session.commit()
+            return claimed is not None
+
+    @observe_db
+    async def purge(self, ttl_s: float) -> None:
+        """
+        задачи и отчёты старше ttl_s
+        """
+        cutoff = func.now() - timedelta(seconds=ttl_s)
+        async with self._sessionmaker() as session:
+            await session.execute(delete(MatchJob).where(MatchJob.created_at < cutoff))
+            await session.execute(delete(MatchReport).where(MatchReport.created_at < cutoff))
+            await session.commit()
+
+
+match_job_repository = MatchJobRepository()
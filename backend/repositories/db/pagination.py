@@ -0,0 +1,19 @@
+from typing import Any, Optional
+
+from sqlalchemy import Select, tuple_
+
+from utils.cursor import decode_cursor
+
+
+def apply_keyset(stmt: Select, model: Any, limit: Optional[int], after: Optional[str]) -> Select:
+    """
+    keyset-пагинация по (created_at, id) от новых к старым.
+    after — курсор последней строки предыдущей страницы (utils.cursor.encode_cursor)
+    """
+    stmt = stmt.order_by(model.created_at.desc(), model.id.desc())
+    if after:
+        created_at, id = decode_cursor(after)
+        stmt = stmt.where(tuple_(model.created_at, model.id) < tuple_(created_at, id))
+    if limit:
+        stmt = stmt.limit(limit)
+    return stmt
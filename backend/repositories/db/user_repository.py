@@ -1,19 +1,37 @@
 from __future__ import annotations
 
-from typing import Any, Awaitable, Callable, Optional, Union, List, Dict, Tuple
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Union, List, Dict, Tuple
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import insert, update, select
+from sqlalchemy import insert, update, select, any_, bindparam, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY, UUID as PG_UUID
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from infrastructure.db.connect import pg_connection
-from persistent.db.tables import User
-from schemas.schemas import UserDTO
+from infrastructure.db.connect import get_engine, pg_connection
+from infrastructure.db.change_feed import notify_change
+from infrastructure.metrics import observe_db
+from persistent.db.tables import User, UserSkillCanon
+from schemas.schemas import UserDTO, UserBriefDTO, UserRecord, MatchCandidate
+from repositories.db.pagination import apply_keyset
+from utils.cursor import encode_cursor
 from utils.uuid import normalize_uuid
-from datetime import date
+from settings.settings import settings
+from matcher.lexicon import current
+from matcher.normalization import canonical_skill_keys
+from dataclasses import fields
+from datetime import date, datetime
+from uuid import uuid4
 from schemas.schemas import SexEnum
 
+# колонки в порядке полей UserRecord: строка результата — готовые позиционные аргументы
+_RECORD_COLUMNS = tuple(getattr(User, f.name) for f in fields(UserRecord))
+_CANDIDATE_SQL = 'SELECT {} FROM "user"'.format(", ".join(f.name for f in fields(MatchCandidate)))
+# предел параметров одного запроса в протоколе Postgres (int16)
+_MAX_BIND_PARAMS = 32767
+
+
 class UserRepository:
     def __init__(self) -> None:
         self._sessionmaker: async_sessionmaker[AsyncSession] = pg_connection()
@@ -38,6 +56,7 @@ class UserRepository:
                     detail=f"Database operation failed: {str(e)}"
                 )
 
+    @observe_db
     async def put_user(self, user: UserDTO) -> UUID:
         """
         вставляет пользователя и возвращает его id.
@@ -45,15 +64,17 @@ class UserRepository:
         async def _put(session: AsyncSession) -> UUID:
             stmt = (
                 insert(User)
-                .values(**user.to_create_kwargs())
+                .values(**_create_values(user))
                 .returning(User.id)
             )
             result = await session.execute(stmt)
             new_id: UUID = result.scalar_one()
+            await notify_change(session, "user", [new_id])
             return new_id
 
         return await self._execute_with_session(_put)
 
+    @observe_db
     async def put_user_returning_dto(self, user: UserDTO) -> UserDTO:
         """
         вставляет пользователя и возвращает полностью заполненный DTO
@@ -61,14 +82,103 @@ class UserRepository:
         async def _put(session: AsyncSession) -> UserDTO:
             stmt = (
                 insert(User)
-                .values(**user.to_create_kwargs())
+                .values(**_create_values(user))
                 .returning(*User.__table__.columns)
             )
             row = (await session.execute(stmt)).mappings().one()
+            await notify_change(session, "user", [row["id"]])
             return UserDTO.model_validate(dict(row))
 
         return await self._execute_with_session(_put)
 
+    @observe_db
+    async def upsert_users(
+        self,
+        users: List[UserDTO],
+        canon_cache: Optional[Dict[Tuple[str, ...], List[str]]] = None,
+    ) -> Tuple[List[UUID], Dict[int, str]]:
+        """
+        пакетный INSERT ... ON CONFLICT DO UPDATE одной транзакцией на пачку.
+        ключ строки: id, если он прислан, иначе external_id (id в HR-системе,
+        уникальный индекс) — повторная синхронизация обновляет тех же сотрудников;
+        строки без обоих ключей вставляются с новым uuid. при повторе ключа в пачке
+        побеждает последняя строка; created_at при обновлении не меняется.
+        пачка режется на запросы не больше _MAX_BIND_PARAMS параметров.
+        нарушение ограничения (external_id уже у другого пользователя, CHECK) не роняет
+        пачку: она пишется построчно, каждая строка в своей точке сохранения.
+        возвращает (id записанных, {индекс в users: ошибка});
+        canon_cache — общий для всех пачек кэш канонизации навыков
+        """
+        if not users:
+            return [], {}
+        cache = canon_cache if canon_cache is not None else {}
+        lexicon = current()
+        now = datetime.utcnow()
+        by_id: Dict[UUID, Dict[str, Any]] = {}
+        by_external_id: Dict[str, Dict[str, Any]] = {}
+        fresh: List[Dict[str, Any]] = []
+        position: Dict[int, int] = {}
+        for i, user in enumerate(users):
+            values = user.to_create_kwargs()
+            # словарь может смениться между пачками одной загрузки — версия в ключе кэша
+            key = (lexicon.version, tuple(user.hard_skills))
+            if key not in cache:
+                cache[key] = canonical_skill_keys(key[1], lexicon=lexicon)
+            values["hard_skills_canon"] = cache[key]
+            values["hard_skills_canon_version"] = lexicon.version
+            values["id"] = user.id or uuid4()
+            values["created_at"] = now
+            values["updated_at"] = now
+            position[id(values)] = i
+            if user.id is not None:
+                by_id[user.id] = values
+            elif user.external_id is not None:
+                by_external_id[user.external_id] = values
+            else:
+                fresh.append(values)
+        groups = (
+            (list(by_id.values()), User.id),
+            (list(by_external_id.values()), User.external_id),
+            (fresh, None),
+        )
+
+        async def _write(session: AsyncSession, parts) -> List[UUID]:
+            ids: List[UUID] = []
+            for rows, target in parts:
+                if not rows:
+                    continue
+                step = max(1, _MAX_BIND_PARAMS // len(rows[0]))
+                for start in range(0, len(rows), step):
+                    stmt = pg_insert(User).values(rows[start:start + step])
+                    if target is not None:
+                        set_ = {k: stmt.excluded[k] for k in rows[0] if k not in ("id", "created_at", target.key)}
+                        if "external_id" in set_:
+                            # строка по id без external_id не стирает уже известный
+                            set_["external_id"] = func.coalesce(stmt.excluded.external_id, User.__table__.c.external_id)
+                        stmt = stmt.on_conflict_do_update(index_elements=[target], set_=set_)
+                    ids.extend((await session.execute(stmt.returning(User.id))).scalars().all())
+            return ids
+
+        async def _upsert(session: AsyncSession) -> Tuple[List[UUID], Dict[int, str]]:
+            failed: Dict[int, str] = {}
+            try:
+                async with session.begin_nested():
+                    ids = await _write(session, groups)
+            except IntegrityError:
+                ids = []
+                for rows, target in groups:
+                    for row in rows:
+                        try:
+                            async with session.begin_nested():
+                                ids.extend(await _write(session, (([row], target),)))
+                        except IntegrityError as e:
+                            failed[position[id(row)]] = str(e.orig).splitlines()[0]
+            await notify_change(session, "user", ids)
+            return ids, failed
+
+        return await self._execute_with_session(_upsert)
+
+    @observe_db
     async def update_user_info(
         self,
         id: Union[UUID, str]=None,
@@ -87,55 +197,74 @@ class UserRepository:
         частичное обновление. Обновляются только поля, переданные не None
         возвращает обновлённый UserDTO, если пользователь не найден — 404.
         """
+        values: Dict[str, Any] = {}
+
+        if first_name is not None:
+            values["first_name"] = first_name
+        if last_name is not None:
+            values["last_name"] = last_name
+        if sex is not None:
+            values["sex"] = sex
+        if birth_date is not None:
+            values["birth_date"] = birth_date
+        if current_position is not None:
+            values["current_position"] = current_position
+        if education is not None:
+            values["education"] = education
+        if experience_years is not None:
+            values["experience_years"] = experience_years
+        if experience_months is not None:
+            values["experience_months"] = experience_months
+        if experience_description is not None:
+            values["experience_description"] = experience_description
+        if hard_skills is not None:
+            values["hard_skills"] = hard_skills
+
+        return await self.update_user_fields(id, values)
+
+    @observe_db
+    async def update_user_fields(
+        self,
+        id: Union[UUID, str],
+        values: Dict[str, Any],
+        expected_updated_at: Optional[datetime] = None,
+    ) -> UserDTO:
+        """
+        UPDATE только переданных колонок одним запросом с RETURNING.
+        expected_updated_at — оптимистическая блокировка: если строку успели
+        изменить, 409. пустой values — обычное чтение без UPDATE
+        """
         async def _update(session: AsyncSession) -> UserDTO:
             vid = normalize_uuid(id)
-            values: Dict[str, Any] = {}
-
-            if first_name is not None:
-                values["first_name"] = first_name
-            if first_name is not None:
-                values["last_name"] = last_name
-            if sex is not None:
-                values["sex"] = sex
-            if birth_date is not None:
-                values["birth_date"] = birth_date
-            if current_position is not None:
-                values["current_position"] = current_position
-            if education is not None:
-                values["education"] = education
-            if experience_years is not None:
-                values["experience_years"] = experience_years
-            if experience_months is not None:
-                values["experience_months"] = experience_months
-            if experience_description is not None:
-                values["experience_description"] = experience_description
-            if hard_skills is not None:
-                values["hard_skills"] = hard_skills
-
-            if not values:
-                stmt = (
-                    update(User)
-                    .where(User.id == vid)
-                    .values({})
-                    .returning(*User.__table__.columns)
-                )
-            else:
-                stmt = (
-                    update(User)
-                    .where(User.id == vid)
-                    .values(**values)
-                    .returning(*User.__table__.columns)
-                )
+            changes = dict(values)
+            if "hard_skills" in changes:
+                changes.update(_canon_values(changes["hard_skills"]))
 
-            result = await session.execute(stmt)
-            row = result.mappings().one_or_none()
+            if not changes:
+                obj = await session.get(User, vid)
+                if obj is None:
+                    raise HTTPException(status_code=404, detail="User not found")
+                return UserDTO.model_validate(obj)
+
+            stmt = update(User).where(User.id == vid)
+            if expected_updated_at is not None:
+                stmt = stmt.where(User.updated_at == expected_updated_at)
+            stmt = stmt.values(**changes).returning(*User.__table__.columns)
+
+            row = (await session.execute(stmt)).mappings().one_or_none()
             if row is None:
-                raise HTTPException(status_code=404, detail="User not found")
+                # промах: пользователя нет или версия устарела — различаем вторым запросом
+                exists = await session.scalar(select(User.id).where(User.id == vid))
+                if exists is None:
+                    raise HTTPException(status_code=404, detail="User not found")
+                raise HTTPException(status_code=409, detail="User was modified concurrently")
 
+            await notify_change(session, "user", [vid])
             return UserDTO.model_validate(dict(row))
 
         return await self._execute_with_session(_update)
     
+    @observe_db
     async def get_user_by_id(self, id: Union[UUID, str]) -> UserDTO:
         async def _get(session: AsyncSession) -> UserDTO:
             vid = normalize_uuid(id)
@@ -146,6 +275,20 @@ class UserRepository:
 
         return await self._execute_with_session(_get)
     
+    @observe_db
+    async def get_user_records_by_ids(self, ids: List[UUID]) -> Dict[UUID, UserRecord]:
+        """
+        пачка пользователей одним запросом WHERE id = ANY(:ids) в UserRecord без валидации —
+        для матчинга; ненайденных нет в словаре
+        """
+        async def _get(session: AsyncSession) -> Dict[UUID, UserRecord]:
+            ids_param = bindparam("ids", list(ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+            rows = await session.execute(select(*_RECORD_COLUMNS).where(User.id == any_(ids_param)))
+            return {row[0]: UserRecord(*row) for row in rows}
+
+        return await self._execute_with_session(_get)
+
+    @observe_db
     async def exists_by_full_name(
         self,
         first_name: str,
@@ -166,14 +309,169 @@ class UserRepository:
 
         return await self._execute_with_session(_get)
     
-    async def get_all_users(self) -> List[UserDTO]:
+    @observe_db
+    async def get_all_users(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[UserDTO]:
+        """
+        пользователи от новых к старым; limit/after — keyset-пагинация по (created_at, id).
+        без limit возвращает всех (для матчинга)
+        """
         async def _get_all(session:AsyncSession) -> List[UserDTO]:
-            stmt = select(User)
+            stmt = apply_keyset(select(User), User, limit, after)
             data = await session.execute(stmt)
             users = data.scalars().all()
             return [UserDTO.model_validate(user) for user in users]
         return await self._execute_with_session(_get_all)
-        
+
+    @observe_db
+    async def get_user_records(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[UserRecord]:
+        """
+        get_all_users для внутренних путей (матчинг, выгрузка): только колонки,
+        без ORM-объектов и UserDTO.model_validate на каждую строку
+        """
+        async def _get(session: AsyncSession) -> List[UserRecord]:
+            stmt = apply_keyset(select(*_RECORD_COLUMNS), User, limit, after)
+            return [UserRecord(*row) for row in await session.execute(stmt)]
+        return await self._execute_with_session(_get)
+
+    @observe_db
+    async def get_user_briefs(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[UserBriefDTO]:
+        """
+        страница списка без experience_description: выбираются только нужные колонки
+        """
+        columns = [getattr(User, name) for name in UserBriefDTO.model_fields]
+
+        async def _get(session: AsyncSession) -> List[UserBriefDTO]:
+            stmt = apply_keyset(select(*columns), User, limit, after)
+            rows = (await session.execute(stmt)).mappings().all()
+            return [UserBriefDTO.model_validate(dict(row)) for row in rows]
+        return await self._execute_with_session(_get)
+
+    @observe_db
+    async def get_skill_canon_vocabulary(self) -> List[str]:
+        """
+        все ключи канонов, встречавшиеся у пользователей (user_skill_canon) —
+        для расширения must-have в SQL-префильтре (matcher.prefilter.expand_must_canon)
+        """
+        async def _get(session: AsyncSession) -> List[str]:
+            return list((await session.execute(select(UserSkillCanon.canon))).scalars())
+        return await self._execute_with_session(_get)
+
+    @observe_db
+    async def get_user_ids_updated_since(self, since: Optional[datetime], limit: int) -> List[UUID]:
+        """
+        id пользователей с updated_at > since (None — все), не больше limit
+        (индекс ix_user_updated_at) — правки после сборки снимка кандидатов
+        """
+        async def _get(session: AsyncSession) -> List[UUID]:
+            stmt = select(User.id).order_by(User.updated_at.desc()).limit(limit)
+            if since is not None:
+                stmt = stmt.where(User.updated_at > since)
+            return list((await session.execute(stmt)).scalars())
+        return await self._execute_with_session(_get)
+
+    @observe_db
+    async def get_snapshot_watermark(self) -> List[Any]:
+        """
+        [число пользователей, max(updated_at)] — сборщик снимка кандидатов
+        сравнивает с заголовком файла, чтобы не пересобирать без изменений
+        """
+        async def _get(session: AsyncSession) -> List[Any]:
+            row = (await session.execute(select(func.count(), func.max(User.updated_at)))).one()
+            return [row[0], row[1].isoformat() if row[1] else None]
+        return await self._execute_with_session(_get)
+
+    async def stream_match_candidates(
+        self,
+        must_canon: Optional[List[str]] = None,
+        min_months_without_must: Optional[int] = None,
+        canon_version: Optional[int] = None,
+        ids: Optional[List[UUID]] = None,
+        chunk_rows: Optional[int] = None,
+    ) -> AsyncIterator[List[MatchCandidate]]:
+        """
+        кандидаты для пакетного скоринга пачками по chunk_rows: только колонки
+        matcher, серверный курсор asyncpg (бинарный протокол) мимо ORM,
+        в памяти — одна пачка.
+        must_canon — первая стадия матчинга на стороне Postgres (GIN по hard_skills_canon):
+        пересечение канонов с must-have вакансии ИЛИ стаж, которого хватает для
+        прохода порога и без must-have (см. matcher.prefilter). без потерь — только если
+        must_canon уже расширен до всех засчитываемых скорингом канонов
+        (matcher.prefilter.expand_must_canon). canon_version — версия словаря, которым
+        посчитан must_canon: строки с каноном старой версии проходят фильтр без проверки;
+        ids — только эти строки
+        """
+        where: List[str] = []
+        args: List[Any] = []
+        if ids is not None:
+            args.append(list(ids))
+            where.append(f"id = ANY(${len(args)}::uuid[])")
+        if must_canon:
+            args.append(list(must_canon))
+            cond = f"hard_skills_canon && ${len(args)}::text[]"
+            if canon_version is not None:
+                args.append(canon_version)
+                cond = f"{cond} OR hard_skills_canon_version < ${len(args)}"
+            if min_months_without_must is not None:
+                args.append(min_months_without_must)
+                cond = f"{cond} OR experience_total_months >= ${len(args)}"
+            where.append(f"({cond})")
+        sql = _CANDIDATE_SQL + (" WHERE " + " AND ".join(where) if where else "")
+        chunk = chunk_rows or settings.pg.stream_chunk_rows
+
+        async with get_engine().connect() as conn:
+            raw = await conn.get_raw_connection()
+            pg = raw.driver_connection
+            # курсор asyncpg живёт только внутри транзакции
+            async with pg.transaction(readonly=True):
+                cursor = await pg.cursor(sql, *args)
+                while True:
+                    rows = await cursor.fetch(chunk)
+                    if rows:
+                        yield [MatchCandidate(*row) for row in rows]
+                    if len(rows) < chunk:
+                        return
+
+    async def iter_users(self, batch_size: int = 500) -> AsyncIterator[UserRecord]:
+        """
+        обход всех пользователей страницами по batch_size — для выгрузки
+        без загрузки таблицы целиком
+        """
+        after: Optional[str] = None
+        while True:
+            page = await self.get_user_records(limit=batch_size, after=after)
+            for user in page:
+                yield user
+            if len(page) < batch_size:
+                return
+            after = encode_cursor(page[-1].created_at, page[-1].id)
     
     
+def _canon_values(hard_skills: List[str]) -> Dict[str, Any]:
+    # каноны вместе с версией словаря, которым они посчитаны: строку со старой
+    # версией SQL-префильтр пропускает, а пересчёт (lexicon_repository) чинит
+    lexicon = current()
+    return {
+        "hard_skills_canon": canonical_skill_keys(hard_skills, lexicon=lexicon),
+        "hard_skills_canon_version": lexicon.version,
+    }
+
+
+def _create_values(user: UserDTO) -> Dict[str, Any]:
+    values = user.to_create_kwargs()
+    values.update(_canon_values(user.hard_skills))
+    return values
+
+
 user_repository = UserRepository()
\ No newline at end of file
@@ -1,18 +1,29 @@
 from fastapi import HTTPException
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.exc import IntegrityError
-from typing import List, Union
+from dataclasses import fields
+from typing import AsyncIterator, Dict, List, Optional, Union
 from uuid import UUID
 
 from persistent.db.tables import Vacancy
 from infrastructure.db.connect import pg_connection
-from schemas.schemas import VacancyDTO
+from infrastructure.db.change_feed import notify_change
+from infrastructure.metrics import observe_db
+from schemas.schemas import VacancyDTO, VacancyBriefDTO, VacancyRecord
+from repositories.db.pagination import apply_keyset
+from utils.cursor import encode_cursor
 from utils.uuid import normalize_uuid
 
+# колонки в порядке полей VacancyRecord
+_RECORD_COLUMNS = tuple(getattr(Vacancy, f.name) for f in fields(VacancyRecord))
+
+
 class VacancyRepository:
     def __init__(self):
         self._sessionmaker = pg_connection()
         
+    @observe_db
     async def add_vacancy(self, dto: VacancyDTO) -> None:
         async with self._sessionmaker() as session:
             obj = Vacancy(
@@ -24,16 +35,70 @@ class VacancyRepository:
                 nice_to_have=dto.nice_to_have or [],
             )
             session.add(obj)
+            await session.flush()
+            await notify_change(session, "vacancy", [obj.id])
             await session.commit()
                 
-    async def get_vacancy_list(self) -> List[VacancyDTO]:
-        stmp = select(Vacancy).order_by(Vacancy.created_at.desc())
+    @observe_db
+    async def get_vacancy_list(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[VacancyDTO]:
+        """
+        вакансии от новых к старым; limit/after — keyset-пагинация по (created_at, id)
+        """
+        stmp = apply_keyset(select(Vacancy), Vacancy, limit, after)
         async with self._sessionmaker() as session:
             result = await session.execute(stmp)
             vacancies: list[Vacancy] = result.scalars().all()
 
         return [VacancyDTO.model_validate(v) for v in vacancies]
+
+    @observe_db
+    async def get_vacancy_records(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[VacancyRecord]:
+        """
+        get_vacancy_list для матчинга и выгрузки: VacancyRecord без валидации
+        """
+        stmt = apply_keyset(select(*_RECORD_COLUMNS), Vacancy, limit, after)
+        async with self._sessionmaker() as session:
+            rows = await session.execute(stmt)
+            return [VacancyRecord(*row) for row in rows]
+
+    @observe_db
+    async def get_vacancy_briefs(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> List[VacancyBriefDTO]:
+        """
+        страница списка без description: выбираются только нужные колонки
+        """
+        columns = [getattr(Vacancy, name) for name in VacancyBriefDTO.model_fields]
+        stmt = apply_keyset(select(*columns), Vacancy, limit, after)
+        async with self._sessionmaker() as session:
+            rows = (await session.execute(stmt)).mappings().all()
+
+        return [VacancyBriefDTO.model_validate(dict(row)) for row in rows]
+
+    async def iter_vacancies(self, batch_size: int = 500) -> AsyncIterator[VacancyRecord]:
+        """
+        обход всех вакансий страницами по batch_size — для выгрузки
+        """
+        after: Optional[str] = None
+        while True:
+            page = await self.get_vacancy_records(limit=batch_size, after=after)
+            for vac in page:
+                yield vac
+            if len(page) < batch_size:
+                return
+            after = encode_cursor(page[-1].created_at, page[-1].id)
     
+    @observe_db
     async def get_vacancy_by_id(self, id: Union[str, UUID]) -> VacancyDTO:
         vid = normalize_uuid(id)
         async with self._sessionmaker() as session:
@@ -42,6 +107,14 @@ class VacancyRepository:
                 raise HTTPException(status_code=404, detail="Vacancy not found")
             return VacancyDTO.model_validate(obj)
             
+    @observe_db
+    async def get_vacancy_records_by_ids(self, ids: List[UUID]) -> Dict[UUID, VacancyRecord]:
+        ids_param = bindparam("ids", list(ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+        async with self._sessionmaker() as session:
+            rows = await session.execute(select(*_RECORD_COLUMNS).where(Vacancy.id == any_(ids_param)))
+            return {row[0]: VacancyRecord(*row) for row in rows}
+
+    @observe_db
     async def delete_vacancy(self, id: Union[str, UUID]) -> bool:
         vid = normalize_uuid(id)
         
@@ -52,6 +125,7 @@ class VacancyRepository:
                 res = await session.execute(stmt)
                 ok = res.scalar_one_or_none() is not None
                 if ok:
+                    await notify_change(session, "vacancy", [vid])
                     await session.commit()
                 else:
                     await session.rollback()
@@ -2,7 +2,7 @@ from __future__ import annotations
 from pydantic import BaseModel, Field, ConfigDict, model_validator, field_validator
 from datetime import datetime, date
 from uuid import UUID
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional, Union, Dict, Any
 import enum
 
@@ -25,6 +25,21 @@ class VacancyDTO(BaseModel):
             if self.min_exp_months > self.max_exp_months:
                 raise ValueError("min_exp_months cannot be greater than max_exp_months")
         return self
+
+
+class VacancyBriefDTO(BaseModel):
+    """
+    вакансия для списков — без тяжёлого description
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    name: str
+    min_exp_months: Optional[int] = None
+    max_exp_months: Optional[int] = None
+    must_have: List[str] = Field(default_factory=list)
+    nice_to_have: List[str] = Field(default_factory=list)
+    created_at: datetime
     
 
 class Skills(BaseModel):
@@ -41,6 +56,8 @@ class UserDTO(BaseModel):
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
     id: Optional[UUID] = None
+    # id сотрудника в HR-системе: ключ повторной синхронизации (POST /users/bulk)
+    external_id: Optional[str] = None
 
     first_name: str
     last_name: str
@@ -84,6 +101,14 @@ class UserDTO(BaseModel):
     def _none_to_list(cls, v):
         return [] if v is None else v
 
+    @field_validator("external_id", mode="before")
+    @classmethod
+    def _blank_to_none(cls, v):
+        if v is None:
+            return None
+        v = str(v).strip()
+        return v or None
+
     # проверка корректности переданных полей
     @model_validator(mode="after")
     def _business_rules(self):
@@ -112,6 +137,7 @@ class UserDTO(BaseModel):
         вычисляемое experience_total_months.
         """
         return {
+            "external_id": self.external_id,
             "first_name": self.first_name,
             "last_name": self.last_name,
             "sex": self.sex,
@@ -135,20 +161,36 @@ class UserDTO(BaseModel):
         словарь без служебных полей
         json_mode=True -> enum в строки, даты в ISO
         """
-        exclude = {"id", "created_at", "updated_at", "experience_total_months"}
+        exclude = {"id", "external_id", "created_at", "updated_at", "experience_total_months"}
         return self.model_dump(
             exclude=exclude,
             exclude_none=exclude_none,
             by_alias=by_alias,
             mode="json" if json_mode else "python",
         )
+
+
+class UserBriefDTO(BaseModel):
+    """
+    пользователь для списков — без experience_description
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    first_name: str
+    last_name: str
+    sex: SexEnum
+    current_position: str
+    experience_total_months: Optional[int] = None
+    hard_skills: List[str] = Field(default_factory=list)
+    created_at: datetime
         
 class MatchResultDTO(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     user_id: str | None = None
     decision: bool = False
-    vacancy: VacancyDTO | None = None
+    vacancy: VacancyDTO | VacancyRecord | None = None
     score: float = Field(..., ge=0.0, le=1.0, description="Aggregated score in [0,1]")
     breakdown: Dict[str, float] = Field(default_factory=dict, description="Per-metric scores in [0,1]")
     details: Dict[str, Any] = Field(default_factory=dict, description="Debug/trace info (matches, tokens, etc.)")
@@ -171,8 +213,66 @@ class MatchingResponse(BaseModel):
     reasoning_report: str
     vac_name: str | None = None
     
+class MatchJobItemDTO(BaseModel):
+    """
+    позиция эвристического ранжирования; report — отчёт LLM (или шаблонный у уверенных пар), когда он готов
+    (только у первых top_k)
+    """
+    rank: int
+    user_id: UUID | None = None
+    vacancy_id: UUID | None = None
+    vac_name: str | None = None
+    position: str | None = None
+    score: float
+    report: MatchingResponse | None = None
+
+
+class MatchJobDTO(BaseModel):
+    id: UUID
+    kind: str
+    status: str
+    top_k: int
+    ready: int
+    failed: int
+    created_at: datetime
+    items: List[MatchJobItemDTO] = Field(default_factory=list)
+
+
+class SimilarUserDTO(BaseModel):
+    user_id: UUID
+    similarity: float
+
+
 class Message(BaseModel):
     text: str
+
+
+class SkillVariants(BaseModel):
+    variants: List[str] = Field(default_factory=list)
+
+
+class LexiconDTO(BaseModel):
+    """
+    словарь навыков: канон -> варианты написания, в порядке приоритета
+    """
+    version: int
+    skills: Dict[str, List[str]]
+
+
+class LexiconVersionDTO(BaseModel):
+    version: int
+
+
+class BulkRowError(BaseModel):
+    line: int
+    error: str
+
+
+class BulkUpsertReport(BaseModel):
+    processed: int = 0
+    upserted: int = 0
+    failed: int = 0
+    errors: List[BulkRowError] = Field(default_factory=list)
     
 class SexEnum(enum.Enum):
     male = "male"
@@ -189,4 +289,75 @@ class ParsedResult:
 class MatchResult:
     score: float
     breakdown: Dict[str, float]
-    details: Dict[str, Any]
\ No newline at end of file
+    details: Dict[str, Any]
+    # длительность стадий скоринга в секундах (для метрик, в ответ API не попадает)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+@dataclass(frozen=True, slots=True)
+class UserRecord:
+    """
+    строка таблицы user для матчинга и выгрузки: собирается прямо из кортежа
+    колонок без валидации UserDTO — данные уже прошли CHECK-ограничения таблицы.
+    порядок полей — как у UserDTO (он же порядок ключей в JSON выгрузки)
+    """
+    id: UUID
+    # ключ синхронизации с HR (см. UserDTO): выгрузку можно загрузить обратно через /users/bulk
+    external_id: Optional[str]
+    first_name: str
+    last_name: str
+    sex: SexEnum
+    birth_date: date
+    current_position: str
+    education: Optional[str]
+    experience_years: int
+    experience_months: int
+    experience_total_months: int
+    experience_description: Optional[str]
+    hard_skills: List[str]
+    created_at: datetime
+    updated_at: datetime
+
+    def to_plain_dict(self) -> dict:
+        """
+        как UserDTO.to_plain_dict(): без служебных полей, enum и даты — в JSON-виде
+        """
+        return {
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "sex": self.sex.value,
+            "birth_date": self.birth_date.isoformat(),
+            "current_position": self.current_position,
+            "education": self.education,
+            "experience_years": self.experience_years,
+            "experience_months": self.experience_months,
+            "experience_description": self.experience_description,
+            "hard_skills": list(self.hard_skills),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class VacancyRecord:
+    """
+    строка таблицы vacancy без валидации VacancyDTO — для матчинга и выгрузки
+    """
+    id: UUID
+    name: str
+    description: str
+    min_exp_months: Optional[int]
+    max_exp_months: Optional[int]
+    must_have: List[str]
+    nice_to_have: List[str]
+    created_at: datetime
+    updated_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class MatchCandidate:
+    """
+    кандидат для пакетного скоринга: только колонки, которые читает matcher,
+    из потокового загрузчика UserRepository.stream_match_candidates
+    """
+    id: UUID
+    experience_total_months: int
+    hard_skills: List[str]
+    experience_description: Optional[str]
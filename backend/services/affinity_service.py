@@ -0,0 +1,98 @@
+import asyncio
+from functools import partial
+from typing import Optional
+
+from infrastructure.db.change_feed import change_feed
+from infrastructure.executors import restart_cpu_pool
+from matcher.affinity import build_affinity, compile_affinity, current_affinity, install_affinity
+from matcher.lexicon import current
+from matcher.normalization import canonical_skill_keys
+from repositories.db.affinity_repository import AFFINITY_CHANNEL, AffinityRepository, affinity_repository
+from settings.settings import settings
+
+
+class AffinityService:
+    """
+    матрица близости навыков из БД: фоновая пересборка одним воркером
+    (по расписанию и при смене словаря) и атомарная замена в каждом воркере
+    и его пуле процессов, как у словаря навыков
+    """
+
+    def __init__(self, repository: AffinityRepository):
+        self.repository = repository
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        if not settings.affinity.enabled:
+            return
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"Skill affinity load failed: {e}")
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.rebuild()
+                await self.refresh()
+            except Exception as e:
+                print(f"Skill affinity refresh failed: {e}")
+            await asyncio.sleep(settings.affinity.refresh_interval_s)
+
+    async def refresh(self) -> bool:
+        """
+        подтягивает новую версию матрицы, если она есть. True — матрица заменена
+        """
+        async with self._refresh_lock:
+            if await self.repository.get_version() == current_affinity().version:
+                return False
+            version, neighbours = await self.repository.load()
+            install_affinity(await asyncio.to_thread(compile_affinity, neighbours, version))
+            # процессы пула держат копию матрицы со своего старта
+            restart_cpu_pool()
+            return True
+
+    async def rebuild(self) -> Optional[int]:
+        """
+        пересборка по текущим профилям и вакансиям, если матрица устарела.
+        None — не требуется или собирает другой воркер
+        """
+        cfg = settings.affinity
+        lexicon = current()
+        version = await self.repository.rebuild(
+            lexicon.version,
+            cfg.rebuild_interval_s,
+            partial(canonical_skill_keys, lexicon=lexicon),
+            partial(
+                build_affinity,
+                canons=lexicon.canonical,
+                min_support=cfg.min_support,
+                min_score=cfg.min_score,
+                top_k=cfg.top_k,
+            ),
+        )
+        if version is not None:
+            print(f"Skill affinity v{version} built with lexicon v{lexicon.version}")
+        return version
+
+    async def on_affinity_notify(self, _ids=None) -> None:
+        """
+        NOTIFY о новой матрице (или сброс ленты после переподключения)
+        """
+        if settings.affinity.enabled:
+            await self.refresh()
+
+
+affinity_service = AffinityService(affinity_repository)
+change_feed.on_channel(AFFINITY_CHANNEL)(affinity_service.on_affinity_notify)
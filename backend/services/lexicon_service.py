@@ -0,0 +1,123 @@
+import asyncio
+from functools import partial
+from typing import Dict, List, Optional
+
+from infrastructure.db.change_feed import change_feed
+from infrastructure.executors import restart_cpu_pool
+from matcher.lexicon import compile_lexicon, current, install_lexicon
+from matcher.normalization import canonical_skill_keys
+from repositories.db.lexicon_repository import LexiconRepository, lexicon_repository
+from settings.settings import settings
+
+
+class LexiconService:
+    """
+    словарь навыков из БД: фоновая сверка версии, компиляция индекса вне event loop
+    и атомарная замена снимка (matcher.lexicon). читатели не блокируются —
+    до замены они работают со старым снимком целиком
+    """
+
+    def __init__(self, repository: LexiconRepository):
+        self.repository = repository
+        self._task: Optional[asyncio.Task] = None
+        self._recanon_task: Optional[asyncio.Task] = None
+        self._refresh_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """
+        первая загрузка на старте воркера и запуск фоновой сверки.
+        если БД недоступна — работаем на встроенном словаре до следующей сверки
+        """
+        if settings.lexicon.source != "db":
+            return
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"Lexicon load failed, using builtin: {e}")
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._recanon_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._recanon_task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.lexicon.refresh_interval_s)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Lexicon refresh failed: {e}")
+
+    async def refresh(self) -> bool:
+        """
+        подтягивает новую версию словаря, если она есть. True — снимок заменён
+        """
+        async with self._refresh_lock:
+            version, canon_version = await self.repository.get_versions()
+            swapped = False
+            if version != current().version:
+                version, lexicon = await self.repository.load()
+                if not lexicon:
+                    # таблица пуста (миграция не применена) — остаёмся на встроенном
+                    return False
+                snapshot = await asyncio.to_thread(compile_lexicon, lexicon, version)
+                install_lexicon(snapshot)
+                # процессы пула держат копию словаря со своего старта
+                restart_cpu_pool()
+                swapped = True
+            if self._recanon_task is None or self._recanon_task.done():
+                # каноны в user.hard_skills_canon посчитаны старым словарём — пересчёт в фоне.
+                # после него строки может дописать воркер, ещё не сменивший словарь
+                if canon_version < version or (
+                    version == current().version and await self.repository.has_stale_canons(version)
+                ):
+                    self._recanon_task = asyncio.create_task(self._recanonicalize())
+            return swapped
+
+    async def _recanonicalize(self) -> None:
+        snapshot = current()
+        try:
+            changed = await self.repository.recanonicalize_users(
+                snapshot.version, partial(canonical_skill_keys, lexicon=snapshot)
+            )
+        except Exception as e:
+            print(f"Lexicon v{snapshot.version}: hard_skills_canon update failed: {e}")
+            return
+        if changed is not None:
+            print(f"Lexicon v{snapshot.version}: hard_skills_canon updated for {changed} users")
+
+    async def on_lexicon_notify(self, _ids=None) -> None:
+        """
+        NOTIFY skill_lexicon от триггера таблицы (или сброс ленты после переподключения):
+        сверка сразу, не дожидаясь refresh_interval_s
+        """
+        if settings.lexicon.source == "db":
+            await self.refresh()
+
+    async def get_lexicon(self) -> Dict:
+        version, lexicon = await self.repository.load()
+        return {"version": version, "skills": lexicon}
+
+    async def set_skill(self, canon: str, variants: List[str]) -> int:
+        """
+        добавляет канон или заменяет его варианты; этот воркер применяет
+        изменение сразу, остальные — на своей следующей сверке
+        """
+        await self.repository.upsert_skill(canon.strip(), [v.strip() for v in variants if v.strip()])
+        await self.refresh()
+        return current().version
+
+    async def delete_skill(self, canon: str) -> int:
+        await self.repository.delete_skill(canon)
+        await self.refresh()
+        return current().version
+
+
+lexicon_service = LexiconService(lexicon_repository)
+change_feed.on_channel("skill_lexicon")(lexicon_service.on_lexicon_notify)
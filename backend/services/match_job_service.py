@@ -0,0 +1,269 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+from ai_services.matcher import MatchAns, analyzer
+from ai_services.utils.prepare_profile import get_text_profile
+from infrastructure.db.change_feed import change_feed
+from infrastructure.metrics import LLM_GATE_ROUTES
+from persistent.db.tables import MatchJob, MatchReport
+from repositories.db.loaders import RequestLoaders
+from repositories.db.match_job_repository import JOB_ENTITY, MatchJobRepository, match_job_repository
+from schemas.schemas import MatchJobDTO, MatchJobItemDTO, MatchResultDTO, MatchingResponse, VacancyDTO
+from services.matching_service import MatchingService, matching_service
+from services.report_gate_service import ReportGateService, report_gate_service
+from settings.settings import settings
+
+_FINAL = ("done", "failed")
+
+
+class MatchJobService:
+    """
+    многоуровневый матчинг: эвристическое ранжирование (compute_match) отдаётся
+    сразу вместе с id задачи, LLM-отчёты для первых top_k считаются в фоне в порядке
+    score и сохраняются в match_report (уверенным парам гейт отчётов даёт шаблонный
+    отчёт сразу, см. services.report_gate_service). клиент забирает их опросом или SSE,
+    повторный просмотр той же пары берёт готовый отчёт без LLM
+    """
+
+    def __init__(self, repository: MatchJobRepository, matching: MatchingService, gate: ReportGateService):
+        self.repository = repository
+        self.matching = matching
+        self.gate = gate
+        self._runners: Dict[UUID, asyncio.Task] = {}
+        self._listeners: Dict[UUID, Set[asyncio.Event]] = {}
+        self._purged_at = 0.0
+
+    async def stop(self) -> None:
+        """
+        остановка воркера: незаконченные задачи бросаются, их аренду перехватят другие воркеры
+        """
+        runners = list(self._runners.values())
+        for task in runners:
+            task.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+
+    async def start_user_job(self, user_id: str, k: int, loaders: RequestLoaders) -> MatchJobDTO:
+        results = await self.matching.match(user_id, loaders)
+        user = await loaders.users.load(user_id)
+        profile = get_text_profile(await self.matching.get_user_dict(user_id, loaders))
+        pairs = [(res, user.id, res.vacancy.id, user.current_position, profile) for res in results if res.decision]
+        return await self._start("user", user.id, pairs, k)
+
+    async def start_vacancy_job(self, vac_id: str, k: int, loaders: RequestLoaders) -> MatchJobDTO:
+        results = await self.matching.vacancy_match(vac_id, loaders)
+        vac = await loaders.vacancies.load(vac_id)
+        return await self._start("vacancy", vac.id, await self._user_pairs(results, loaders), k)
+
+    async def start_new_vacancy_job(self, vac: VacancyDTO, k: int, loaders: RequestLoaders) -> MatchJobDTO:
+        results = await self.matching.new_vacancy_match(vac, loaders)
+        return await self._start("new_vacancy", None, await self._user_pairs(results, loaders), k)
+
+    async def _user_pairs(self, results: List[MatchResultDTO], loaders: RequestLoaders) -> List[Tuple[Any, ...]]:
+        pairs = []
+        for res in results:
+            if res.decision:
+                profile = await self.matching.get_user_dict(res.user_id, loaders)
+                pairs.append((res, UUID(str(res.user_id)), res.vacancy.id, profile["current_position"], get_text_profile(profile)))
+        return pairs
+
+    async def _start(self, kind: str, subject_id: Optional[UUID], pairs: List[Tuple[Any, ...]], k: int) -> MatchJobDTO:
+        pairs.sort(key=lambda p: -p[0].score)
+        items: List[Dict[str, Any]] = []
+        for rank, (res, user_id, vacancy_id, position, profile) in enumerate(pairs):
+            item = {
+                "rank": rank,
+                "user_id": str(user_id) if user_id else None,
+                "vacancy_id": str(vacancy_id) if vacancy_id else None,
+                "vac_name": res.vacancy.name,
+                "position": position,
+                "score": res.score,
+            }
+            if rank < k:
+                description = res.vacancy.description or ""
+                key = analyzer.report_key(profile, False, description)
+                route = self.gate.route(res.score, key)
+                LLM_GATE_ROUTES.labels(route).inc()
+                if route == "template":
+                    # уверенная пара: отчёт готов сразу и хранится в самой задаче
+                    item["report"] = self.gate.template(res.score, res.breakdown, res.details).model_dump()
+                else:
+                    item["report_key"] = key
+                    item["prompt"] = {"profile": profile, "vacancy": description}
+            items.append(item)
+
+        reports = await self.repository.get_reports(i["report_key"] for i in items if "report_key" in i)
+        pending = any("report_key" in i and i["report_key"] not in reports for i in items)
+        job = await self.repository.create_job(
+            kind, subject_id, items, k, "running" if pending else "done", settings.match_jobs.lease_s,
+        )
+        if pending:
+            self._spawn(job.id, items)
+        await self._purge()
+        return self._to_dto(job, reports)
+
+    def _spawn(self, job_id: UUID, items: List[Dict[str, Any]]) -> None:
+        task = asyncio.create_task(self._run(job_id, items))
+        self._runners[job_id] = task
+        task.add_done_callback(lambda _t: self._runners.pop(job_id, None))
+
+    async def _run(self, job_id: UUID, items: List[Dict[str, Any]]) -> None:
+        cfg = settings.match_jobs
+        top = [i for i in items if "report_key" in i]
+        # после подхвата чужой задачи часть отчётов уже готова
+        done = await self.repository.get_reports(i["report_key"] for i in top)
+        todo = [i for i in top if i["report_key"] not in done]
+        gate = asyncio.Semaphore(max(1, cfg.llm_concurrency))
+        failed = 0
+
+        async def report(item: Dict[str, Any]) -> None:
+            nonlocal failed
+            # задачи создаются по порядку rank, семафор пускает их в том же порядке
+            async with gate:
+                ans = await analyzer.match_text(item["prompt"]["profile"], False, item["prompt"]["vacancy"])
+            self.gate.observe(item["score"], ans)
+            if ans is None:
+                failed += 1
+                return
+            await self.repository.save_report(
+                job_id, item["report_key"],
+                UUID(item["user_id"]) if item["user_id"] else None,
+                UUID(item["vacancy_id"]) if item["vacancy_id"] else None,
+                ans.score, ans.decision, ans.reasoning_report, cfg.lease_s,
+            )
+            self._wake(job_id)
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            await asyncio.gather(*(report(i) for i in todo))
+            final = "failed" if todo and failed == len(todo) else "done"
+            await self.repository.finish_job(job_id, final, failed)
+        except asyncio.CancelledError:
+            # остановка воркера: аренда истечёт, задачу доделает другой
+            raise
+        except Exception as e:
+            print(f"Match job {job_id} failed: {e}")
+            await self.repository.finish_job(job_id, "failed", failed)
+        finally:
+            heartbeat.cancel()
+            self._wake(job_id)
+
+    async def _heartbeat(self, job_id: UUID) -> None:
+        # ответ LLM может идти дольше аренды — продлеваем, пока исполнитель жив
+        while True:
+            await asyncio.sleep(settings.match_jobs.lease_s / 3)
+            try:
+                await self.repository.renew_lease(job_id, settings.match_jobs.lease_s)
+            except Exception as e:
+                print(f"Match job {job_id}: lease renewal failed: {e}")
+
+    async def _purge(self) -> None:
+        # удаление старых задач и отчётов — не чаще раза в час на воркер
+        now = time.monotonic()
+        if now - self._purged_at < 3600:
+            return
+        self._purged_at = now
+        try:
+            await self.repository.purge(settings.match_jobs.ttl_s)
+        except Exception as e:
+            print(f"Match job purge failed: {e}")
+
+    async def get_job(self, job_id: str) -> MatchJobDTO:
+        """
+        состояние задачи с готовыми отчётами. задачу, чей исполнитель пропал
+        (аренда истекла), этот воркер берёт себе и доделывает
+        """
+        try:
+            job = await self.repository.get_job(job_id)
+        except ValueError:
+            job = None
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Match job not found")
+        if job.status not in _FINAL and job.id not in self._runners:
+            if await self.repository.claim_job(job.id, settings.match_jobs.lease_s):
+                self._spawn(job.id, job.items)
+        reports = await self.repository.get_reports(i["report_key"] for i in job.items if "report_key" in i)
+        return self._to_dto(job, reports)
+
+    async def events(self, job_id: str) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        события SSE: ("item", MatchJobItemDTO) на каждый готовый отчёт (уже готовые —
+        сразу), ("done", MatchJobDTO без items) в конце, ("ping", None) в ожидании
+        """
+        dto = await self.get_job(job_id)
+        wake = asyncio.Event()
+        self._listeners.setdefault(dto.id, set()).add(wake)
+        sent: Set[int] = set()
+        try:
+            while True:
+                for item in dto.items:
+                    if item.report is not None and item.rank not in sent:
+                        sent.add(item.rank)
+                        yield "item", item
+                if dto.status in _FINAL:
+                    yield "done", dto.model_copy(update={"items": []})
+                    return
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout=settings.match_jobs.poll_interval_s)
+                except asyncio.TimeoutError:
+                    yield "ping", None
+                wake.clear()
+                dto = await self.get_job(job_id)
+        finally:
+            listeners = self._listeners.get(dto.id)
+            if listeners is not None:
+                listeners.discard(wake)
+                if not listeners:
+                    del self._listeners[dto.id]
+
+    def _wake(self, job_id: UUID) -> None:
+        for event in self._listeners.get(job_id, ()):
+            event.set()
+
+    def on_job_change(self, ids=None) -> None:
+        """
+        отчёты и статусы задач из других воркеров (лента изменений)
+        """
+        targets = list(self._listeners) if ids is None else [UUID(i) for i in ids]
+        for job_id in targets:
+            self._wake(job_id)
+
+    @staticmethod
+    def _to_dto(job: MatchJob, reports: Dict[str, MatchReport]) -> MatchJobDTO:
+        items = []
+        for i in job.items:
+            report = reports.get(i.get("report_key")) or i.get("report")
+            if isinstance(report, dict):
+                report = MatchAns(**report)
+            items.append(MatchJobItemDTO(
+                rank=i["rank"],
+                user_id=i["user_id"],
+                vacancy_id=i["vacancy_id"],
+                vac_name=i["vac_name"],
+                position=i["position"],
+                score=i["score"],
+                report=MatchingResponse(
+                    score=report.score,
+                    position=i["position"] or "",
+                    decision=report.decision,
+                    reasoning_report=report.reasoning_report,
+                    vac_name=i["vac_name"],
+                ) if report is not None else None,
+            ))
+        return MatchJobDTO(
+            id=job.id,
+            kind=job.kind,
+            status=job.status,
+            top_k=job.top_k,
+            ready=sum(item.report is not None for item in items),
+            failed=job.failed,
+            created_at=job.created_at,
+            items=items,
+        )
+
+
+match_job_service = MatchJobService(match_job_repository, matching_service, report_gate_service)
+change_feed.on_change(JOB_ENTITY)(match_job_service.on_job_change)
@@ -1,24 +1,43 @@
 from repositories.db.vacancy_repository import VacancyRepository, vacancy_repository
 from repositories.db.user_repository import UserRepository, user_repository
-from matcher.config import MatcherConfig
-from matcher.scorer import compute_match
-from schemas.schemas import MatchResultDTO, MatchResult, VacancyDTO
-from typing import List
+from repositories.db.loaders import RequestLoaders
+from matcher.config import LLMGateConfig, MatcherConfig, TextSimConfig
+from matcher.batch import score_users, score_vacancies
+from matcher.lexicon import current
+from matcher.normalization import canonical_skill_keys
+from matcher.prefilter import expand_must_canon, min_months_without_must
+from schemas.schemas import MatchCandidate, MatchResultDTO, MatchResult, SimilarUserDTO, VacancyDTO, VacancyRecord, UserRecord
+from infrastructure.executors import run_cpu, chunked
+from services.snapshot_service import snapshot_service
+from infrastructure.metrics import MATCH_DECISIONS, observe_match_timings
+from infrastructure.tracing import span, traced, record_stage_timings
+from settings.settings import settings
+from contextlib import aclosing
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+from fastapi import HTTPException, status
+import asyncio
 
-cfg = MatcherConfig()
+cfg = MatcherConfig(
+    text=TextSimConfig(method=settings.embeddings.text_method),
+    gate=LLMGateConfig(**settings.llm_gate.model_dump()),
+)
 
 class MatchingService:
     def __init__(self, user_repository: UserRepository, vacancy_repository: VacancyRepository):
         self.user_repository = user_repository
         self.vacancy_repository = vacancy_repository
 
-    async def match(self, user_id: str) -> List[MatchResultDTO]:
-        vacs = await self.vacancy_repository.get_vacancy_list()
-        user = await self.user_repository.get_user_by_id(user_id)
+    @traced()
+    async def match(self, user_id: str, loaders: Optional[RequestLoaders] = None) -> List[MatchResultDTO]:
+        loaders = loaders or RequestLoaders()
+        vacs = await self.vacancy_repository.get_vacancy_records()
+        loaders.vacancies.prime_many(vacs)
+        user = await loaders.users.load(user_id)
+        scored = await self._score_vacancies(user, vacs)
         
         results = []
-        for vac in vacs:
-            res = compute_match(user, vac, cfg)
+        for vac, res in zip(vacs, scored):
             decision = _validate_res(res)
             dto = MatchResultDTO.model_validate(res)
             dto.decision = decision
@@ -27,47 +46,160 @@ class MatchingService:
             
         return results
     
-    async def vacancy_match(self, vac_id: str) -> List[MatchResultDTO]:
-        users = await self.user_repository.get_all_users()
-        vac = await self.vacancy_repository.get_vacancy_by_id(vac_id)
-        
-        results = []
-        for user in users:
-            res = compute_match(user, vac, cfg)
-            decision = _validate_res(res)
-            dto = MatchResultDTO.model_validate(res)
-            dto.decision = decision
-            dto.vacancy = vac
-            dto.user_id = user.id
-            results.append(dto)
-            
-        return results
+    @traced()
+    async def vacancy_match(self, vac_id: str, loaders: Optional[RequestLoaders] = None) -> List[MatchResultDTO]:
+        loaders = loaders or RequestLoaders()
+        vac = await loaders.vacancies.load(vac_id)
+        return await self._match_vacancy(vac, loaders)
+    
+    @traced()
+    async def new_vacancy_match(self, vac: VacancyDTO, loaders: Optional[RequestLoaders] = None) -> List[MatchResultDTO]:
+        loaders = loaders or RequestLoaders()
+        return await self._match_vacancy(vac, loaders)
     
-    async def new_vacancy_match(self, vac: VacancyDTO) -> List[MatchResultDTO]:
-        users = await self.user_repository.get_all_users()
+    async def _match_vacancy(self, vac: VacancyDTO | VacancyRecord, loaders: RequestLoaders) -> List[MatchResultDTO]:
+        user_ids, scored = await self._score_users(vac, self._candidate_chunks(vac))
         
         results = []
-        for user in users:
-            res = compute_match(user, vac, cfg)
+        for user_id, res in zip(user_ids, scored):
             decision = _validate_res(res)
             dto = MatchResultDTO.model_validate(res)
             dto.decision = decision
             dto.vacancy = vac
-            dto.user_id = user.id
+            dto.user_id = user_id
             results.append(dto)
-            
+        
+        # профили прошедших нужны эндпоинту для LLM — одним запросом в кэш загрузчика
+        accepted = [dto.user_id for dto in results if dto.decision]
+        if accepted:
+            loaders.users.prime_many((await self.user_repository.get_user_records_by_ids(accepted)).values())
         return results
     
-    async def get_user_dict(self, user_id: str) -> dict:
-        user = await user_repository.get_user_by_id(user_id)
+    async def _score_users(
+        self,
+        vac: VacancyDTO | VacancyRecord,
+        chunks: AsyncIterator[List[MatchCandidate]],
+    ) -> Tuple[List[UUID], List[MatchResult]]:
+        """
+        пакетный скоринг по мере загрузки: пачки по match_chunk_size уходят в пул
+        процессов, пока читается следующая. в работе не больше двух пачек на процесс
+        пула — загрузчик ждёт, и входные строки не копятся в памяти
+        """
+        user_ids: List[UUID] = []
+        tasks: List[asyncio.Task] = []
+        inflight = asyncio.Semaphore(max(1, settings.cpu.pool_workers) * 2)
+
+        async def score(part: Sequence[MatchCandidate]) -> List[MatchResult]:
+            try:
+                return await self._score_chunk(score_users, vac, part)
+            finally:
+                inflight.release()
+
+        try:
+            async with aclosing(chunks) as stream:
+                async for rows in stream:
+                    for part in chunked(rows, settings.cpu.match_chunk_size):
+                        await inflight.acquire()
+                        user_ids.extend(user.id for user in part)
+                        tasks.append(asyncio.create_task(score(part)))
+            parts = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        scored = [res for part in parts for res in part]
+        observe_match_timings(res.timings for res in scored)
+        return user_ids, scored
+    
+    async def _score_vacancies(self, user: UserRecord, vacs: List[VacancyRecord]) -> List[MatchResult]:
+        chunks = chunked(vacs, settings.cpu.match_chunk_size)
+        parts = await asyncio.gather(*(self._score_chunk(score_vacancies, user, chunk) for chunk in chunks))
+        scored = [res for part in parts for res in part]
+        observe_match_timings(res.timings for res in scored)
+        return scored
+    
+    async def _score_chunk(self, fn, one, many) -> List[MatchResult]:
+        """
+        пачка compute_match в пуле процессов; спан match.score_chunk
+        с суммарным временем стадий скоринга
+        """
+        with span("match.score_chunk", batch_fn=fn.__name__, size=len(many)) as current:
+            scored = await run_cpu(fn, one, many, cfg)
+            record_stage_timings(current, [res.timings for res in scored])
+        return scored
+    
+    async def _candidate_chunks(self, vac: VacancyDTO | VacancyRecord) -> AsyncIterator[List[MatchCandidate]]:
+        """
+        кандидаты для вакансии пачками: скрининг по общему снимку (services.snapshot_service)
+        и строки прошедших плюс изменённых после его сборки; без снимка (или если он
+        сильно отстал от БД) — при канонических must-have
+        фильтрация в Postgres, иначе — все пользователи
+        """
+        snap = snapshot_service.reader()
+        fresh = await snapshot_service.updated_since_build(snap) if snap is not None else None
+        if fresh is not None:
+            with span("match.snapshot_screen", rows=snap.rows, fresh=len(fresh)) as screen_span:
+                ids = await snapshot_service.screen(snap, vac, cfg)
+                if ids is not None:
+                    screen_span.set_attribute("passed", len(ids))
+            if ids is not None:
+                # изменённые после сборки снимка — на точный скоринг без скрининга
+                ids = list(dict.fromkeys(ids + fresh))
+                # отсеянные скринингом в результат не попадают — учитываем отказ здесь
+                MATCH_DECISIONS.labels("reject").inc(max(0, snap.rows - len(ids)))
+                if ids:
+                    async for chunk in self.user_repository.stream_match_candidates(ids=ids):
+                        yield chunk
+                return
+        lexicon = current()
+        must_canon = canonical_skill_keys(vac.must_have, lexicon=lexicon)
+        min_months = min_months_without_must(vac.min_exp_months, cfg) if must_canon else 0
+        if min_months != 0:
+            # канон пользователя засчитывается и без точного совпадения (token_set_ratio:
+            # «React» за «React Native» и наоборот) — фильтр по всем таким ключам
+            vocabulary = await self.user_repository.get_skill_canon_vocabulary()
+            must_keys = await asyncio.to_thread(expand_must_canon, must_canon, vocabulary, cfg.skills.threshold_must)
+            stream = self.user_repository.stream_match_candidates(must_keys, min_months, lexicon.version)
+        else:
+            stream = self.user_repository.stream_match_candidates()
+        async for chunk in stream:
+            yield chunk
+    
+    @traced()
+    async def similar_users(self, vac_id: str, k: int, loaders: Optional[RequestLoaders] = None) -> List[SimilarUserDTO]:
+        """
+        пользователи с опытом, близким по смыслу к описанию вакансии, —
+        поиск по векторам снимка без попарного сравнения текстов
+        """
+        loaders = loaders or RequestLoaders()
+        vac = await loaders.vacancies.load(vac_id)
+        snap = snapshot_service.reader()
+        if snap is None or snap.embeddings is None:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="Embedding index is not built (APP_EMBEDDINGS__TEXT_METHOD=embedding)")
+        if not vac.description:
+            return []
+        with span("match.ann_search", rows=snap.rows, k=k):
+            found = await snapshot_service.nearest(snap, vac.description, k)
+        return [SimilarUserDTO(user_id=user_id, similarity=sim) for user_id, sim in found]
+    
+    async def get_user_dict(self, user_id: str, loaders: Optional[RequestLoaders] = None) -> dict:
+        """
+        профиль для LLM; с loaders — из кэша запроса, без отдельного SELECT
+        """
+        if loaders is not None:
+            user = await loaders.users.load(user_id)
+        else:
+            user = await self.user_repository.get_user_by_id(user_id)
         user_dict = user.to_plain_dict()
         return user_dict
             
 def _validate_res(res: MatchResult) -> bool:
     score = res.score
-    if score >= 0.5:
+    if score >= cfg.accept_threshold:
+        MATCH_DECISIONS.labels("accept").inc()
         return True
-    print("reject")
+    MATCH_DECISIONS.labels("reject").inc()
     return False
     
 matching_service = MatchingService(user_repository, vacancy_repository)
\ No newline at end of file
@@ -1,9 +1,9 @@
-from typing import List
+from typing import AsyncIterator, List, Optional
 
 from repositories.db.vacancy_repository import VacancyRepository
 from utils.docx_extract import pdf_to_txt_via_docx
 from utils.txt_parse import parse_vacancy_text
-from schemas.schemas import VacancyDTO
+from schemas.schemas import VacancyDTO, VacancyBriefDTO, VacancyRecord
 from repositories.db.vacancy_repository import vacancy_repository
 
 class ParsingService():
@@ -35,9 +35,15 @@ class ParsingService():
         
         return dto
     
-    async def get_vacancy_list(self) -> List[VacancyDTO]:
-        data = await self.repository.get_vacancy_list()
+    async def get_vacancy_list(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[VacancyDTO]:
+        data = await self.repository.get_vacancy_list(limit=limit, after=after)
         return data
+
+    async def get_vacancy_briefs(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[VacancyBriefDTO]:
+        return await self.repository.get_vacancy_briefs(limit=limit, after=after)
+
+    def iter_vacancies(self) -> AsyncIterator[VacancyRecord]:
+        return self.repository.iter_vacancies()
     
     async def delete_vacancy(self, id: str) -> bool:
         ok = await self.repository.delete_vacancy(id)
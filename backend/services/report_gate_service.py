@@ -0,0 +1,67 @@
+import math
+from typing import Any, Dict, Optional
+
+from ai_services.matcher import LLMAnalizer, MatchAns, analyzer
+from ai_services.report_template import templated_report
+from ai_services.utils.prepare_profile import get_text_profile
+from infrastructure.metrics import LLM_GATE_AGREEMENT, LLM_GATE_ROUTES
+from infrastructure.tracing import traced
+from matcher.config import LLMGateConfig
+from schemas.schemas import MatchResultDTO
+from services.matching_service import cfg
+
+
+class ReportGateService:
+    """
+    какие принятые пары получают LLM-отчёт: только неуверенная зона score
+    [accept_threshold, llm_below), уверенным — шаблонный отчёт по details.
+    доля audit_rate уверенных пар всё равно идёт в LLM, и по всем ответам модели
+    считается согласие с эвристикой (llm_gate_agreement_total по корзинам score) —
+    по нему подбирается llm_below; сэкономленные вызовы — llm_gate_total{route="template"}
+    """
+
+    def __init__(self, analyzer: LLMAnalizer, gate: LLMGateConfig):
+        self.analyzer = analyzer
+        self.gate = gate
+
+    def route(self, score: float, report_key: str) -> str:
+        """
+        llm | template | audit для пары с ключом отчёта report_key (LLMAnalizer.report_key)
+        """
+        if not self.gate.enabled or score < self.gate.llm_below:
+            return "llm"
+        # выборка аудита детерминирована по паре: повторный просмотр идёт тем же путём
+        if int(report_key[:8], 16) < self.gate.audit_rate * 0x1_0000_0000:
+            return "audit"
+        return "template"
+
+    def template(self, score: float, breakdown: Dict[str, float], details: Dict[str, Any], is_user: bool = False) -> MatchAns:
+        return templated_report(score, breakdown, details, is_user)
+
+    def observe(self, score: float, ans: Optional[MatchAns]) -> None:
+        """
+        согласие ответа LLM с принятием пары эвристикой
+        """
+        if ans is None:
+            return
+        bucket = f"{math.floor(score * 20) / 20:.2f}"
+        LLM_GATE_AGREEMENT.labels(bucket, "true" if ans.score >= self.gate.agree_min_score else "false").inc()
+
+    @traced()
+    async def report(self, res: MatchResultDTO, user_profile: Dict, vacancy: str, is_user: bool = False) -> Optional[MatchAns]:
+        """
+        отчёт по принятой паре для блокирующих маршрутов матчинга: LLM или шаблон
+        """
+        text_profile = get_text_profile(user_profile)
+        route = self.route(res.score, self.analyzer.report_key(text_profile, is_user, vacancy))
+        LLM_GATE_ROUTES.labels(route).inc()
+        if route == "template":
+            return self.template(res.score, res.breakdown, res.details, is_user)
+        ans = await self.analyzer.match_text(text_profile, is_user, vacancy)
+        self.observe(res.score, ans)
+        if ans is None and route == "audit":
+            return self.template(res.score, res.breakdown, res.details, is_user)
+        return ans
+
+
+report_gate_service = ReportGateService(analyzer, cfg.gate)
@@ -0,0 +1,204 @@
+"""
+Снимок кандидатов для матчинга (matcher.candidate_snapshot): сборка из БД
+и выдача воркерам. Отдельным процессом-сборщиком (при APP_SNAPSHOT__BUILD_IN_WORKERS=false):
+
+    python -m services.snapshot_service
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+try:
+    import fcntl
+except ImportError:  # Windows: без межпроцессной блокировки, собирает каждый воркер
+    fcntl = None
+
+from infrastructure.db.change_feed import change_feed
+from infrastructure.executors import chunked, run_cpu
+from matcher.candidate_snapshot import (
+    CandidateSnapshot, SnapshotBuilder, SnapshotChanged, default_path, load_snapshot, screen_snapshot_range,
+)
+from matcher.config import MatcherConfig
+from matcher.embeddings import get_backend, text_vector
+from matcher.lexicon import current
+from repositories.db.user_repository import UserRepository, user_repository
+from schemas.schemas import VacancyDTO, VacancyRecord
+from settings.settings import settings
+
+
+class CandidateSnapshotService:
+    """
+    файл снимка один на машину: собирает его тот процесс, что взял flock,
+    остальные только отображают готовый файл. сборщик сверяет число
+    пользователей и max(updated_at) с заголовком, версию словаря навыков
+    и модель эмбеддингов
+    """
+
+    def __init__(self, repository: UserRepository):
+        self.repository = repository
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+    @property
+    def path(self) -> str:
+        return settings.snapshot.path or default_path()
+
+    async def start(self) -> None:
+        if settings.snapshot.enabled and settings.snapshot.build_in_workers:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Candidate snapshot refresh failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.snapshot.refresh_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def invalidate(self, _ids=None) -> None:
+        """
+        изменения пользователей из ленты: сверка сразу, без ожидания интервала.
+        события во время сборки схлопываются в одну следующую сверку
+        """
+        self._wake.set()
+
+    async def refresh(self) -> bool:
+        """
+        пересобирает снимок, если пользователи или словарь изменились.
+        True — опубликован новый файл; False — актуален или собирает другой процесс
+        """
+        path = self.path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(f"{path}.lock", "a") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return False
+            # водяной знак читается до строк: правка во время сборки даст
+            # снимок новее знака и пересборку на следующей сверке, но не пропуск
+            watermark = await self.repository.get_snapshot_watermark()
+            lexicon = current()
+            embedder = _embedder()
+            model_id = embedder.model_id if embedder is not None else None
+            snap = load_snapshot(path)
+            if (
+                snap is not None and snap.watermark == watermark and snap.lexicon_version == lexicon.version
+                and snap.embedding_model == model_id
+            ):
+                # mtime — отметка «сборщик жив и снимок актуален» для max_age_s
+                os.utime(path)
+                return False
+
+            builder = SnapshotBuilder(lexicon, embedder, previous=snap, ivf_lists=settings.embeddings.ivf_lists)
+            async for page in self.repository.stream_match_candidates(chunk_rows=settings.snapshot.page_size):
+                await asyncio.to_thread(builder.add_rows, page)
+            await asyncio.to_thread(builder.write, path, watermark)
+            print(
+                f"Candidate snapshot rebuilt: {len(builder)} users, lexicon v{lexicon.version}, "
+                f"embeddings {model_id} ({builder.reused} reused)"
+            )
+            return True
+
+    def reader(self) -> Optional[CandidateSnapshot]:
+        """
+        снимок, пригодный для скрининга, или None — тогда матчинг идёт по БД
+        """
+        if not settings.snapshot.enabled:
+            return None
+        try:
+            snap = load_snapshot(self.path)
+        except (OSError, ValueError) as e:
+            print(f"Candidate snapshot unreadable: {e}")
+            return None
+        if snap is None or snap.lexicon_version != current().version:
+            return None
+        embedder = _embedder()
+        if snap.embedding_model != (embedder.model_id if embedder is not None else None):
+            return None
+        if snap.age_s() > settings.snapshot.max_age_s:
+            return None
+        return snap
+
+    async def updated_since_build(self, snap: CandidateSnapshot) -> Optional[List[UUID]]:
+        """
+        пользователи, добавленные или изменённые после сборки снимка: updated_at новее
+        водяного знака (с запасом fresh_margin_s). снимок их не знает или знает устаревшими,
+        поэтому в точный скоринг они идут мимо скрининга. None — таких больше
+        fresh_max_rows (например, после массовой загрузки): снимок отстал, матчинг по БД
+        """
+        cfg = settings.snapshot
+        since = None
+        watermark = snap.watermark
+        if watermark and watermark[1]:
+            since = datetime.fromisoformat(watermark[1]) - timedelta(seconds=cfg.fresh_margin_s)
+        ids = await self.repository.get_user_ids_updated_since(since, cfg.fresh_max_rows + 1)
+        return ids if len(ids) <= cfg.fresh_max_rows else None
+
+    async def screen(self, snap: CandidateSnapshot, vac: VacancyDTO | VacancyRecord, cfg: MatcherConfig) -> Optional[List[UUID]]:
+        """
+        id кандидатов, прошедших скрининг по снимку, пачками строк в пуле процессов.
+        None — снимок заменили посреди скрининга
+        """
+        ranges = chunked(range(snap.rows), settings.snapshot.chunk_rows)
+        try:
+            parts = await asyncio.gather(*(
+                run_cpu(screen_snapshot_range, snap.path, snap.generation, vac, cfg, r.start, r.stop)
+                for r in ranges
+            ))
+        except SnapshotChanged:
+            return None
+        return [uid for part in parts for uid in part]
+
+    async def nearest(self, snap: CandidateSnapshot, text: str, k: int) -> List[Tuple[UUID, float]]:
+        """
+        первая стадия поиска по смыслу: k пользователей с ближайшим experience_description
+        по IVF-индексу снимка
+        """
+        def search() -> List[Tuple[UUID, float]]:
+            rows, scores = snap.nearest(text_vector(text), k, settings.embeddings.ivf_probes)
+            return list(zip(snap.user_ids(rows), scores.tolist()))
+        return await asyncio.to_thread(search)
+
+
+def _embedder():
+    # векторы в снимке нужны только при text_method=embedding
+    return get_backend() if settings.embeddings.text_method == "embedding" else None
+
+
+snapshot_service = CandidateSnapshotService(user_repository)
+change_feed.on_change("user")(snapshot_service.invalidate)
+
+
+async def _main() -> None:
+    from infrastructure.db.connect import dispose_engine, init_engine
+    from services.lexicon_service import lexicon_service
+
+    await init_engine()
+    await lexicon_service.start()
+    await change_feed.start()
+    try:
+        await snapshot_service._refresh_loop()
+    finally:
+        await change_feed.stop()
+        await lexicon_service.stop()
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -4,9 +4,13 @@ import json
 import re
 
 from repositories.db.user_repository import user_repository
-from schemas.schemas import UserDTO, UserLogin
+from pydantic import ValidationError
+
+from schemas.schemas import UserDTO, UserLogin, UserBriefDTO, BulkUpsertReport, BulkRowError, UserRecord
+from utils.rows_stream import iter_rows
+from utils.user_convert import provided_fields, user_changes
 from ai_services.career import ai_service
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional
 from utils.concatination import user_to_single_line
 from schemas.schemas import Skills
 
@@ -20,26 +24,85 @@ class UserService:
     async def check_user(self, user: UserLogin) -> Tuple[bool, UUID]:
         return await user_repository.exists_by_full_name(user.first_name, user.last_name)
     
-    async def get_all_users(self) -> List[UserDTO]:
-        return await self.repository.get_all_users()
+    async def get_all_users(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[UserDTO]:
+        return await self.repository.get_all_users(limit=limit, after=after)
+
+    async def get_user_briefs(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[UserBriefDTO]:
+        return await self.repository.get_user_briefs(limit=limit, after=after)
+
+    def iter_users(self) -> AsyncIterator[UserRecord]:
+        return self.repository.iter_users()
     
     async def get_user_by_id(self, id: str) -> UserDTO:
         return await self.repository.get_user_by_id(id)
     
     async def update_user_info(self, user: UserDTO, id: str) -> UserDTO:
-        return await self.repository.update_user_info(
-            id,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            sex=user.sex,
-            birth_date=user.birth_date,
-            current_position=user.current_position,
-            education=user.education, 
-            experience_years=user.experience_years, 
-            experience_months=user.experience_months,
-            experience_description=user.experience_description,
-            hard_skills=user.hard_skills,
+        """
+        PATCH: обновляются только присланные поля; присланный updated_at
+        используется как ожидаемая версия строки
+        """
+        return await self.repository.update_user_fields(
+            id, provided_fields(user), expected_updated_at=user.updated_at
         )
+
+    async def apply_user_changes(self, old: UserDTO, new: UserDTO, id: str) -> UserDTO:
+        """
+        пишет в БД только разницу new относительно old с проверкой версии old;
+        без изменений — ни одного запроса
+        """
+        changes = user_changes(old, new)
+        if not changes:
+            return old
+        return await self.repository.update_user_fields(id, changes, expected_updated_at=old.updated_at)
+
+    async def bulk_upsert(
+        self,
+        chunks: AsyncIterator[bytes],
+        fmt: str,
+        chunk_size: int = 1000,
+        max_errors: int = 100,
+    ) -> BulkUpsertReport:
+        """
+        потоковая загрузка пользователей (NDJSON/CSV): валидация UserDTO
+        и запись пачками по chunk_size одним upsert-запросом на пачку
+        """
+        report = BulkUpsertReport()
+        canon_cache: Dict[tuple, List[str]] = {}
+        batch: List[UserDTO] = []
+        lines: List[int] = []
+
+        def _fail(line: int, error: str) -> None:
+            report.failed += 1
+            if len(report.errors) < max_errors:
+                report.errors.append(BulkRowError(line=line, error=error))
+
+        async def _flush() -> None:
+            ids, failed = await self.repository.upsert_users(batch, canon_cache=canon_cache)
+            report.upserted += len(ids)
+            # строки, отвергнутые ограничениями БД, — в отчёт, как ошибки валидации
+            for i, error in sorted(failed.items()):
+                _fail(lines[i], error)
+            batch.clear()
+            lines.clear()
+
+        async for line, row, error in iter_rows(chunks, fmt):
+            report.processed += 1
+            if error is not None:
+                _fail(line, error)
+                continue
+            try:
+                batch.append(UserDTO.model_validate(row))
+                lines.append(line)
+            except ValidationError as e:
+                _fail(line, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+                continue
+            if len(batch) >= chunk_size:
+                await _flush()
+
+        if batch:
+            await _flush()
+        return report
+
     async def chat_llm(self, id, text_message):
         return await ai_service.process_message(user_id=id, message=text_message)
 
@@ -1,4 +1,5 @@
 import multiprocessing as mp
+from typing import Optional
 
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -11,17 +12,173 @@ class Postgres(BaseModel):
     port: int = PG_PORT
     username: str = PG_USER
     password: str = PG_PASSWORD
+
+    # пул async engine (один на процесс)
+    pool_size: int = 10
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    # кэш prepared statements asyncpg на соединение
+    statement_cache_size: int = 256
+    # строк на один fetch серверного курсора в потоковых загрузчиках (кандидаты матчинга)
+    stream_chunk_rows: int = 2000
+    # create_all + миграции в lifespan воркера (под advisory lock).
+    # false — схему поднимает отдельный шаг деплоя: python -m infrastructure.db.migrate
+    bootstrap_on_startup: bool = True
     
 
 class Uvicorn(BaseModel):
     host: str = "0.0.0.0"
     port: int = 8000
-    workers: int = mp.cpu_count()*2 + 1
-    
+    # воркеры async и упираются в I/O — по одному на ядро;
+    # CPU-тяжёлое уходит в пул процессов (Cpu)
+    workers: int = mp.cpu_count()
+    loop: str = "auto"          # auto -> uvloop, если установлен
+    http: str = "auto"          # auto -> httptools, если установлен
+    backlog: int = 2048
+    timeout_keep_alive: int = 5
+    limit_concurrency: Optional[int] = None
+    access_log: bool = True
+
+
+class Cpu(BaseModel):
+    # пул процессов на каждый API-воркер: PDF -> DOCX и пакетный скоринг.
+    # 0 — без пула, CPU-задачи идут в поток (to_thread)
+    pool_workers: int = 2
+    # перезапуск процесса пула после N задач (утечки памяти pdf2docx/PyMuPDF)
+    max_tasks_per_child: int = 100
+    # сколько кандидатов скорить одной задачей пула
+    match_chunk_size: int = 256
+
+
+class Ai(BaseModel):
+    # OpenAI-совместимый сервер. для нагрузочных тестов — локальный стенд:
+    # APP_AI__BASE_URL=http://127.0.0.1:8100/v1 (python -m benchmarks.llm_mock)
+    base_url: str = "https://llm.t1v.scibox.tech/v1"
+    model: str = "Qwen2.5-72B-Instruct-AWQ"
+    timeout: float = 120.0
+    # ретраи клиента openai на 429/5xx/таймаутах
+    max_retries: int = 2
+
+
+class MatchJobs(BaseModel):
+    # ?mode=tiered у маршрутов матчинга: эвристика сразу, LLM-отчёты top_k в фоне
+    top_k: int = 20
+    # одновременных запросов к LLM на задачу
+    llm_concurrency: int = 4
+    # аренда исполнителя: задачу упавшего воркера подхватывает другой после её истечения
+    lease_s: float = 60.0
+    # SSE без ленты изменений сверяется с БД с этим интервалом
+    poll_interval_s: float = 2.0
+    # задачи и кэш отчётов старше удаляются
+    ttl_s: float = 7 * 86400.0
+
+
+class LLMGate(BaseModel):
+    # отбор пар для LLM-отчёта (matcher.config.LLMGateConfig): LLM только для
+    # score в [accept_threshold, llm_below), уверенным — шаблонный отчёт
+    enabled: bool = True
+    llm_below: float = 0.8
+    # доля уверенных пар, отправляемых в LLM для метрик согласия (llm_gate_agreement_total)
+    audit_rate: float = 0.05
+    agree_min_score: int = 60
+
+
+class Lexicon(BaseModel):
+    # db — словарь навыков из таблицы skill_lexicon с горячей перезагрузкой,
+    # builtin — только utils.patterns.skills.SKILL_LEXICON
+    source: str = "db"
+    # как часто воркер сверяет версию словаря в БД
+    refresh_interval_s: float = 30.0
+
+
+class Affinity(BaseModel):
+    # матрица близости навыков (matcher.affinity) для частичного зачёта смежных навыков
+    enabled: bool = True
+    # как часто воркер сверяет версию матрицы в БД
+    refresh_interval_s: float = 60.0
+    # пересборка по профилям и вакансиям не чаще (делает один воркер под advisory lock)
+    rebuild_interval_s: float = 6 * 3600.0
+    # навык реже min_support документов в матрицу не входит
+    min_support: int = 5
+    min_score: float = 0.3
+    top_k: int = 10
+
+
+class Snapshot(BaseModel):
+    # колоночный снимок пользователей (matcher.candidate_snapshot) в mmap-файле,
+    # общий для всех воркеров машины: первая стадия матчинга вакансии без SELECT по всем
+    enabled: bool = True
+    # пусто — <tempdir>/nizhnovhack-candidates.snap
+    path: str = ""
+    # как часто сборщик сверяет пользователей в БД со снимком
+    refresh_interval_s: float = 15.0
+    # снимок, который сборщик не подтверждал дольше, не используется (сборщик упал)
+    max_age_s: float = 300.0
+    # true — собирает один из воркеров (flock), false — отдельный процесс:
+    # python -m services.snapshot_service
+    build_in_workers: bool = True
+    # пользователи, изменённые после сборки (updated_at новее водяного знака минус
+    # fresh_margin_s — запас на разброс часов воркеров и поздний COMMIT), идут
+    # в точный скоринг мимо скрининга; если их больше fresh_max_rows — матчинг по БД
+    fresh_margin_s: float = 60.0
+    fresh_max_rows: int = 10_000
+    # строк снимка на одну задачу пула при скрининге
+    chunk_rows: int = 50_000
+    page_size: int = 5000
+
+
+class Embeddings(BaseModel):
+    # текстовая компонента скоринга: tfidf — попарный TF-IDF (matcher.textsim),
+    # embedding — косинус эмбеддингов (matcher.embeddings) с векторами пользователей
+    # и IVF-индексом в снимке кандидатов
+    text_method: str = "tfidf"
+    # hashing — без модели (символьные n-граммы); static — векторы слов с диска
+    backend: str = "hashing"
+    # каталог static-модели: vocab.txt + vectors.npy
+    path: str = ""
+    # размерность hashing-бэкенда
+    dim: int = 256
+    # LRU векторов текстов на процесс (описания вакансий, пары вне снимка)
+    cache_size: int = 4096
+    # IVF: списков на индекс (0 — sqrt(rows)) и сколько ближайших списков смотреть при поиске
+    ivf_lists: int = 0
+    ivf_probes: int = 16
+
+
+class Changes(BaseModel):
+    # LISTEN/NOTIFY-лента изменений (infrastructure.db.change_feed) для инвалидации
+    # кэшей во всех воркерах; отдельное соединение на воркер вне пула
+    enabled: bool = True
+    reconnect_min_s: float = 1.0
+    reconnect_max_s: float = 30.0
+    # пинг соединения слушателя: обрыв без FIN иначе не заметен
+    ping_interval_s: float = 15.0
+    ping_timeout_s: float = 5.0
+
+
+class Tracing(BaseModel):
+    # none | console | jsonl — OpenTelemetry-спаны в локальный экспортёр
+    exporter: str = "none"
+    # для jsonl: {pid} — файл на процесс воркера
+    path: str = "traces-{pid}.jsonl"
+    service_name: str = "nizhnovhack-backend"
+
 
 class _Settings(BaseSettings):
     pg: Postgres = Postgres()
     uvicorn: Uvicorn = Uvicorn()
+    cpu: Cpu = Cpu()
+    ai: Ai = Ai()
+    match_jobs: MatchJobs = MatchJobs()
+    llm_gate: LLMGate = LLMGate()
+    lexicon: Lexicon = Lexicon()
+    affinity: Affinity = Affinity()
+    snapshot: Snapshot = Snapshot()
+    embeddings: Embeddings = Embeddings()
+    changes: Changes = Changes()
+    tracing: Tracing = Tracing()
     
     model_config = SettingsConfigDict(env_file=".env", env_prefix="app_", env_nested_delimiter="__")
     
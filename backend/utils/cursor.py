@@ -0,0 +1,33 @@
+import base64
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """
+    курсор keyset-пагинации: позиция последней выданной строки (created_at, id)
+    """
+    raw = f"{created_at.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
+
+def next_cursor(items: Sequence[Any], limit: Optional[int]) -> Optional[str]:
+    """
+    курсор следующей страницы; None — если страница неполная (дальше пусто)
+    """
+    if not limit or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
@@ -1,11 +1,17 @@
 from fastapi import HTTPException
-import mammoth
 from io import BytesIO
-from pdf2docx import Converter
-import tempfile, os, asyncio, docx2txt, re
+import tempfile, os, asyncio, re, time
+from infrastructure.executors import run_cpu
+from infrastructure.metrics import PDF_CONVERSION_LATENCY
+from infrastructure.tracing import span
+
+# mammoth, docx2txt и pdf2docx (тянет PyMuPDF) импортируются внутри функций:
+# нужны только при загрузке файлов, а не на старте воркера
 
 
 def docx_to_markdown(docx_bytes: bytes) -> str:
+    import mammoth
+
     result = mammoth.convert_to_markdown(BytesIO(docx_bytes))
     md = result.value.strip()
     return md
@@ -14,6 +20,8 @@ async def docx_to_txt(data: bytes) -> str:
     if not data:
         raise HTTPException(status_code=400, detail="Файл пустой")
 
+    import docx2txt
+
     tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".docx")
     try:
         tmp.write(data)
@@ -43,8 +51,15 @@ async def pdf_to_docx(pdf_bytes: bytes, start: int = 0, end: int | None = None)
         pdf_tmp.close()
         docx_tmp.close()
 
-        # отдельный поток для конвертации
-        await asyncio.to_thread(_convert_pdf_path_to_docx_path, pdf_tmp.name, docx_tmp.name, start, end)
+        # конвертация в пуле процессов: CPU-bound, держит GIL
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with span("pdf.convert_to_docx", size_bytes=len(pdf_bytes)):
+                await run_cpu(_convert_pdf_path_to_docx_path, pdf_tmp.name, docx_tmp.name, start, end)
+            outcome = "ok"
+        finally:
+            PDF_CONVERSION_LATENCY.labels(outcome).observe(time.perf_counter() - started)
 
         with open(docx_tmp.name, "rb") as f:
             docx_bytes = f.read()
@@ -70,6 +85,8 @@ def _convert_pdf_path_to_docx_path(pdf_path: str, docx_path: str, start: int = 0
     Конвертирует PDF-файл (по пути) в DOCX-файл (по пути).
     end=None -> до конца PDF. Нумерация страниц как в pdf2docx (0-based).
     """
+    from pdf2docx import Converter
+
     cv = Converter(pdf_path)
     try:
         cv.convert(docx_path, start=start, end=end)
@@ -509,12 +509,3 @@ SKILL_LEXICON: Dict[str, List[str]] = {
     "PagerDuty": ["pagerduty"],
     "Opsgenie": ["opsgenie"],
 }
-
-CANONICAL = tuple(SKILL_LEXICON.keys())
-
-_variants: list[str] = []
-for canon, syns in SKILL_LEXICON.items():
-    _variants.append(canon)
-    _variants.extend(syns)
-
-VARIANTS = tuple(dict.fromkeys(_variants))
\ No newline at end of file
@@ -0,0 +1,79 @@
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# поля-списки в CSV пишутся одной ячейкой через разделитель
+CSV_LIST_FIELDS = {"hard_skills"}
+CSV_LIST_SEPARATORS = (";", "|")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    режет поток байтов на строки, не собирая тело запроса в памяти
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    async for chunk in chunks:
+        tail += decoder.decode(chunk)
+        *lines, tail = tail.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+def _split_list(value: str) -> List[str]:
+    for sep in CSV_LIST_SEPARATORS:
+        if sep in value:
+            return [v.strip() for v in value.split(sep) if v.strip()]
+    return [value.strip()] if value.strip() else []
+
+
+def _csv_row(header: List[str], values: List[str]) -> Dict[str, Any]:
+    row: Dict[str, Any] = {}
+    for key, value in zip(header, values):
+        if key in CSV_LIST_FIELDS:
+            row[key] = _split_list(value)
+        elif value == "":
+            continue  # пустая ячейка -> значение по умолчанию DTO
+        else:
+            row[key] = value
+    return row
+
+
+async def iter_rows(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    строки NDJSON ("ndjson") или CSV с заголовком ("csv").
+    отдаёт (номер строки, словарь | None, ошибка разбора | None).
+    CSV-ячейки с переводом строки внутри кавычек не поддерживаются
+    """
+    header: Optional[List[str]] = None
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        if fmt == "ndjson":
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(obj, dict):
+                yield line_no, None, "expected JSON object"
+                continue
+            yield line_no, obj, None
+        else:
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [h.strip() for h in values]
+                continue
+            if len(values) != len(header):
+                yield line_no, None, f"expected {len(header)} columns, got {len(values)}"
+                continue
+            yield line_no, _csv_row(header, values), None
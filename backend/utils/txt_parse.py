@@ -3,7 +3,7 @@ from typing import List, Dict, Tuple, Optional
 from rapidfuzz import process, fuzz
 
 from schemas.schemas import ParsedResult
-from .patterns.skills import CANONICAL, VARIANTS, SKILL_LEXICON
+from matcher.lexicon import current
 from .patterns.patterns import SECTION_HINTS, YEARS_PATTERNS, BULLET
 
 def normalize(text: str) -> str:
@@ -53,17 +53,14 @@ def best_skill_match(fragment: str, score_cutoff: int = 88) -> Optional[str]:
     frag = fragment.strip().lower()
     if not frag:
         return None
-    match = process.extractOne(frag, CANONICAL, scorer=fuzz.WRatio, score_cutoff=score_cutoff)
+    lexicon = current()
+    match = process.extractOne(frag, lexicon.canonical, scorer=fuzz.WRatio, score_cutoff=score_cutoff)
     if match:
         return match[0]
-    vmatch = process.extractOne(frag, VARIANTS, scorer=fuzz.WRatio, score_cutoff=score_cutoff)
+    vmatch = process.extractOne(frag, lexicon.variants, scorer=fuzz.WRatio, score_cutoff=score_cutoff)
     if not vmatch:
         return None
-    variant = vmatch[0].lower()
-    for canon, variants in SKILL_LEXICON.items():
-        if variant == canon.lower() or variant in [v.lower() for v in variants]:
-            return canon
-    return None
+    return lexicon.variant_to_canon.get(vmatch[0].lower())
 
 def extract_skills_block(text: str) -> List[str]:
     items: List[str] = []
@@ -1,6 +1,12 @@
-from typing import Dict
+from typing import Any, Dict
 from schemas.schemas import UserDTO
 
+# колонки user, которые можно менять через API
+USER_UPDATABLE_FIELDS = frozenset({
+    "first_name", "last_name", "sex", "birth_date", "current_position", "education",
+    "experience_years", "experience_months", "experience_description", "hard_skills",
+})
+
 def update_user_from_analysis(user: UserDTO, analysis_dict: Dict) -> UserDTO:
     """
     обновляет объект UserDTO на основе словаря, возвращённого ai_service.analyze_dialog.
@@ -12,3 +18,25 @@ def update_user_from_analysis(user: UserDTO, analysis_dict: Dict) -> UserDTO:
         user.hard_skills = analysis_dict["hard_skills"]
 
     return user
+
+
+def user_changes(old: UserDTO, new: UserDTO) -> Dict[str, Any]:
+    """
+    изменённые колонки new относительно old — только они попадают в UPDATE
+    """
+    return {
+        field: getattr(new, field)
+        for field in USER_UPDATABLE_FIELDS
+        if getattr(new, field) != getattr(old, field)
+    }
+
+
+def provided_fields(user: UserDTO) -> Dict[str, Any]:
+    """
+    поля, явно переданные клиентом в PATCH (None = не менять)
+    """
+    return {
+        field: value
+        for field, value in user.model_dump(include=USER_UPDATABLE_FIELDS, exclude_unset=True).items()
+        if value is not None
+    }
@@ -0,0 +1,14 @@
+// все страницы списка: сервер отдаёт не больше limit записей,
+// курсор следующей страницы — в заголовке X-Next-Cursor (нет заголовка — последняя)
+export async function fetchAllPages<T>(url: string): Promise<T[]> {
+  const items: T[] = [];
+  const sep = url.includes('?') ? '&' : '?';
+  let after: string | null = null;
+  do {
+    const res = await fetch(after ? `${url}${sep}after=${encodeURIComponent(after)}` : url);
+    if (!res.ok) throw new Error(await res.text().catch(() => `HTTP ${res.status}`));
+    items.push(...(await res.json() as T[]));
+    after = res.headers.get('X-Next-Cursor');
+  } while (after);
+  return items;
+}